@@ -0,0 +1,65 @@
+"""Measures the cold start time of importing the composite package.
+
+Each scenario is timed in a fresh interpreter. The eager scenario also imports every lazily loaded module, which is
+what import composite cost when the exporters and plotting tools were imported with the package.
+
+Usage: python benchmarks/import_time.py [--repeat N]
+
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    'numpy': 'import numpy',
+    'composite': 'import composite',
+    'composite (eager)': 'import composite\nfor name in composite._LAZY_IMPORTS: getattr(composite, name)',
+}
+
+TIMER = """import sys, time
+start = time.perf_counter()
+{code}
+end = time.perf_counter()
+print((end - start) * 1e3, len(sys.modules))
+"""
+
+
+def measure(code, repeat):
+    """Runs code in repeat fresh interpreters and returns the median time in ms and the number of loaded modules"""
+
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.split()
+        times.append(float(output[0]))
+
+    return statistics.median(times), int(output[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the import time of the composite package')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of interpreters per scenario')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    arguments = parser.parse_args()
+
+    results = {name: measure(code, arguments.repeat) for name, code in SCENARIOS.items()}
+
+    if arguments.json:
+        print(json.dumps({name: {'ms': ms, 'modules': modules} for name, (ms, modules) in results.items()}))
+        return
+
+    for name, (ms, modules) in results.items():
+        print('{:<20} {:8.1f} ms {:6d} modules'.format(name, ms, modules))
+
+    lazy, eager = results['composite'][0], results['composite (eager)'][0]
+    print('Lazy imports save {:.1f} ms ({:.0f} %) of the cold start'.format(eager - lazy, 100 * (eager - lazy) / eager))
+
+
+if __name__ == '__main__':
+    main()
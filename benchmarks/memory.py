@@ -0,0 +1,78 @@
+"""Measures the memory held per ply by Laminate objects and the garbage left for the cyclic collector.
+
+Laminates of identical plies are built from shared materials, as done by the parser, and the memory allocated while
+building them is measured with tracemalloc. The NumPy arrays of each ply are included. After the laminates are
+released, the number of objects found by gc.collect shows how many were only reachable through reference cycles.
+
+Usage: python benchmarks/memory.py [--plies N]
+
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import composite  # noqa: E402
+from composite.stack import interface_coordinates  # noqa: E402
+
+PLIES_PER_LAMINATE = 100
+
+
+def build(plies):
+    """Builds laminates with plies plies in total"""
+
+    fibre = composite.Material(1, 350e9, 0.2, -1e-6, density=1800.0)
+    matrix = composite.Material(2, 3.5e9, 0.35, 50e-6, density=1200.0)
+    z = interface_coordinates([0.0002] * PLIES_PER_LAMINATE)
+
+    laminates = []
+    for _ in range(plies // PLIES_PER_LAMINATE):
+        laminae = [composite.Lamina(position + 1, 0.0002, matrix, fibre, 0.6, 45.0 * (position % 4),
+                                    [float(z[position]), float(z[position + 1])])
+                   for position in range(PLIES_PER_LAMINATE)]
+        laminates.append(composite.Laminate(laminae))
+
+    return laminates
+
+
+def measure(plies):
+    """Returns the bytes allocated per ply and the number of objects freed by the cyclic collector"""
+
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+
+    laminates = build(plies)
+    allocated = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+    del laminates
+    cyclic = gc.collect()
+    gc.enable()
+
+    return allocated / plies, cyclic / plies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the memory held per ply')
+    parser.add_argument('--plies', type=int, default=100000, help='Number of plies to build')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    arguments = parser.parse_args()
+
+    bytes_per_ply, cyclic_per_ply = measure(arguments.plies)
+
+    if arguments.json:
+        print(json.dumps({'bytes_per_ply': bytes_per_ply, 'cyclic_objects_per_ply': cyclic_per_ply}))
+        return
+
+    print('{:>10.0f} bytes per ply'.format(bytes_per_ply))
+    print('{:>10.1f} objects per ply freed by the cyclic garbage collector'.format(cyclic_per_ply))
+
+
+if __name__ == '__main__':
+    main()
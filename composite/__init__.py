@@ -5,13 +5,87 @@ Year: 2020
 
 Classes:
 
+Only the numerical core is imported with the package. Exporters, plotting, caching and the sweep and parallel tools
+are imported on first access of one of their names, see _LAZY_IMPORTS.
+
 """
+import importlib
+
 version = "1.0.0"
 
-from . lamina import Lamina, LocalLaminaProperties, GlobalLaminaProperties
+from . lamina import Lamina, OrthotropicLamina, LocalLaminaProperties, GlobalLaminaProperties
 from . laminate import Laminate, LoadType, Quantity
 from . parser import read_input_file
 from . material import Material
-from . plot_tools import plot_stress
-from . print_tools import FilePrint, ExcelPrint
+from . precision import PrecisionPolicy, DOUBLE, SINGLE, get_policy, set_policy, precision, compare_precision
+
+# Name to module for names imported on first access
+_LAZY_IMPORTS = {
+    'plot_stress': 'plot_tools',
+    'FilePrint': 'print_tools',
+    'ExcelPrint': 'print_tools',
+    'ResultCache': 'cache',
+    'InputWatcher': 'watch',
+    'InputChanges': 'watch',
+    'Sweep': 'sweep',
+    'SweepParameter': 'sweep',
+    'SweepResult': 'sweep',
+    'ChunkReport': 'sweep',
+    'ParallelSolver': 'parallel',
+    'SharedArray': 'parallel',
+    'LaminateDefinition': 'solver',
+    'Loads': 'solver',
+    'LaminateResult': 'solver',
+    'LoadCaseResult': 'solver',
+    'solve': 'solver',
+    'solve_all': 'solver',
+    'Plate': 'plate',
+    'PlateResult': 'plate',
+    'UniformLoad': 'plate',
+    'SinusoidalLoad': 'plate',
+    'PatchLoad': 'plate',
+    'PointLoad': 'plate',
+    'biaxial_buckling': 'buckling',
+    'shear_buckling': 'buckling',
+    'natural_frequencies': 'vibration',
+    'laminate_frequencies': 'vibration',
+    'NastranExport': 'shell_sections',
+    'AbaqusExport': 'shell_sections',
+    'export_shell_sections': 'shell_sections',
+    'BulkDataIndex': 'bulk_data',
+    'read_bulk_data': 'bulk_data',
+    'MaterialLibrary': 'material_library',
+    'BatchInput': 'batch',
+    'BatchResult': 'batch',
+    'read_batch_file': 'batch',
+    'compare_results': 'compare',
+    'Comparison': 'compare',
+    'EngineeringConstants': 'constants',
+    'engineering_constants': 'constants',
+    'laminate_constants': 'constants',
+    'enumerate_stacking_sequences': 'enumeration',
+    'EnumerationResult': 'enumeration',
+    'ZonedLaminate': 'zones',
+    'ZoneResult': 'zones',
+    'read_zone_file': 'zones',
+    'ResultIndex': 'query',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS.values():
+        # Submodules, e.g. composite.sweep
+        value = importlib.import_module('.' + name, __name__)
+    elif name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module('.' + _LAZY_IMPORTS[name], __name__), name)
+    else:
+        raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
+
+    # Later lookups find the name directly
+    globals()[name] = value
+
+    return value
+
 
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
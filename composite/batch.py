@@ -0,0 +1,334 @@
+"""Batch input files describing many laminates and load cases.
+
+A batch file is a JSON document
+
+    {
+        "materials": {"1": {"modulus": 350e9, "poisson_ratio": 0.2, "thermal_coefficient": -1e-6}, ...},
+        "laminates": [{"name": "quasi-isotropic", "laminae": [[0.0002, 0, 1, 2, 0.65], ...]}, ...],
+        "load_cases": [{"name": "cure", "N": [0, 0, 0], "M": [0, 0, 0], "delta_T": -95}, ...],
+        "cases": [[0, 0], [0, 1], ...]
+    }
+
+where each lamina row is thickness, angle, fibre material, matrix material and volume fraction as in the LAMINAE
+section of the input files, listed from the bottom. Materials may also hold a density. "cases" pairs laminate and
+load case positions and defaults to every combination. Names are optional.
+
+The document is checked in one pass, collecting every error before raising, and is loaded directly into arrays
+padded to the largest number of plies, with plies of zero thickness on top of the smaller laminates, so that all
+cases are solved with a few vectorized calls.
+
+"""
+
+import json
+from numbers import Real
+
+import numpy as np
+
+from . stack import composite_properties, local_stiffness, global_properties, transformation_matrices, \
+    interface_coordinates, stiffness_matrices, thermal_forces, solve_load_cases
+from . constants import ply_constants
+from . laminate import LoadType
+from . query import ResultIndex, COMPONENTS
+
+MATERIAL_KEYS = {'modulus': True, 'poisson_ratio': True, 'thermal_coefficient': True, 'density': False}
+LOAD_KEYS = ('N', 'M', 'delta_T')
+LAMINA_COLUMNS = ('thickness', 'angle', 'fibre_material', 'matrix_material', 'volume_fraction')
+
+RESULTS = ('stress_global', 'stress_local', 'strains_global', 'strains_local')
+
+
+def is_number(value):
+    return isinstance(value, Real) and not isinstance(value, bool)
+
+
+def is_integer_key(key):
+    """Checks that a key is an integer written without sign or leading zeros, e.g. "12" """
+
+    return isinstance(key, str) and key.isdigit() and str(int(key)) == key
+
+
+def validate_batch(data):
+    """Checks a batch document against the format described in the module documentation
+
+          :param data: Parsed batch document
+          :type data: dict
+          :returns: Error messages, each starting with the path of the offending value, empty if the document is valid
+          :rtype: list of str
+
+     """
+
+    if not isinstance(data, dict):
+        return ['$: must be an object']
+
+    errors = ['$.' + key + ': unknown key' for key in data if key not in ('materials', 'laminates', 'load_cases',
+                                                                          'cases')]
+
+    materials = data.get('materials')
+    if not isinstance(materials, dict) or not materials:
+        errors.append('$.materials: must be a non-empty object')
+        materials = {}
+
+    for index, material in materials.items():
+        path = '$.materials.' + str(index)
+        if not is_integer_key(index):
+            errors.append(path + ': material keys must be integers')
+        if not isinstance(material, dict):
+            errors.append(path + ': must be an object')
+            continue
+        for key, required in MATERIAL_KEYS.items():
+            if key not in material:
+                if required:
+                    errors.append(path + ': missing ' + key)
+            elif not is_number(material[key]):
+                errors.append(path + '.' + key + ': must be a number')
+        errors += [path + '.' + key + ': unknown key' for key in material if key not in MATERIAL_KEYS]
+
+    laminates = data.get('laminates')
+    if not isinstance(laminates, list) or not laminates:
+        errors.append('$.laminates: must be a non-empty array')
+        laminates = []
+
+    for position, laminate in enumerate(laminates):
+        path = '$.laminates[{}]'.format(position)
+        if not isinstance(laminate, dict) or not isinstance(laminate.get('laminae'), list) or not laminate['laminae']:
+            errors.append(path + ': must be an object with a non-empty laminae array')
+            continue
+        errors += [path + '.' + key + ': unknown key' for key in laminate if key not in ('name', 'laminae')]
+
+        for row_position, row in enumerate(laminate['laminae']):
+            row_path = '{}.laminae[{}]'.format(path, row_position)
+            if not isinstance(row, list) or len(row) != len(LAMINA_COLUMNS) or not all(map(is_number, row)):
+                errors.append(row_path + ': must be ' + ', '.join(LAMINA_COLUMNS))
+                continue
+            if row[0] <= 0:
+                errors.append(row_path + ': thickness must be positive')
+            if not 0 <= row[4] <= 1:
+                errors.append(row_path + ': volume_fraction must be between 0 and 1')
+            for column in (2, 3):
+                if not float(row[column]).is_integer():
+                    errors.append('{}: {} must be an integer'.format(row_path, LAMINA_COLUMNS[column]))
+                elif str(int(row[column])) not in materials:
+                    errors.append('{}: unknown {} {}'.format(row_path, LAMINA_COLUMNS[column], row[column]))
+
+    load_cases = data.get('load_cases', [{}])
+    if not isinstance(load_cases, list) or not load_cases:
+        errors.append('$.load_cases: must be a non-empty array')
+        load_cases = []
+
+    for position, load_case in enumerate(load_cases):
+        path = '$.load_cases[{}]'.format(position)
+        if not isinstance(load_case, dict):
+            errors.append(path + ': must be an object')
+            continue
+        for key in ('N', 'M'):
+            if key in load_case and not (isinstance(load_case[key], list) and len(load_case[key]) <= 3
+                                         and all(map(is_number, load_case[key]))):
+                errors.append(path + '.' + key + ': must be an array of at most three numbers')
+        if 'delta_T' in load_case and not is_number(load_case['delta_T']):
+            errors.append(path + '.delta_T: must be a number')
+        errors += [path + '.' + key + ': unknown key' for key in load_case if key not in LOAD_KEYS + ('name',)]
+
+    if 'cases' in data:
+        if not isinstance(data['cases'], list):
+            errors.append('$.cases: must be an array')
+        else:
+            for position, case in enumerate(data['cases']):
+                if not (isinstance(case, list) and len(case) == 2 and all(isinstance(value, int) for value in case)
+                        and 0 <= case[0] < len(laminates) and 0 <= case[1] < len(load_cases)):
+                    errors.append('$.cases[{}]: must be a laminate and a load case position'.format(position))
+
+    return errors
+
+
+class BatchInput:
+    """Laminates and load cases of a batch document as padded arrays
+
+          :param data: Parsed batch document, see validate_batch
+          :type data: dict
+
+          :ivar names: Laminate names
+          :ivar load_case_names: Load case names
+          :ivar sizes: Number of plies of each laminate, dim=nr_laminates
+          :ivar thickness: Ply thicknesses from the bottom, zero for padding, dim=nr_laminates,max_plies
+          :ivar angle: Ply angles, dim=nr_laminates,max_plies
+          :ivar volume_fraction: Fibre volume fractions, dim=nr_laminates,max_plies
+          :ivar fibre: Modulus, poisson ratio and thermal coefficient of the fibres, dim=3,nr_laminates,max_plies
+          :ivar matrix: Modulus, poisson ratio and thermal coefficient of the matrix, dim=3,nr_laminates,max_plies
+          :ivar loads: Mechanical load vectors [N, M], dim=nr_load_cases,6
+          :ivar delta_T: Temperature differences, dim=nr_load_cases
+          :ivar cases: Laminate and load case of each case, dim=nr_cases,2
+
+     """
+
+    def __init__(self, data):
+        errors = validate_batch(data)
+        if errors:
+            raise ValueError('Invalid batch input:\n' + '\n'.join(errors))
+
+        laminates = data['laminates']
+        load_cases = data.get('load_cases', [{}])
+
+        self.names = [laminate.get('name', str(position)) for position, laminate in enumerate(laminates)]
+        self.load_case_names = [load_case.get('name', str(position)) for position, load_case in enumerate(load_cases)]
+        self.sizes = np.array([len(laminate['laminae']) for laminate in laminates])
+
+        # Pad by repeating the top ply with zero thickness, so the padding has valid properties
+        rows = np.empty((len(laminates), self.sizes.max(), len(LAMINA_COLUMNS)))
+        for position, laminate in enumerate(laminates):
+            size = self.sizes[position]
+            rows[position, :size] = laminate['laminae']
+            rows[position, size:] = laminate['laminae'][-1]
+            rows[position, size:, 0] = 0.0
+
+        self.thickness, self.angle = rows[..., 0], rows[..., 1]
+        self.volume_fraction = rows[..., 4]
+
+        # Material properties by material index, dim=nr_materials,3
+        indices = sorted(int(index) for index in data['materials'])
+        properties = np.array([[data['materials'][str(index)][key] for key in ('modulus', 'poisson_ratio',
+                                                                               'thermal_coefficient')]
+                               for index in indices])
+        self.fibre = properties[np.searchsorted(indices, rows[..., 2].astype(int))].transpose(2, 0, 1)
+        self.matrix = properties[np.searchsorted(indices, rows[..., 3].astype(int))].transpose(2, 0, 1)
+
+        self.loads = np.zeros((len(load_cases), 6))
+        self.delta_T = np.array([float(load_case.get('delta_T', 0.0)) for load_case in load_cases])
+        for position, load_case in enumerate(load_cases):
+            for offset, key in ((0, 'N'), (3, 'M')):
+                values = load_case.get(key, [])
+                self.loads[position, offset:offset + len(values)] = values
+
+        if 'cases' in data:
+            self.cases = np.array(data['cases'], dtype=int).reshape(-1, 2)
+        else:
+            self.cases = np.stack(np.meshgrid(np.arange(len(laminates)), np.arange(len(load_cases)),
+                                              indexing='ij'), axis=-1).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.cases)
+
+    def ply_stack(self):
+        """Computes the ply stiffness, thermal coefficients and interface coordinates of every laminate
+
+              :returns: Q_bar, dim=nr_laminates,max_plies,3,3, alpha, dim=nr_laminates,max_plies,3, and z,
+                        dim=nr_laminates,max_plies+1
+              :rtype: Tuple of ndarrays
+
+         """
+
+        E_L, E_T, v_LT, _, G_LT, alpha_L, alpha_T = composite_properties(
+            self.fibre[0], self.matrix[0], self.fibre[1], self.matrix[1], self.volume_fraction,
+            self.fibre[2], self.matrix[2])
+        Q_bar, alpha = global_properties(local_stiffness(E_L, E_T, v_LT, G_LT), alpha_L, alpha_T, self.angle)
+
+        return Q_bar, alpha, interface_coordinates(self.thickness)
+
+    def engineering_constants(self):
+        """Computes the engineering constants of every laminate, see constants.EngineeringConstants
+
+            The padding plies have zero thickness and do not contribute.
+
+              :returns: Constants with one value per laminate
+              :rtype: EngineeringConstants
+
+         """
+
+        return ply_constants(*self.ply_stack())
+
+    def solve(self):
+        """Solves thermal and combined loading of every case, see BatchResult"""
+
+        return BatchResult(self)
+
+
+class BatchResult:
+    """Results of all cases of a batch, following Laminate.compute_thermal_stress and Laminate.compute_total_stress
+
+        Face results of the padding plies are included and should be cut off with the laminate sizes, as done by
+        case.
+
+          :param batch: Batch to solve
+          :type batch: BatchInput
+
+          :ivar A, B, D: Stiffness matrices of each laminate, dim=nr_laminates,3,3
+          :ivar z: Interface coordinates of each laminate, dim=nr_laminates,max_plies+1
+          :ivar strains: Mid-plane strains and curvatures of each case, dim=2,nr_cases,6 with thermal first
+          :ivar stress_global, stress_local, strains_global, strains_local: Results of each case as in
+                create_laminate_arrays, dim=2,nr_cases,3,max_plies*2
+
+     """
+
+    def __init__(self, batch):
+        self.batch = batch
+        laminate, load_case = batch.cases.T
+
+        Q_bar, alpha, self.z = batch.ply_stack()
+        self.A, self.B, self.D = stiffness_matrices(Q_bar, self.z)
+
+        T1, T2 = transformation_matrices(batch.angle)
+
+        thermal_loads = batch.delta_T[load_case, np.newaxis] * thermal_forces(Q_bar, alpha, self.z)[laminate]
+        self.strains, results = solve_load_cases(Q_bar[laminate], alpha[laminate], T1[laminate], T2[laminate],
+                                                 self.z[laminate], self.A[laminate], self.B[laminate],
+                                                 self.D[laminate], thermal_loads, batch.loads[load_case],
+                                                 batch.delta_T[load_case])
+
+        for name in RESULTS:
+            setattr(self, name, np.stack((results['thermal'][name], results['combined'][name])))
+
+    def case(self, position):
+        """Returns the results of one case without the padding plies
+
+              :param position: Position of the case
+              :type position: int
+              :returns: Laminate name, load case name, A, B, D and the thermal and combined strains and stress
+              :rtype: dict
+
+         """
+
+        laminate, load_case = self.batch.cases[position]
+        columns = 2 * self.batch.sizes[laminate]
+        result = {'laminate': self.batch.names[laminate], 'load_case': self.batch.load_case_names[load_case],
+                  'A': self.A[laminate], 'B': self.B[laminate], 'D': self.D[laminate]}
+
+        for index, load_type in enumerate(('thermal', 'combined')):
+            result[load_type] = {'midplane_strains': self.strains[index, position, :3],
+                                 'curvatures': self.strains[index, position, 3:]}
+            for name in RESULTS:
+                result[load_type][name] = getattr(self, name)[index, position, :, :columns]
+
+        return result
+
+    def index(self, load_type=LoadType.combined, name='stress_global'):
+        """Returns the index of the extrema of a result array over all cases, see query.ResultIndex
+
+            The padding plies are left out.
+
+              :param load_type: Load type of the results
+              :type load_type: LoadType
+              :param name: One of stress_global, stress_local, strains_global and strains_local
+              :type name: str
+              :rtype: ResultIndex
+
+         """
+
+        laminate = self.batch.cases[:, 0]
+        values = getattr(self, name)[0 if load_type == LoadType.thermal else 1]
+        padding = np.arange(values.shape[-1]) >= 2 * self.batch.sizes[laminate, np.newaxis]
+
+        return ResultIndex.build(np.where(padding[:, np.newaxis], np.nan, values), self.batch.angle[laminate],
+                                 COMPONENTS[name])
+
+
+def read_batch_file(filepath):
+    """Reads and checks a batch file
+
+          :param filepath: JSON batch file
+          :type filepath: str or Path
+          :returns: batch
+          :rtype: BatchInput
+
+     """
+
+    with open(filepath, 'r') as file:
+        return BatchInput(json.load(file))
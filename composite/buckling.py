@@ -0,0 +1,156 @@
+"""Buckling loads of rectangular simply supported plates of specially orthotropic laminates.
+
+All functions broadcast over stacks of bending matrices, plate dimensions and load ratios, so the critical loads of
+many laminates, aspect ratios and load combinations are computed in a few NumPy calls. Loads are positive in
+compression.
+
+Biaxial compression Nx = -lambda nx, Ny = -lambda ny buckles in the sine mode (m, n) with the lowest
+
+    lambda_mn = (D11 alpha_m^4 + 2 (D12 + 2 D66) alpha_m^2 beta_n^2 + D22 beta_n^4) / (nx alpha_m^2 + ny beta_n^2)
+
+Shear has no single mode solution, its critical load is found with the Ritz method on a double sine series.
+
+"""
+
+import numpy as np
+
+from . plate import mode_stiffness
+from . stack import composite_properties, local_stiffness, global_properties, interface_coordinates, \
+    stiffness_matrices
+
+
+def bending_matrices(plies):
+    """Computes the bending matrices of a stack of cases, e.g. the ply properties of Sweep.case_inputs
+
+          :param plies: Ply properties Ef, Em, vf, vm, alpha_f, alpha_m, volume_fraction, angle and thickness
+          :type plies: dict of ndarray(dtype=float, dim=cases,nr_laminae)
+          :returns: D
+          :rtype: ndarray(dtype=float, dim=cases,3,3)
+
+     """
+
+    E_L, E_T, v_LT, _, G_LT, alpha_L, alpha_T = composite_properties(
+        plies['Ef'], plies['Em'], plies['vf'], plies['vm'], plies['volume_fraction'], plies['alpha_f'],
+        plies['alpha_m'])
+    Q_bar = global_properties(local_stiffness(E_L, E_T, v_LT, G_LT), alpha_L, alpha_T, plies['angle'])[0]
+
+    return stiffness_matrices(Q_bar, interface_coordinates(plies['thickness']))[2]
+
+
+def biaxial_buckling(D, a, b, nx=1.0, ny=0.0, modes=(20, 20)):
+    """Computes the critical load factors of biaxial compression
+
+        D, a, b, nx and ny broadcast, e.g. D of dim=laminates,1,1,3,3 with a of dim=aspect_ratios,1 and nx of
+        dim=load_ratios gives results of dim=laminates,aspect_ratios,load_ratios. Modes without compression in
+        their direction of load never buckle.
+
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param a: Length of the plates in x direction
+          :type a: float or ndarray(dtype=float)
+          :param b: Length of the plates in y direction
+          :type b: float or ndarray(dtype=float)
+          :param nx: Load in x direction per unit load factor
+          :type nx: float or ndarray(dtype=float)
+          :param ny: Load in y direction per unit load factor
+          :type ny: float or ndarray(dtype=float)
+          :param modes: Largest number of half waves in x and y direction
+          :type modes: tuple of int
+          :returns: Critical load factors and the number of half waves m and n of the buckling modes
+          :rtype: ndarray(dtype=float), ndarray(dtype=int), ndarray(dtype=int)
+
+     """
+
+    D = np.asarray(D, dtype=float)
+    shape = np.broadcast_shapes(D.shape[:-2], np.shape(a), np.shape(b), np.shape(nx), np.shape(ny))
+
+    def expand(value):
+        # Trailing dimensions for the mode numbers
+        return np.broadcast_to(value, shape)[..., np.newaxis, np.newaxis]
+
+    m = np.arange(1, modes[0] + 1)[:, np.newaxis]
+    n = np.arange(1, modes[1] + 1)[np.newaxis, :]
+    alpha = m * np.pi / expand(a)
+    beta = n * np.pi / expand(b)
+
+    D = np.broadcast_to(D, shape + (3, 3))[..., np.newaxis, np.newaxis, :, :]
+    load = expand(nx) * alpha ** 2 + expand(ny) * beta ** 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factors = np.where(load > 0, mode_stiffness(D, alpha, beta) / load, np.inf)
+
+    flat = factors.reshape(shape + (-1,))
+    index = flat.argmin(axis=-1)
+    m_cr, n_cr = np.unravel_index(index, modes)
+
+    return np.take_along_axis(flat, index[..., np.newaxis], axis=-1)[..., 0], m_cr + 1, n_cr + 1
+
+
+def shear_coupling(terms):
+    """Returns the shear work matrices of the two uncoupled groups of a double sine series
+
+        The work of Nxy on w = sum c_mn sin(m pi x / a) sin(n pi y / b) is Nxy c^T H c where H couples modes (m, n)
+        and (p, q) with m + p and n + q odd. Modes with m + n even and odd are therefore independent. H does not
+        depend on the plate dimensions.
+
+          :param terms: Number of half waves in each direction
+          :type terms: int
+          :returns: Per group the numbers of half waves m and n and H
+          :rtype: list of tuples
+
+     """
+
+    m, n = np.meshgrid(np.arange(1, terms + 1), np.arange(1, terms + 1), indexing='ij')
+    m, n = m.ravel(), n.ravel()
+
+    groups = []
+    for parity in (0, 1):
+        selected = (m + n) % 2 == parity
+        p, q = m[selected], n[selected]
+        mp = p[:, np.newaxis], p[np.newaxis, :]
+        nq = q[:, np.newaxis], q[np.newaxis, :]
+        coupled = ((mp[0] + mp[1]) % 2 == 1) & ((nq[0] + nq[1]) % 2 == 1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            H = np.where(coupled, 4 * mp[0] * nq[0] * mp[1] * nq[1] / ((mp[1] ** 2 - mp[0] ** 2) *
+                                                                        (nq[0] ** 2 - nq[1] ** 2)), 0.0)
+        groups.append((p, q, H))
+
+    return groups
+
+
+def shear_buckling(D, a, b, terms=12):
+    """Computes the critical shear load Nxy with the Ritz method
+
+        The strain energy of the sine modes is diagonal, so the eigenvalue problem K c = -2 Nxy H c is solved as the
+        symmetric problem of K^-1/2 H K^-1/2 for each group of shear_coupling. The result converges from above as
+        terms increases.
+
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param a: Length of the plates in x direction
+          :type a: float or ndarray(dtype=float)
+          :param b: Length of the plates in y direction
+          :type b: float or ndarray(dtype=float)
+          :param terms: Number of half waves in each direction of the series
+          :type terms: int
+          :returns: Critical shear loads, equal for both signs of Nxy
+          :rtype: ndarray(dtype=float)
+
+     """
+
+    D = np.asarray(D, dtype=float)
+    shape = np.broadcast_shapes(D.shape[:-2], np.shape(a), np.shape(b))
+    a = np.broadcast_to(a, shape)[..., np.newaxis]
+    b = np.broadcast_to(b, shape)[..., np.newaxis]
+    D = np.broadcast_to(D, shape + (3, 3))[..., np.newaxis, :, :]
+
+    largest = np.zeros(shape)
+    for m, n, H in shear_coupling(terms):
+        # Diagonal of the stiffness matrix, dim=...,modes
+        K = a * b / 4 * mode_stiffness(D, m * np.pi / a, n * np.pi / b)
+        scale = 1 / np.sqrt(K)
+        eigenvalues = np.linalg.eigvalsh(scale[..., :, np.newaxis] * H * scale[..., np.newaxis, :])
+        largest = np.maximum(largest, np.abs(eigenvalues).max(axis=-1))
+
+    return 1 / (2 * largest)
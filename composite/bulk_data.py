@@ -0,0 +1,259 @@
+"""Import of laminates from Nastran bulk data.
+
+The file is scanned once, line by line, and the byte offset of every PCOMP and MAT8 entry is recorded by its id.
+Entries are only parsed when a laminate is requested, so one property of a large deck can be analysed without
+reading the rest of it. Small field, large field and free field entries are supported, with continuation lines
+either marked in the first field or left blank.
+
+PCOMP plies are listed from the bottom and become OrthotropicLamina instances with the properties of their MAT8
+material. The offset Z0 is not used, the laminates are referred to their mid-plane as elsewhere in the package.
+
+"""
+
+import re
+from pathlib import Path
+
+from . lamina import OrthotropicLamina
+from . laminate import Laminate
+from . stack import interface_coordinates
+
+# Exponent without E, e.g. 1.5+11 or -7.2-7
+IMPLICIT_EXPONENT = re.compile(r'(?<=[0-9.])([+-])')
+
+
+def nastran_float(text):
+    """Parses a Nastran real number, blank fields are returned as None
+
+          :param text: Field to parse, e.g. 1.5+11, 2.E-6, 3.D0 or .25
+          :type text: str
+          :returns: value
+          :rtype: float
+
+     """
+
+    text = text.strip().upper().replace('D', 'E')
+    if not text:
+        return None
+
+    if 'E' not in text:
+        text = IMPLICIT_EXPONENT.sub(r'E\1', text, count=1)
+
+    return float(text)
+
+
+def entry_name(line):
+    """Returns the name of the entry starting on line, None for comments and continuation lines"""
+
+    if not line[:1].isalpha():
+        return None
+
+    return re.split(r'[ ,*\t]', line, maxsplit=1)[0].upper()
+
+
+def line_fields(line):
+    """Splits a line of an entry into its data fields, the first field and the continuation field are dropped
+
+          :param line: Line with tabs expanded
+          :type line: str
+          :returns: Data fields, 8 for small field and 4 for large field lines
+          :rtype: list of str
+
+     """
+
+    line = line.rstrip('\r\n')
+
+    if ',' in line:
+        # Free field lines hold the fields of one line, missing fields are blank and the field after the data fields
+        # is the continuation field
+        items = [item.strip() for item in line.split(',')]
+        size = 4 if items[0].endswith('*') or items[0].startswith('*') else 8
+        return (items[1:size + 1] + [''] * size)[:size]
+
+    line = line.ljust(80)
+    if line[:8].rstrip().endswith('*') or line[0] == '*':
+        return [line[start:start + 16].strip() for start in range(8, 72, 16)]
+
+    return [line[start:start + 8].strip() for start in range(8, 72, 8)]
+
+
+def entry_fields(lines):
+    """Joins the data fields of all lines of an entry
+
+          :param lines: Lines of the entry, the first holding the entry name
+          :type lines: list of str
+          :returns: Data fields, blank fields are empty strings
+          :rtype: list of str
+
+     """
+
+    fields = []
+    for line in lines:
+        fields += line_fields(line.expandtabs(8))
+
+    # Trailing blank fields are not part of the entry
+    while fields and not fields[-1]:
+        fields.pop()
+
+    return fields
+
+
+class BulkDataIndex:
+    """Index of the PCOMP and MAT8 entries of a Nastran bulk data file
+
+          :param filepath: Bulk data file
+          :type filepath: str or Path
+
+          :ivar properties: Byte offset of each PCOMP entry by property id
+          :ivar materials: Byte offset of each MAT8 entry by material id
+
+     """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.properties = {}
+        self.materials = {}
+        self.material_cache = {}
+        self.scan()
+
+    def __len__(self):
+        return len(self.properties)
+
+    def __contains__(self, property_id):
+        return property_id in self.properties
+
+    def __iter__(self):
+        return iter(self.properties)
+
+    def scan(self):
+        """Records the offsets of the indexed entries, only the first line of each entry is read"""
+
+        offsets = {'PCOMP': self.properties, 'MAT8': self.materials}
+
+        with open(self.filepath, 'rb') as file:
+            offset = 0
+            for raw_line in file:
+                first = raw_line[:1]
+
+                if first.isalpha():
+                    line = raw_line.decode('ascii', 'replace')
+                    name = entry_name(line)
+
+                    if name in offsets:
+                        fields = line_fields(line.expandtabs(8))
+                        if fields and fields[0]:
+                            offsets[name][int(fields[0])] = offset
+
+                offset += len(raw_line)
+
+    def read_entry(self, file, offset):
+        """Reads the lines of the entry starting at offset
+
+              :param file: Bulk data file opened in binary mode
+              :type file: file obj
+              :param offset: Byte offset of the first line of the entry
+              :type offset: int
+              :returns: Data fields of the entry
+              :rtype: list of str
+
+         """
+
+        file.seek(offset)
+        lines = [file.readline().decode('ascii', 'replace')]
+
+        for raw_line in file:
+            line = raw_line.decode('ascii', 'replace')
+
+            if line[:1] == '$' or not line.strip():
+                continue
+            if line[:1].isalpha():
+                break
+            lines.append(line)
+
+        return entry_fields(lines)
+
+    def material(self, file, material_id):
+        """Reads the MAT8 entry of material_id, once per index
+
+              :returns: E_L, E_T, v_LT, G_LT, alpha_L, alpha_T and density
+              :rtype: tuple of floats, the density is None if not given
+
+         """
+
+        if material_id not in self.material_cache:
+            if material_id not in self.materials:
+                raise KeyError('MAT8 {} is not defined in {}'.format(material_id, self.filepath))
+
+            fields = self.read_entry(file, self.materials[material_id]) + [''] * 10
+            E_1, E_2, nu_12, G_12, _, _, density, alpha_1, alpha_2 = (nastran_float(text) for text in fields[1:10])
+            self.material_cache[material_id] = (E_1, E_2, nu_12, G_12, alpha_1 or 0.0, alpha_2 or 0.0, density)
+
+        return self.material_cache[material_id]
+
+    def laminate(self, property_id):
+        """Creates the laminate of the PCOMP entry of property_id
+
+              :param property_id: PCOMP property id
+              :type property_id: int
+              :returns: Laminate of OrthotropicLamina instances, from the bottom
+              :rtype: Instance of Laminate
+
+         """
+
+        if property_id not in self.properties:
+            raise KeyError('PCOMP {} is not defined in {}'.format(property_id, self.filepath))
+
+        with open(self.filepath, 'rb') as file:
+            fields = self.read_entry(file, self.properties[property_id])
+            lam = fields[7].upper() if len(fields) > 7 else ''
+
+            # Blank material ids and thicknesses repeat the previous ply
+            plies = []
+            material_id, thickness = None, None
+            for start in range(8, len(fields), 4):
+                ply = fields[start:start + 4] + [''] * 4
+                material_id = int(ply[0]) if ply[0] else material_id
+                thickness = nastran_float(ply[1]) or thickness
+                plies.append((material_id, thickness, nastran_float(ply[2]) or 0.0))
+
+            if lam == 'SYM':
+                plies += plies[::-1]
+
+            materials = {material_id: self.material(file, material_id) for material_id, _, _ in plies}
+
+        z = interface_coordinates([thickness for _, thickness, _ in plies])
+
+        laminae = []
+        for position, (material_id, thickness, angle) in enumerate(plies):
+            *properties, density = materials[material_id]
+            laminae.append(OrthotropicLamina(position + 1, thickness, properties, angle,
+                                             [float(z[position]), float(z[position + 1])], density=density))
+
+        return Laminate(laminae)
+
+    def laminates(self, property_ids=None):
+        """Creates the laminates of property_ids one at a time
+
+              :param property_ids: PCOMP property ids, all in file order if None
+              :type property_ids: iterable of int
+              :returns: Generator of property id and laminate
+              :rtype: generator of (int, Instance of Laminate)
+
+         """
+
+        for property_id in (self.properties if property_ids is None else property_ids):
+            yield property_id, self.laminate(property_id)
+
+
+def read_bulk_data(filepath, property_id):
+    """Reads the laminate of one PCOMP entry of a Nastran bulk data file
+
+          :param filepath: Bulk data file
+          :type filepath: str or Path
+          :param property_id: PCOMP property id
+          :type property_id: int
+          :returns: Laminate of OrthotropicLamina instances
+          :rtype: Instance of Laminate
+
+     """
+
+    return BulkDataIndex(filepath).laminate(property_id)
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from . laminate import LoadType
+from . lamina import OrthotropicLamina
+from . precision import get_policy
+from . strain import StrainState
+from . stress import StressState
+from . coordinate_systems import CoordinateSystem
+
+# Version of the entry format and of the solution, increase when either changes the stored results
+CACHE_VERSION = 1
+
+
+def material_definition(material):
+    """Creates a JSON serializable description of a material
+
+          :param material: Material to describe
+          :type material: Instance of Material
+          :returns: definition
+          :rtype: dict
+
+     """
+
+    definition = {'index': material.index, 'modulus': material.modulus, 'poisson_ratio': material.poisson_ratio,
+                  'thermal_coefficient': material.thermal_coefficient}
+
+    if material.is_temperature_dependent:
+        definition['temperatures'] = material.temperatures.tolist()
+        definition['modulus'] = material.modulus_table.tolist()
+        definition['poisson_ratio'] = material.poisson_ratio_table.tolist()
+        definition['thermal_coefficient'] = material.thermal_coefficient_table.tolist()
+
+    return definition
+
+
+def laminate_definition(laminate):
+    """Creates a JSON serializable description of everything that affects the results of a laminate
+
+          :param laminate: Laminate to describe
+          :type laminate: Instance of Laminate
+          :returns: definition
+          :rtype: dict
+
+     """
+
+    materials = {}
+    plies = []
+
+    for lamina in laminate.laminae:
+        ply = {'thickness': lamina.thickness, 'angle': lamina.angle, 'coordinates': list(lamina.coordinates)}
+
+        # Laminae defined by their homogenised properties have no constituents
+        if isinstance(lamina, OrthotropicLamina):
+            ply['properties'] = list(lamina.properties)
+        else:
+            for material in (lamina.fibre_material, lamina.matrix_material):
+                materials[material.index] = material_definition(material)
+            ply.update({'fibre_material': lamina.fibre_material.index,
+                        'matrix_material': lamina.matrix_material.index, 'volume_fraction': lamina.volume_fraction})
+
+        plies.append(ply)
+
+    loads = {'moments': np.ravel(laminate.moments).tolist(), 'normal_forces': np.ravel(laminate.normal_forces).tolist(),
+             'shear_forces': np.ravel(laminate.shear_forces).tolist(),
+             'delta_T': np.ravel(laminate.delta_T).tolist(), 'reference_temperature': laminate.reference_temperature,
+             'thermal_steps': laminate.thermal_steps}
+
+    return {'materials': [materials[index] for index in sorted(materials)], 'plies': plies, 'loads': loads}
+
+
+class ResultCache:
+    """On-disk cache of laminate results keyed by a hash of the laminate definition
+
+          Each entry is a NumPy archive holding the thermal load vector and the result arrays of one load type, the
+          A, B and D matrices are not stored as the laminate computes them when it is built. The least recently used entries are removed when the total size exceeds max_size.
+
+          :param directory: Directory to store the entries in, defaults to ~/.cache/composite
+          :type directory: str or Path
+          :param max_size: Maximum total size of the entries in bytes
+          :type max_size: int
+
+     """
+
+    def __init__(self, directory=None, max_size=256 * 2**20):
+        if directory is None:
+            directory = Path.home().joinpath('.cache', 'composite')
+
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, laminate, load_type):
+        """Computes the cache key of the results of load_type
+
+            Combined results depend on the thermal load vector left by a previous thermal solution, so it is part
+            of the key of combined results.
+
+              :param laminate: Laminate to compute the key for
+              :type laminate: Instance of Laminate
+              :param load_type: Either thermal or combined
+              :type load_type: LoadType
+              :returns: Hexadecimal SHA-256 digest
+              :rtype: str
+
+         """
+
+        definition = laminate_definition(laminate)
+        definition['version'] = CACHE_VERSION
+        definition['load_type'] = load_type.name
+        policy = get_policy()
+        definition['precision'] = [policy.name, policy.storage.str, policy.accumulation.str]
+
+        if load_type == LoadType.combined:
+            definition['thermal_load_vector'] = np.ravel(laminate.thermal_load_vector).tolist()
+
+        return hashlib.sha256(json.dumps(definition, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key):
+        return self.directory.joinpath(key + '.npz')
+
+    def load(self, key):
+        """Loads the entry stored under key and marks it as recently used
+
+              :param key: Key of the entry
+              :type key: str
+              :returns: Stored arrays, None if the entry does not exist
+              :rtype: dict
+
+         """
+
+        path = self.path(key)
+
+        try:
+            with np.load(path) as archive:
+                data = {name: archive[name] for name in archive.files}
+        except (OSError, ValueError):
+            return None
+
+        os.utime(path)
+
+        return data
+
+    def store(self, key, **arrays):
+        """Stores arrays under key and evicts the least recently used entries if the cache is full
+
+              :param key: Key of the entry
+              :type key: str
+
+         """
+
+        # Write to a temporary file first so that concurrent readers never see partial entries, its suffix keeps it
+        # out of evict
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        with os.fdopen(file_descriptor, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_path, self.path(key))
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the total size is below max_size"""
+
+        entries = []
+        for path in self.directory.glob('*.npz'):
+            try:
+                status = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        """Removes all entries"""
+
+        for path in self.directory.glob('*.npz'):
+            path.unlink()
+
+    def compute(self, laminate, load_type):
+        """Computes the results of load_type, or restores them from the cache if the laminate is unchanged
+
+            The laminae are updated in both cases, so exporters reading the laminate give the same output.
+
+              :param laminate: Laminate to compute the results for
+              :type laminate: Instance of Laminate
+              :param load_type: Either thermal or combined
+              :type load_type: LoadType
+              :returns: mechanical_stress_global, mechanical_stress_local, mechanical_strains_global,
+                        mechanical_strains_local, z_coordinates
+              :rtype: StressState, StressState, StrainState, StrainState, ndarray(dtype=float, dim=nr_laminae*2)
+
+         """
+
+        key = self.key(laminate, load_type)
+        data = self.load(key)
+
+        if data is None:
+            if load_type == LoadType.thermal:
+                laminate.compute_thermal_stress()
+            else:
+                laminate.compute_total_stress()
+
+            arrays = laminate.create_laminate_arrays(load_type)
+            stress_global, stress_local, strains_global, strains_local, z_coordinates = arrays
+
+            # The interlaminar shear stress belongs to the combined solution
+            extra = {'interlaminar_shear_stress': laminate.interlaminar_shear_stress} \
+                if load_type == LoadType.combined else {}
+
+            self.store(key, thermal_load_vector=laminate.thermal_load_vector, stress_global=stress_global.components,
+                       stress_local=stress_local.components, strains_global=strains_global.components,
+                       strains_local=strains_local.components, z_coordinates=z_coordinates, **extra)
+
+            return arrays
+
+        laminate.thermal_load_vector = data['thermal_load_vector']
+        if 'interlaminar_shear_stress' in data:
+            laminate.interlaminar_shear_stress = data['interlaminar_shear_stress']
+        laminate.set_laminate_arrays(load_type, data['stress_global'], data['stress_local'],
+                                     data['strains_global'], data['strains_local'])
+
+        return (StressState(data['stress_global'], laminate.coordinate_system, load_type),
+                StressState(data['stress_local'], CoordinateSystem.LT, load_type),
+                StrainState(data['strains_global'], laminate.coordinate_system, load_type),
+                StrainState(data['strains_local'], CoordinateSystem.LT, load_type),
+                data['z_coordinates'])
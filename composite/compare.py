@@ -0,0 +1,350 @@
+"""Comparison of two result sets for regression validation.
+
+Result sets are read from FilePrint text files, ExcelPrint workbooks, NumPy archives (.npz, e.g. ResultCache
+entries) or directories of .npy files (e.g. Sweep output), or taken from a solved Laminate. Each result set maps a
+table name to an array with the components in the last dimension. Tables with the same name are compared component
+by component with a few array operations over all values, so millions of values are compared in well under a second.
+
+A value passes when |candidate - reference| <= atol + rtol * |reference|, as in numpy.isclose.
+
+Usage: python -m composite.compare REFERENCE CANDIDATE [--rtol RTOL] [--atol ATOL]
+
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Title lines of FilePrint, e.g. ======    COMBINED STRESS DATA    ======
+TITLE = re.compile(r'^=+\s{2,}(.*?)\s{2,}=+$')
+
+
+class ResultTable:
+    """Values of one table of a result set
+
+          :param values: Values with the components in the last dimension
+          :type values: ndarray(dtype=float, dim=...,nr_components)
+          :param components: Names of the components
+          :type components: list of str
+
+     """
+
+    def __init__(self, values, components):
+        self.values = np.asarray(values)
+        self.components = list(components)
+
+    @property
+    def rows(self):
+        return self.values.reshape(-1, self.values.shape[-1])
+
+
+def add_table(tables, name, table):
+    """Adds table under name, numbering repeated names"""
+
+    key, count = name, 1
+    while key in tables:
+        count += 1
+        key = '{} ({})'.format(name, count)
+    tables[key] = table
+
+
+def read_text_results(filepath):
+    """Reads the tables of a FilePrint result file
+
+        The tables are named by their section title and component columns, e.g.
+        COMBINED STRESS DATA: STRESS_X, STRESS_Y, STRESS_XY. The index, angle and z coordinate columns are kept as
+        components, so differences in the lay up are reported as well.
+
+          :param filepath: Text result file
+          :type filepath: str or Path
+          :returns: Tables by name
+          :rtype: dict of ResultTable
+
+     """
+
+    tables = {}
+    title, header, rows = None, None, []
+
+    def finish():
+        if header is not None and rows:
+            values = np.array(' '.join(rows).split(), dtype=float).reshape(-1, len(header))
+            add_table(tables, '{}: {}'.format(title, ', '.join(header[3:])), ResultTable(values, header))
+
+    with open(filepath, 'r') as file:
+        for line in file:
+            stripped = line.strip()
+            match = TITLE.match(stripped)
+
+            if match:
+                finish()
+                title, header, rows = match.group(1), None, []
+            elif title is None or not stripped or stripped == '.':
+                continue
+            elif stripped[0].isalpha():
+                finish()
+                header, rows = stripped.split(), []
+            elif header is not None and (stripped[0].isdigit() or stripped[0] in '+-.'):
+                rows.append(stripped)
+
+    finish()
+
+    return tables
+
+
+def read_excel_results(filepath):
+    """Reads the sheets of an ExcelPrint workbook, named by the sheet names. Requires xlrd
+
+          :param filepath: Excel result file
+          :type filepath: str or Path
+          :returns: Tables by name
+          :rtype: dict of ResultTable
+
+     """
+
+    import xlrd
+
+    tables = {}
+    workbook = xlrd.open_workbook(str(filepath))
+
+    for sheet in workbook.sheets():
+        if sheet.nrows < 2 or sheet.name == 'Project Info':
+            continue
+        header = [str(value) for value in sheet.row_values(0)]
+        values = np.array([sheet.row_values(row) for row in range(1, sheet.nrows)], dtype=float)
+        add_table(tables, sheet.name, ResultTable(values, header))
+
+    return tables
+
+
+def array_table(values):
+    """Creates a table of an array, arrays laid out as create_laminate_arrays, dim=...,3,n, have 3 components"""
+
+    values = np.asarray(values)
+
+    if values.ndim >= 2 and values.shape[-2] == 3:
+        values = np.swapaxes(values, -1, -2)
+    elif values.ndim < 2:
+        values = values.reshape(-1, 1)
+
+    return ResultTable(values, [str(index) for index in range(values.shape[-1])])
+
+
+def read_binary_results(path):
+    """Reads the arrays of a NumPy archive or a directory of .npy files, named by the array names
+
+          :param path: .npz file or directory
+          :type path: str or Path
+          :returns: Tables by name
+          :rtype: dict of ResultTable
+
+     """
+
+    path = Path(path)
+
+    if path.is_dir():
+        return {file.stem: array_table(np.load(file, mmap_mode='r')) for file in sorted(path.glob('*.npy'))}
+
+    with np.load(path) as archive:
+        return {name: array_table(archive[name]) for name in archive.files}
+
+
+def laminate_results(laminate, load_type=None):
+    """Collects the results stored on a solved laminate, named as the ResultCache arrays
+
+          :param laminate: Laminate after compute_thermal_stress and compute_total_stress
+          :type laminate: Instance of Laminate
+          :param load_type: Load type to collect, with the names of a ResultCache entry. Both load types, with the
+                            names prefixed by thermal/ and combined/, if None
+          :type load_type: LoadType
+          :returns: Tables by name
+          :rtype: dict of ResultTable
+
+     """
+
+    # Imported here to keep the module usable on result files alone
+    from . laminate import LoadType
+
+    tables = {'A': array_table(laminate.A), 'B': array_table(laminate.B), 'D': array_table(laminate.D)}
+
+    for current in ((LoadType.thermal, LoadType.combined) if load_type is None else (load_type,)):
+        prefix = current.name + '/' if load_type is None else ''
+        arrays = laminate.create_laminate_arrays(current)
+        for name, array in zip(('stress_global', 'stress_local', 'strains_global', 'strains_local'), arrays):
+            tables[prefix + name] = array_table(array.components)
+
+    return tables
+
+
+def read_results(path):
+    """Reads a result set, the format is given by the suffix: .txt, .xls, .npz or a directory of .npy files"""
+
+    path = Path(path)
+
+    if path.is_dir() or path.suffix == '.npz':
+        return read_binary_results(path)
+    if path.suffix in ('.xls', '.xlsx'):
+        return read_excel_results(path)
+
+    return read_text_results(path)
+
+
+class ComponentDifference:
+    """Differences of one component of a table
+
+          :ivar table: Name of the table
+          :ivar component: Name of the component
+          :ivar max_absolute: Largest absolute difference
+          :ivar max_absolute_row: Row of the largest absolute difference
+          :ivar max_relative: Largest difference relative to the reference value, over non-zero reference values
+          :ivar max_relative_row: Row of the largest relative difference
+          :ivar failures: Number of values outside the tolerances
+          :ivar worst_row: Row exceeding the tolerance the most, None if all values pass
+
+     """
+
+    def __init__(self, table, component, max_absolute, max_absolute_row, max_relative, max_relative_row, failures,
+                 worst_row):
+        self.table = table
+        self.component = component
+        self.max_absolute = max_absolute
+        self.max_absolute_row = max_absolute_row
+        self.max_relative = max_relative
+        self.max_relative_row = max_relative_row
+        self.failures = failures
+        self.worst_row = worst_row
+
+    @property
+    def passed(self):
+        return self.failures == 0
+
+
+class Comparison:
+    """Comparison of a candidate result set with a reference result set
+
+          :param reference: Tables of the reference
+          :type reference: dict of ResultTable
+          :param candidate: Tables of the candidate
+          :type candidate: dict of ResultTable
+          :param rtol: Relative tolerance
+          :type rtol: float
+          :param atol: Absolute tolerance
+          :type atol: float
+
+          :ivar differences: One ComponentDifference per component of the tables in both sets
+          :ivar missing: Tables of the reference that are not in the candidate
+          :ivar extra: Tables of the candidate that are not in the reference
+          :ivar mismatched: Tables present in both sets with different shapes
+
+     """
+
+    def __init__(self, reference, candidate, rtol=1e-6, atol=0.0):
+        self.rtol = rtol
+        self.atol = atol
+        self.missing = [name for name in reference if name not in candidate]
+        self.extra = [name for name in candidate if name not in reference]
+        self.mismatched = []
+        self.differences = []
+
+        for name, table in reference.items():
+            if name not in candidate:
+                continue
+            if table.rows.shape != candidate[name].rows.shape:
+                self.mismatched.append(name)
+                continue
+            self.differences += self.compare_table(name, table, candidate[name])
+
+    def compare_table(self, name, reference, candidate):
+        """Compares all components of a table at once"""
+
+        expected = reference.rows.astype(float)
+        actual = candidate.rows.astype(float)
+
+        absolute = np.abs(actual - expected)
+        magnitude = np.abs(expected)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.where(magnitude > 0, absolute / magnitude, 0.0)
+            excess = absolute - (self.atol + self.rtol * magnitude)
+
+        # NaN in either set fails unless both are NaN
+        both_nan = np.isnan(expected) & np.isnan(actual)
+        absolute[both_nan], relative[both_nan], excess[both_nan] = 0.0, 0.0, -np.inf
+        excess[np.isnan(excess)] = np.inf
+
+        absolute_rows = np.argmax(np.where(np.isnan(absolute), np.inf, absolute), axis=0)
+        relative_rows = np.argmax(np.where(np.isnan(relative), np.inf, relative), axis=0)
+        worst_rows = np.argmax(excess, axis=0)
+        failures = np.count_nonzero(excess > 0, axis=0)
+        columns = np.arange(expected.shape[1])
+
+        return [ComponentDifference(name, component, float(absolute[absolute_rows[index], index]),
+                                    int(absolute_rows[index]), float(relative[relative_rows[index], index]),
+                                    int(relative_rows[index]), int(failures[index]),
+                                    int(worst_rows[index]) if failures[index] else None)
+                for index, component in zip(columns, reference.components)]
+
+    @property
+    def passed(self):
+        return not (self.missing or self.mismatched) and all(difference.passed for difference in self.differences)
+
+    def failed(self):
+        """Returns the differences of the components outside the tolerances"""
+
+        return [difference for difference in self.differences if not difference.passed]
+
+    def report(self):
+        """Formats the comparison as a text table, one line per component"""
+
+        lines = ['{:<60}{:>14}{:>8}{:>14}{:>8}{:>10}'.format('TABLE / COMPONENT', 'MAX ABS', 'ROW', 'MAX REL', 'ROW',
+                                                             'FAILED')]
+
+        for difference in self.differences:
+            lines.append('{:<60}{:>14.4e}{:>8}{:>14.4e}{:>8}{:>10}'.format(
+                (difference.table + ' / ' + difference.component)[:59], difference.max_absolute,
+                difference.max_absolute_row, difference.max_relative, difference.max_relative_row,
+                difference.failures))
+
+        lines += ['Missing in candidate: ' + name for name in self.missing]
+        lines += ['Only in candidate: ' + name for name in self.extra]
+        lines += ['Different shapes: ' + name for name in self.mismatched]
+        lines.append('{} (rtol={:g}, atol={:g})'.format('PASSED' if self.passed else 'FAILED', self.rtol, self.atol))
+
+        return '\n'.join(lines)
+
+
+def compare_results(reference, candidate, rtol=1e-6, atol=0.0):
+    """Compares two result sets, given as paths (see read_results), solved laminates or dictionaries of tables
+
+          :returns: comparison
+          :rtype: Comparison
+
+     """
+
+    def tables(results):
+        if isinstance(results, dict):
+            return results
+        if hasattr(results, 'laminae'):
+            return laminate_results(results)
+        return read_results(results)
+
+    return Comparison(tables(reference), tables(candidate), rtol, atol)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Compares two result sets component by component')
+    parser.add_argument('reference', type=Path, help='Reference results, .txt, .xls, .npz or a directory of .npy')
+    parser.add_argument('candidate', type=Path, help='Results to validate, in any of the reference formats')
+    parser.add_argument('--rtol', type=float, default=1e-6, help='Relative tolerance')
+    parser.add_argument('--atol', type=float, default=0.0, help='Absolute tolerance')
+    arguments = parser.parse_args(arguments)
+
+    comparison = compare_results(arguments.reference, arguments.candidate, arguments.rtol, arguments.atol)
+    print(comparison.report())
+
+    return 0 if comparison.passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Apparent engineering constants of laminates from the inverted ABD matrix.
+
+With the compliance [[a, b], [b^T, d]] = [[A, B], [B, D]]^-1 and the laminate thickness h the in-plane constants are
+
+    Ex = 1 / (h a11), Ey = 1 / (h a22), Gxy = 1 / (h a66), nu_xy = -a12 / a11, nu_yx = -a12 / a22
+
+and the flexural constants follow from d with h^3 / 12 instead of h. The thermal expansion coefficients are the
+mid-plane strains, and the thermal curvature coefficients the curvatures, of a free laminate per unit temperature
+difference. All functions broadcast over leading dimensions, so the constants of millions of laminates are computed
+with a few array operations.
+
+"""
+
+import numpy as np
+
+from . stack import stiffness_matrix, stiffness_matrices, thermal_forces
+
+NAMES = ('Ex', 'Ey', 'Gxy', 'nu_xy', 'nu_yx', 'Efx', 'Efy', 'Gfxy', 'nu_fxy', 'nu_fyx', 'alpha', 'beta')
+
+
+def compliance_matrices(A, B, D):
+    """Inverts the laminate stiffness matrices
+
+          :returns: Compliance matrices [[a, b], [b^T, d]]
+          :rtype: ndarray(dtype=float, dim=...,6,6)
+
+     """
+
+    return np.linalg.inv(np.asarray(stiffness_matrix(A, B, D), dtype=float))
+
+
+class EngineeringConstants:
+    """Apparent engineering constants of one or many laminates, each attribute has the shape of the laminates
+
+          :param compliance: Compliance matrices, see compliance_matrices
+          :type compliance: ndarray(dtype=float, dim=...,6,6)
+          :param thickness: Laminate thicknesses
+          :type thickness: float or ndarray(dtype=float, dim=...)
+          :param thermal_load: Thermal forces and moments per unit temperature difference, see stack.thermal_forces.
+                               The thermal coefficients are NaN if None
+          :type thermal_load: ndarray(dtype=float, dim=...,6)
+
+          :ivar Ex, Ey, Gxy, nu_xy, nu_yx: In-plane moduli and Poisson ratios
+          :ivar Efx, Efy, Gfxy, nu_fxy, nu_fyx: Flexural moduli and Poisson ratios
+          :ivar alpha: Thermal expansion coefficients [alpha_x, alpha_y, alpha_xy], dim=...,3
+          :ivar beta: Thermal curvature coefficients, dim=...,3
+
+     """
+
+    def __init__(self, compliance, thickness, thermal_load=None):
+        compliance = np.asarray(compliance, dtype=float)
+        h = np.asarray(thickness, dtype=float)
+        a, d = compliance[..., :3, :3], compliance[..., 3:, 3:]
+
+        self.Ex = 1 / (h * a[..., 0, 0])
+        self.Ey = 1 / (h * a[..., 1, 1])
+        self.Gxy = 1 / (h * a[..., 2, 2])
+        self.nu_xy = -a[..., 0, 1] / a[..., 0, 0]
+        self.nu_yx = -a[..., 0, 1] / a[..., 1, 1]
+
+        self.Efx = 12 / (h**3 * d[..., 0, 0])
+        self.Efy = 12 / (h**3 * d[..., 1, 1])
+        self.Gfxy = 12 / (h**3 * d[..., 2, 2])
+        self.nu_fxy = -d[..., 0, 1] / d[..., 0, 0]
+        self.nu_fyx = -d[..., 0, 1] / d[..., 1, 1]
+
+        if thermal_load is None:
+            strains = np.full(compliance.shape[:-1], np.nan)
+        else:
+            strains = np.einsum('...ij,...j->...i', compliance, np.asarray(thermal_load, dtype=float))
+        self.alpha, self.beta = strains[..., :3], strains[..., 3:]
+
+    def arrays(self):
+        """Returns the constants by name, e.g. for numpy.savez"""
+
+        return {name: getattr(self, name) for name in NAMES}
+
+    def __getitem__(self, index):
+        """Returns the constants of a subset of the laminates, e.g. constants[mask]"""
+
+        constants = EngineeringConstants.__new__(EngineeringConstants)
+        for name in NAMES:
+            setattr(constants, name, getattr(self, name)[index])
+
+        return constants
+
+
+def engineering_constants(A, B, D, thickness, thermal_load=None):
+    """Computes the engineering constants of laminates from their stiffness matrices
+
+          :param A: Extension matrices
+          :type A: ndarray(dtype=float, dim=...,3,3)
+          :param B: Coupling matrices
+          :type B: ndarray(dtype=float, dim=...,3,3)
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param thickness: Laminate thicknesses
+          :type thickness: float or ndarray(dtype=float, dim=...)
+          :param thermal_load: Thermal forces and moments per unit temperature difference
+          :type thermal_load: ndarray(dtype=float, dim=...,6)
+          :rtype: EngineeringConstants
+
+     """
+
+    return EngineeringConstants(compliance_matrices(A, B, D), thickness, thermal_load)
+
+
+def ply_constants(Q_bar, alpha, z):
+    """Computes the engineering constants of laminates from their ply stacks
+
+          :param Q_bar: Ply stiffness tensors in global coordinate system
+          :type Q_bar: ndarray(dtype=float, dim=...,n,3,3)
+          :param alpha: Ply thermal coefficients in global coordinate system
+          :type alpha: ndarray(dtype=float, dim=...,n,3)
+          :param z: Interface coordinates
+          :type z: ndarray(dtype=float, dim=...,n+1)
+          :rtype: EngineeringConstants
+
+     """
+
+    z = np.asarray(z, dtype=float)
+    A, B, D = stiffness_matrices(Q_bar, z)
+
+    return engineering_constants(A, B, D, z[..., -1] - z[..., 0], thermal_forces(Q_bar, alpha, z))
+
+
+def laminate_constants(laminates):
+    """Computes the engineering constants of several laminates in one call
+
+          :param laminates: Laminates to compute the constants of
+          :type laminates: list of instances of Laminate
+          :returns: Constants with one value per laminate
+          :rtype: EngineeringConstants
+
+     """
+
+    A = np.array([laminate.A for laminate in laminates], dtype=float)
+    B = np.array([laminate.B for laminate in laminates], dtype=float)
+    D = np.array([laminate.D for laminate in laminates], dtype=float)
+    thickness = np.array([laminate.thickness for laminate in laminates], dtype=float)
+    thermal_load = np.array([laminate.unit_thermal_load() for laminate in laminates], dtype=float)
+
+    return engineering_constants(A, B, D, thickness, thermal_load)
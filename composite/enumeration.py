@@ -0,0 +1,321 @@
+"""Exhaustive search of stacking sequences from a discrete set of ply angles.
+
+The plies, materials and thicknesses of a laminate are kept and every assignment of the angles to the plies is
+searched for the designs maximising an objective of the bending matrix D. The contribution of a ply to D depends only
+on its position and angle, Dk = Q_bar (z_k+1^3 - z_k^3) / 3, so the contributions of every position and angle are
+computed once and D of a partial stacking sequence is the sum of the contributions chosen so far.
+
+The objective is the smallest of a set of linear functions of D, sum(weights_k * D), e.g. a single stiffness term or
+the buckling load factors of several modes, see buckling_weights. Each function is bounded by the sum of the
+contributions chosen so far and the largest contributions of the remaining positions, and partial sequences whose
+bound cannot beat the best designs found are pruned. Positions are assigned from the surfaces inwards, where the
+contributions are largest, so the bounds tighten quickly.
+
+Duplicates are removed while enumerating:
+
+    * Symmetric laminates only enumerate the plies of the upper half, the lower half is mirrored
+    * Balanced laminates only keep sequences with as many -theta as +theta plies for each angle theta
+    * Non-symmetric laminates of a mirror symmetric lay up only keep one of a sequence and its reverse
+    * Otherwise, if the objective does not depend on D16 and D26, only one of a sequence and its sign flipped sequence
+      is kept
+
+Partial sequences are expanded a chunk at a time with array operations, depth first, so the memory held is bounded
+and good designs are found early.
+
+"""
+
+import copy
+
+import numpy as np
+
+from . stack import global_properties, interface_coordinates, stiffness_matrices
+
+# Largest number of designs whose stiffness matrices are computed at once
+CHUNK_SIZE = 2**14
+
+
+def normalize_angles(angles):
+    """Maps angles in degrees to (-90, 90]"""
+
+    angles = (np.asarray(angles, dtype=float) + 90) % 180 - 90
+    angles[angles == -90] = 90
+
+    return angles
+
+
+def buckling_weights(a, b, nx=1.0, ny=0.0, modes=(5, 5)):
+    """Computes objective weights of the biaxial buckling load factors of a simply supported specially orthotropic
+       plate, see buckling.biaxial_buckling
+
+          :param a: Length of the plate in x direction
+          :type a: float
+          :param b: Length of the plate in y direction
+          :type b: float
+          :param nx: Load in x direction per unit load factor, positive in compression
+          :type nx: float
+          :param ny: Load in y direction per unit load factor, positive in compression
+          :type ny: float
+          :param modes: Largest number of half waves in x and y direction
+          :type modes: tuple of int
+          :returns: Weights of each mode with compression in its direction of load
+          :rtype: ndarray(dtype=float, dim=nr_modes,3,3)
+
+     """
+
+    m, n = np.meshgrid(np.arange(1, modes[0] + 1), np.arange(1, modes[1] + 1), indexing='ij')
+    alpha, beta = (m.ravel() * np.pi / a) ** 2, (n.ravel() * np.pi / b) ** 2
+    load = nx * alpha + ny * beta
+    alpha, beta, load = alpha[load > 0], beta[load > 0], load[load > 0]
+
+    weights = np.zeros((len(load), 3, 3))
+    weights[:, 0, 0] = alpha ** 2 / load
+    weights[:, 1, 1] = beta ** 2 / load
+    weights[:, 0, 1] = weights[:, 1, 0] = alpha * beta / load
+    weights[:, 2, 2] = 4 * alpha * beta / load
+
+    return weights
+
+
+class EnumerationResult:
+    """Best stacking sequences found by enumerate_stacking_sequences
+
+          :ivar angles: Ply angles of each design from the bottom, dim=nr_designs,nr_laminae
+          :ivar values: Objective of each design, in descending order, dim=nr_designs
+          :ivar A, B, D: Stiffness matrices of each design, dim=nr_designs,3,3
+          :ivar nodes: Number of partial sequences expanded
+          :ivar leaves: Number of complete sequences evaluated
+
+     """
+
+    def __init__(self, template, angles, values, nodes, leaves):
+        self.template = template
+        self.angles = angles
+        self.values = values
+        self.nodes = nodes
+        self.leaves = leaves
+
+        laminae = template.laminae
+        Q = np.array([lamina.local_properties.Q for lamina in laminae])
+        alpha_L = np.array([lamina.alpha_L for lamina in laminae])
+        alpha_T = np.array([lamina.alpha_T for lamina in laminae])
+        z = interface_coordinates([lamina.thickness for lamina in laminae])
+
+        # In chunks, as the ply stiffness of every design is held while the matrices are summed
+        self.A, self.B, self.D = (np.empty((len(angles), 3, 3)) for _ in range(3))
+        for start in range(0, len(angles), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            self.A[chunk], self.B[chunk], self.D[chunk] = stiffness_matrices(
+                global_properties(Q, alpha_L, alpha_T, angles[chunk, :])[0], z)
+
+    def __len__(self):
+        return len(self.values)
+
+    def laminate(self, index=0):
+        """Creates a copy of the laminate with the stacking sequence of a design
+
+              :param index: Position of the design, 0 is the best
+              :type index: int
+              :rtype: Laminate
+
+         """
+
+        laminate = copy.deepcopy(self.template)
+        for position, angle in enumerate(self.angles[index]):
+            laminate.set_angle(position, float(angle))
+
+        return laminate
+
+
+def enumerate_stacking_sequences(laminate, angles, weights, symmetric=True, balanced=True, count=1,
+                                 chunk_size=2**16):
+    """Finds the stacking sequences of a laminate with the largest objective min_k sum(weights_k * D)
+
+          :param laminate: Laminate whose plies, materials and thicknesses are kept
+          :type laminate: Instance of Laminate
+          :param angles: Allowed ply angles in degrees
+          :type angles: list of floats
+          :param weights: Weights of the linear functions of D, the objective is the smallest of them
+          :type weights: ndarray(dtype=float, dim=3,3 or nr_functions,3,3)
+          :param symmetric: Only enumerate laminates symmetric about the mid-plane, requires a symmetric lay up
+          :type symmetric: bool
+          :param balanced: Only enumerate laminates with as many -theta as +theta plies, requires -theta to be allowed
+                           for every allowed theta
+          :type balanced: bool
+          :param count: Number of designs to keep, every distinct design without pruning if None
+          :type count: int
+          :param chunk_size: Largest number of partial sequences expanded at once
+          :type chunk_size: int
+          :returns: The best designs
+          :rtype: EnumerationResult
+
+     """
+
+    angles = np.unique(normalize_angles(angles))
+    weights = np.asarray(weights, dtype=float).reshape(-1, 3, 3)
+    laminae = laminate.laminae
+    size = len(laminae)
+
+    # Index of the opposite angle of each angle, -1 if it is not allowed
+    opposite = np.full(len(angles), -1)
+    for index, angle in enumerate(angles):
+        matches = np.flatnonzero(np.isclose(angles, normalize_angles([-angle])[0]))
+        if len(matches):
+            opposite[index] = matches[0]
+
+    on_axis = opposite == np.arange(len(angles))
+    if balanced and (opposite < 0).any():
+        raise ValueError('Balanced laminates require the opposite of every allowed angle')
+
+    # Pair of opposite angles of each off-axis angle, -1 for 0 and 90 degrees, and its sign in the pair
+    pairs = np.flatnonzero(~on_axis & (opposite >= 0) & (angles > 0))
+    pair = np.full(len(angles), -1)
+    sign = np.zeros(len(angles), dtype=int)
+    for number, index in enumerate(pairs):
+        pair[[index, opposite[index]]] = number
+        sign[[index, opposite[index]]] = 1, -1
+
+    Q = np.array([lamina.local_properties.Q for lamina in laminae], dtype=float)
+    thickness = np.array([lamina.thickness for lamina in laminae], dtype=float)
+    mirrored = np.allclose(thickness, thickness[::-1]) and np.allclose(Q, Q[::-1])
+    if symmetric and not mirrored:
+        raise ValueError('Symmetric stacking sequences require plies of the same material and thickness about the '
+                         'mid-plane')
+
+    # Positions in the order they are assigned, from the surfaces inwards, and how many times each contributes
+    if symmetric:
+        order = np.arange(size - 1, (size - 1) // 2, -1)
+        if size % 2:
+            order = np.append(order, size // 2)
+        factor = np.where(order == (size - 1) / 2, 1.0, 2.0)
+    else:
+        order = np.array([position for outer in zip(range(size - 1, -1, -1), range(size)) for position in outer])
+        order = order[:size]
+        factor = np.ones(size)
+
+    # Objective contributions of each position and angle, dim=depth,nr_angles,nr_functions
+    z = interface_coordinates(thickness)
+    zeros = np.zeros((size, 1))
+    Q_bar = global_properties(Q[:, np.newaxis], zeros, zeros, angles)[0]
+    Dk = (z[1:] ** 3 - z[:-1] ** 3)[:, np.newaxis, np.newaxis, np.newaxis] / 3 * Q_bar
+    scores = np.einsum('dakl,fkl->daf', Dk[order], weights) * factor[:, np.newaxis, np.newaxis]
+
+    # A ply on the mid-plane of a symmetric balanced laminate has no mirrored ply to balance it
+    allowed = np.ones((len(order), len(angles)), dtype=bool)
+    if symmetric and balanced and size % 2:
+        if not on_axis.any():
+            raise ValueError('Symmetric balanced laminates of an odd number of plies require a 0 or 90 degree angle')
+        allowed[-1] = on_axis
+
+    # Number of positions after each depth that can balance an off-axis ply
+    slots = allowed[:, ~on_axis].any(axis=1)
+    remaining_slots = np.append(np.cumsum(slots[::-1])[::-1][1:], 0)
+
+    # Upper bound of the objective functions over the positions after each depth
+    best_scores = np.where(allowed[..., np.newaxis], scores, -np.inf).max(axis=1)
+    remaining_bound = np.append(np.cumsum(best_scores[::-1], axis=0)[::-1][1:], np.zeros((1, len(weights))), axis=0)
+
+    # A reversed sequence has the same D and a sign flipped sequence changes the sign of D16 and D26 only. Only one
+    # of the two is used, as the canonical forms of both may together exclude every sequence of an equivalence class
+    reverse_invariant = not symmetric and mirrored
+    flip_invariant = not reverse_invariant and len(pairs) > 0 and not (opposite < 0).any() and \
+        np.allclose(weights[:, [0, 1, 2, 2], [2, 2, 0, 1]], 0)
+
+    def expand(sequences, functions, balance, flip, reverse, threshold):
+        """Appends every allowed angle to the partial sequences and removes the infeasible, duplicate and pruned"""
+
+        depth = sequences.shape[1]
+        choices = np.flatnonzero(allowed[depth])
+        parent = np.repeat(np.arange(len(sequences)), len(choices))
+        choice = np.tile(choices, len(sequences))
+        functions = functions[parent] + scores[depth, choice]
+        balance, flip, reverse = balance[parent], flip[parent], reverse[parent]
+        keep = np.ones(len(parent), dtype=bool)
+
+        off_axis = pair[choice] >= 0
+        balance[off_axis, pair[choice[off_axis]]] += sign[choice[off_axis]]
+        if balanced:
+            unbalanced = np.abs(balance).sum(axis=1)
+            keep &= unbalanced <= remaining_slots[depth]
+            if not on_axis.any():
+                keep &= (remaining_slots[depth] - unbalanced) % 2 == 0
+
+        # The first off-axis ply of a kept sequence has a positive angle
+        if flip_invariant:
+            keep &= ~(flip & (sign[choice] < 0))
+            flip = flip & ~off_axis
+
+        # The outer ply of the first differing pair of a kept sequence has the smaller angle index
+        if reverse_invariant and depth % 2:
+            outer = sequences[parent, depth - 1]
+            keep &= ~(reverse & (outer > choice))
+            reverse = reverse & (outer == choice)
+
+        bound = (functions + remaining_bound[depth]).min(axis=1)
+        keep &= bound >= threshold
+
+        sequences = np.concatenate((sequences[parent[keep]], choice[keep, np.newaxis].astype(np.int8)), axis=1)
+
+        return sequences, functions[keep], balance[keep], flip[keep], reverse[keep], bound[keep]
+
+    # Partial sequences as angle indices, objective functions, balance of each pair and whether the first off-axis
+    # ply and the first differing pair of plies are still to come
+    root = (np.zeros((1, 0), dtype=np.int8), np.zeros((1, len(weights))), np.zeros((1, len(pairs)), dtype=int),
+            np.ones(1, dtype=bool), np.ones(1, dtype=bool))
+
+    # Follow the count best bounds down to complete sequences, the objective of the worst is a lower bound of the
+    # objective of the designs kept
+    floor = -np.inf
+    if count is not None:
+        partial = root
+        for _ in range(len(order)):
+            *partial, bound = expand(*partial, -np.inf)
+            best = np.argsort(-bound, kind='stable')[:count]
+            partial = [array[best] for array in partial]
+        if len(bound[best]) == count:
+            floor = bound[best].min()
+
+    best_sequences = np.zeros((0, len(order)), dtype=np.int8)
+    best_values = np.zeros(0)
+    nodes, leaves = 0, 0
+    found = []
+    stack = [root]
+
+    while stack:
+        partial = stack.pop()
+        nodes += len(partial[0])
+
+        # The bounds are sums in a different order than the objectives, allow for the rounding
+        threshold = floor if count is None or len(best_values) < count else max(floor, best_values[-1])
+        threshold -= 1e-9 * abs(threshold)
+        sequences, functions, balance, flip, reverse, bound = expand(*partial, threshold)
+
+        if sequences.shape[1] == len(order):
+            leaves += len(sequences)
+            if count is None:
+                found.append((sequences, bound))
+            else:
+                best_sequences = np.concatenate((best_sequences, sequences))
+                best_values = np.concatenate((best_values, bound))
+                ranking = np.argsort(-best_values, kind='stable')[:count]
+                best_sequences, best_values = best_sequences[ranking], best_values[ranking]
+            continue
+
+        # Push the chunks with the lowest bounds first so the most promising are expanded first
+        ranking = np.argsort(bound, kind='stable')
+        for start in range(0, len(ranking), chunk_size):
+            chunk = ranking[start:start + chunk_size]
+            stack.append((sequences[chunk], functions[chunk], balance[chunk], flip[chunk], reverse[chunk]))
+
+    if count is None and found:
+        best_sequences = np.concatenate([sequences for sequences, _ in found])
+        best_values = np.concatenate([values for _, values in found])
+        ranking = np.argsort(-best_values, kind='stable')
+        best_sequences, best_values = best_sequences[ranking], best_values[ranking]
+
+    # Angles of every position from the bottom
+    layups = np.empty((len(best_values), size))
+    layups[:, order] = angles[best_sequences]
+    if symmetric:
+        layups[:, size - 1 - order] = angles[best_sequences]
+
+    return EnumerationResult(laminate, layups, best_values, nodes, leaves)
@@ -0,0 +1,78 @@
+"""Recovery of the interlaminar shear stress from the equilibrium equations.
+
+Classical laminate theory gives no transverse shear stress, but it follows from the in-plane stress gradients
+
+    tau_xz(z) = -integral_-h/2^z (d sigma_x / dx + d tau_xy / dy) dz
+    tau_yz(z) = -integral_-h/2^z (d tau_xy / dx + d sigma_y / dy) dz
+
+The shear forces [Qx, Qy] are taken as the moment gradients dMx/dx = Qx and dMy/dy = Qy, with constant normal
+forces and twisting moment. The strain gradients are solved from the laminate stiffness matrix, the stress gradients
+are linear in z within each ply and their integrals through the stack are cumulative sums over the plies.
+
+"""
+
+import numpy as np
+
+from . precision import get_policy
+from . stack import stiffness_matrix
+
+
+def shear_stress(A, B, D, Q_bar, z, shear_forces, points=2):
+    """Computes the transverse shear stress at points through the thickness of each ply
+
+          :param A: Extension matrices
+          :type A: ndarray(dtype=float, dim=...,3,3)
+          :param B: Coupling matrices
+          :type B: ndarray(dtype=float, dim=...,3,3)
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param Q_bar: Ply stiffness tensors in global coordinate system
+          :type Q_bar: ndarray(dtype=float, dim=...,n,3,3)
+          :param z: Interface coordinates
+          :type z: ndarray(dtype=float, dim=...,n+1)
+          :param shear_forces: Shear forces per unit width [Qx, Qy]
+          :type shear_forces: ndarray(dtype=float, dim=...,2)
+          :param points: Number of evenly spaced points per ply, bottom and top face included
+          :type points: int
+          :returns: Z coordinates of the points, dim=...,n*points, and the stress [tau_xz, tau_yz] at the points,
+                    dim=...,2,n*points, with points columns per ply from the bottom as in create_laminate_arrays
+          :rtype: ndarray(dtype=float), ndarray(dtype=float)
+
+     """
+
+    policy = get_policy()
+    z = np.asarray(z, dtype=float)
+    shear_forces = policy.accumulate(shear_forces)
+
+    # Gradients of the strain vector [midplane strains, curvatures] along x and y, dim=...,6,2
+    moment_gradients = np.zeros(shear_forces.shape[:-1] + (6, 2), dtype=shear_forces.dtype)
+    moment_gradients[..., 3, 0] = shear_forces[..., 0]
+    moment_gradients[..., 4, 1] = shear_forces[..., 1]
+    gradients = np.linalg.solve(policy.accumulate(stiffness_matrix(A, B, D)), moment_gradients)
+    midplane_gradients = gradients[..., np.newaxis, np.newaxis, :3, :]
+    curvature_gradients = gradients[..., np.newaxis, np.newaxis, 3:, :]
+
+    # Sample points and the coordinates of the ply bottoms, dim=...,n,points
+    bottom = z[..., :-1, np.newaxis]
+    fractions = np.linspace(0.0, 1.0, points)
+    samples = bottom + (z[..., 1:, np.newaxis] - bottom) * fractions
+
+    def stress_integral(lower, upper):
+        # Integral of Q_bar (e0' + z k') from lower to upper for both gradients, dim=...,n,points,3,2
+        strains = (upper - lower)[..., np.newaxis, np.newaxis] * midplane_gradients + \
+            ((upper ** 2 - lower ** 2) / 2)[..., np.newaxis, np.newaxis] * curvature_gradients
+
+        return np.einsum('...kij,...kpjg->...kpig', Q_bar, strains, dtype=policy.accumulation)
+
+    # Integrals over the plies below each ply and from its bottom to the points
+    whole = stress_integral(z[..., :-1, np.newaxis], z[..., 1:, np.newaxis])[..., 0, :, :]
+    below = np.cumsum(whole, axis=-3) - whole
+    integral = below[..., np.newaxis, :, :] + stress_integral(bottom, samples)
+
+    tau_xz = -(integral[..., 0, 0] + integral[..., 2, 1])
+    tau_yz = -(integral[..., 2, 0] + integral[..., 1, 1])
+
+    shape = tau_xz.shape[:-2] + (-1,)
+    tau = np.stack((tau_xz.reshape(shape), tau_yz.reshape(shape)), axis=-2)
+
+    return samples.reshape(samples.shape[:-2] + (-1,)), policy.store(tau)
@@ -1,9 +1,54 @@
+import weakref
+
 import numpy as np
 from enum import Enum
-from strain import StrainState
-from stress import StressState
-from coordinate_systems import CoordinateSystem
-from laminate import LoadType
+from . strain import StrainState
+from . stress import StressState
+from . coordinate_systems import CoordinateSystem
+from . laminate import LoadType
+from . stack import composite_properties
+from . precision import get_policy
+
+# Read-only zero components per storage type, shared by the states of all laminae until results are computed
+_zero_components = {}
+
+
+def zero_components():
+    """Returns the shared read-only zero components, dim=3,2, of the storage type of the current precision policy"""
+
+    dtype = get_policy().storage
+
+    if dtype not in _zero_components:
+        components = np.zeros((3, 2), dtype=dtype)
+        components.setflags(write=False)
+        _zero_components[dtype] = components
+
+    return _zero_components[dtype]
+
+
+def properties_state(properties):
+    """Returns the state of the local or global properties of a lamina for copy and pickle
+
+        The weak reference to the lamina cannot be pickled and is not copied by copy.deepcopy, so the state holds the
+        lamina itself and restore_properties references it weakly again.
+
+     """
+
+    state = {name: getattr(properties, name) for name in properties.__slots__ if name != '_lamina'}
+    state['lamina'] = properties.lamina
+
+    return state
+
+
+def restore_properties(properties, state):
+    """Restores a state returned by properties_state"""
+
+    state = dict(state)
+    properties._lamina = weakref.ref(state.pop('lamina'))
+
+    for name, value in state.items():
+        setattr(properties, name, value)
+
 
 class Lamina:
     """Class used to represent a lamina in a laminate
@@ -16,6 +61,9 @@ class Lamina:
                :type matrix_material: Instance of Material
                :param fibre_material: Material instance used for the fibres
                :type fibre_material: Instance of Material
+               :param properties: E_L, E_T, v_LT, v_TL, G_LT, alpha_L and alpha_T if already known, e.g. from a
+                                  MaterialLibrary, computed from the constituents if None
+               :type properties: Tuple of floats
 
                :ivar E_L: Longitudinal Stiffness of lamina
                :ivar E_T: Transverse stiffness of lamina
@@ -29,11 +77,16 @@ class Lamina:
                :ivar T2: Transformation matrix for strain
      """
 
+    __slots__ = ('index', 'angle', 'thickness', 'coordinates', 'matrix_material', 'fibre_material', 'volume_fraction',
+                 'E_L', 'E_T', 'v_LT', 'v_TL', 'G_LT', 'alpha_L', 'alpha_T', 'T1', 'T2', 'local_properties',
+                 'global_properties', '__weakref__')
+
     # Halpin Tsai parameters
     KSI_T = 2
     KSI_G = 1
 
-    def __init__(self, index, thickness, matrix_material, fibre_material, volume_fraction, angle, coordinates):
+    def __init__(self, index, thickness, matrix_material, fibre_material, volume_fraction, angle, coordinates,
+                 properties=None):
         self.index = index
         self.angle = angle
         self.thickness = thickness
@@ -43,7 +96,9 @@ class Lamina:
         self.volume_fraction = volume_fraction
 
         # Homogenised properties
-        self.E_L, self.E_T, self.v_LT, self.v_TL, self.G_LT, self.alpha_L, self.alpha_T = self.compute_composite_properties()
+        if properties is None:
+            properties = self.compute_composite_properties()
+        self.E_L, self.E_T, self.v_LT, self.v_TL, self.G_LT, self.alpha_L, self.alpha_T = properties
 
         # Transformation matrices
         self.T1, self.T2 = self.compute_transformation_matrices()
@@ -52,6 +107,16 @@ class Lamina:
         self.local_properties = LocalLaminaProperties(self)
         self.global_properties = GlobalLaminaProperties(self)
 
+    @property
+    def density(self):
+        """Density from the rule of mixtures, None if the density of a constituent is unknown"""
+
+        if self.fibre_material.density is None or self.matrix_material.density is None:
+            return None
+
+        return self.fibre_material.density * self.volume_fraction + \
+            self.matrix_material.density * (1 - self.volume_fraction)
+
     def compute_composite_properties(self):
         """Computes the composite properties of the lamina using the properties of the constituents.
 
@@ -61,35 +126,35 @@ class Lamina:
               :rtype: Tuple of floats
          """
 
-        # Define local variables for shorter notation
-        Ef = self.fibre_material.modulus
-        Em = self.matrix_material.modulus
-        vf = self.fibre_material.poisson_ratio
-        vm = self.matrix_material.poisson_ratio
-        Vf = self.volume_fraction
-        alpha_m = self.matrix_material.thermal_coefficient
-        alpha_f = self.fibre_material.thermal_coefficient
-        G_m = Em / 2 / (1 + vm)
-        G_f = Ef / 2 / (1 + vf)
+        return composite_properties(self.fibre_material.modulus, self.matrix_material.modulus,
+                                    self.fibre_material.poisson_ratio, self.matrix_material.poisson_ratio,
+                                    self.volume_fraction, self.fibre_material.thermal_coefficient,
+                                    self.matrix_material.thermal_coefficient, self.KSI_T, self.KSI_G)
+
+    def set_coordinates(self, coordinates):
+        """Moves the lamina and updates its contributions to the stiffness matrices
 
-        # Inverse rule of mixtures
-        E_L = Ef * Vf + Em * (1 - Vf)
-        v_LT = Vf * vf + vm * (1- Vf)
+              :param coordinates: Bottom and top z coordinates relative the mid-plane
+              :type coordinates: list of floats
 
-        # Halpin Tsai for transverse properties
-        eta_T = (Ef/Em - 1) / (Ef/Em + self.KSI_T)
-        E_T = Em * (1 + self.KSI_T*eta_T*Vf) / (1 - eta_T*Vf)
-        v_TL = v_LT * E_T / E_L
+         """
+
+        self.coordinates = list(coordinates)
+        global_properties = self.global_properties
+        global_properties.Ak, global_properties.Bk, global_properties.Dk = \
+            global_properties.compute_stiffness_contributions()
 
-        # Halpin Tsai for shear properties
-        eta_G = (G_f/G_m - 1) / (G_f/G_m + self.KSI_G)
-        G_LT = G_m * (1 + self.KSI_G * eta_G * Vf) / (1 - eta_G * Vf)
+    def set_angle(self, angle):
+        """Rotates the lamina, the local properties are unchanged while the global properties are recomputed
 
-        # Thermal expansion coefficients
-        alpha_L = 1 / E_L * (alpha_f * Ef * Vf + alpha_m * Em * (1 - Vf))
-        alpha_T = (1 + vf) * alpha_f * Vf + (1 + vm) * alpha_m * (1 - Vf) - alpha_L * v_LT
+              :param angle: New angle in degrees
+              :type angle: float
+
+         """
 
-        return E_L, E_T, v_LT, v_TL, G_LT, alpha_L, alpha_T
+        self.angle = angle
+        self.T1, self.T2 = self.compute_transformation_matrices()
+        self.global_properties = GlobalLaminaProperties(self)
 
     def compute_transformation_matrices(self):
         """Computes the coordinate transformation matrices for stress and strain tensors
@@ -115,45 +180,96 @@ class Lamina:
         return T1, T2
 
 
+class OrthotropicLamina(Lamina):
+    """Class used to represent a lamina defined by its homogenised properties instead of its constituents
+
+        Used for plies imported from finite element models, e.g. Nastran MAT8 materials. The lamina has no fibre
+        and matrix materials, so tools working on the constituents do not apply to it.
+
+               :param index: Index in lay up sequence
+               :type index: int
+               :param thickness: Thickness of the lamina
+               :type thickness: float
+               :param properties: E_L, E_T, v_LT, G_LT, alpha_L and alpha_T
+               :type properties: tuple of floats
+               :param angle: Angle in degrees
+               :type angle: float
+               :param coordinates: Bottom and top coordinates relative the mid-plane
+               :type coordinates: list of floats
+               :param density: Mass per unit volume, None if unknown
+               :type density: float
+
+     """
+
+    __slots__ = ('properties', 'ply_density')
+
+    def __init__(self, index, thickness, properties, angle, coordinates, density=None):
+        self.properties = tuple(float(value) for value in properties)
+        self.ply_density = density
+
+        super().__init__(index, thickness, None, None, None, angle, coordinates)
+
+    @property
+    def density(self):
+        return self.ply_density
+
+    def compute_composite_properties(self):
+        E_L, E_T, v_LT, G_LT, alpha_L, alpha_T = self.properties
+
+        return E_L, E_T, v_LT, v_LT * E_T / E_L, G_LT, alpha_L, alpha_T
+
+
 class LocalLaminaProperties:
     """Class used to represent the local properties of a lamina
 
-                   :param lamina: Parent lamina
+                   :param lamina: Parent lamina, referenced weakly so that the lamina and its properties do not
+                                  form a reference cycle
                    :type lamina: Instance of Lamina
                    :ivar S: Compliance matrix ndarray(dtype=float, dim=3,3)
                    :ivar Q: Stiffness matrix ndarray(dtype=float, dim=3,3)
     """
 
+    __slots__ = ('_lamina', 'coordinate_system', 'S', 'Q', 'thermal_strain', 'total_strain', 'thermal_stress',
+                 'total_stress')
+
     def __init__(self, lamina):
-        self.lamina = lamina
+        self._lamina = weakref.ref(lamina)
         self.coordinate_system = CoordinateSystem.LT
         self.S, self.Q = self.compute_constitutive_matrices()
 
         # Strain state
-        self.thermal_strain = StrainState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
-        self.total_strain = StrainState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
+        self.thermal_strain = StrainState(zero_components(), self.coordinate_system, LoadType.thermal)
+        self.total_strain = StrainState(zero_components(), self.coordinate_system, LoadType.thermal)
 
         # Stress state
-        self.thermal_stress = StressState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
-        self.total_stress = StressState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
+        self.thermal_stress = StressState(zero_components(), self.coordinate_system, LoadType.thermal)
+        self.total_stress = StressState(zero_components(), self.coordinate_system, LoadType.thermal)
+
+    def __getstate__(self):
+        return properties_state(self)
+
+    def __setstate__(self, state):
+        restore_properties(self, state)
+
+    @property
+    def lamina(self):
+        return self._lamina()
 
     def compute_thermal_strains(self):
         local_components = self.lamina.T2.dot(self.lamina.global_properties.thermal_strain.components)
-        self.thermal_strain.components = local_components
+        self.thermal_strain.components = get_policy().store(local_components)
 
     def compute_total_strains(self):
         local_components = self.lamina.T2.dot(self.lamina.global_properties.total_strain.components)
-        self.total_strain.components = local_components
+        self.total_strain.components = get_policy().store(local_components)
 
     def compute_thermal_stress(self):
         local_components = self.lamina.T1.dot(self.lamina.global_properties.thermal_stress.components)
-        self.thermal_stress.components = local_components
+        self.thermal_stress.components = get_policy().store(local_components)
 
     def compute_total_stress(self):
         local_components = self.lamina.T1.dot(self.lamina.global_properties.total_stress.components)
-        self.total_stress.components = local_components
-        print(self.total_stress.components)
-        print(self.lamina.global_properties.total_stress.components)
+        self.total_stress.components = get_policy().store(local_components)
 
     def compute_constitutive_matrices(self):
         """Computes the compliance and stiffness tensors in local coordinate system
@@ -176,34 +292,61 @@ class LocalLaminaProperties:
 class GlobalLaminaProperties:
     """Class used to represent the global properties of a lamina
 
-                   :param lamina: Parent lamina
+                   :param lamina: Parent lamina, referenced weakly as in LocalLaminaProperties
                    :type lamina: Instance of Lamina
                    :ivar S: Compliance matrix ndarray(dtype=float, dim=3,3)
                    :ivar Q Stiffness matrix ndarray(dtype=float, dim=3,3)
 
     """
 
+    __slots__ = ('_lamina', 'coordinate_system', 'S', 'Q', 'thermal_strain', 'total_strain', 'thermal_stress',
+                 'total_stress', 'alpha', 'Ak', 'Bk', 'Dk')
+
     def __init__(self, lamina):
-        self.lamina = lamina
+        self._lamina = weakref.ref(lamina)
         self.coordinate_system = CoordinateSystem.xy
         self.S, self.Q = self.compute_constitutive_matrices()
 
         # Strain state
-        self.thermal_strain = StrainState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
-        self.total_strain = StrainState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
+        self.thermal_strain = StrainState(zero_components(), self.coordinate_system, LoadType.thermal)
+        self.total_strain = StrainState(zero_components(), self.coordinate_system, LoadType.thermal)
 
         # Stress state
-        self.thermal_stress = StressState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
-        self.total_stress = StressState(np.zeros((3, 2)), self.coordinate_system, LoadType.thermal)
+        self.thermal_stress = StressState(zero_components(), self.coordinate_system, LoadType.thermal)
+        self.total_stress = StressState(zero_components(), self.coordinate_system, LoadType.thermal)
 
         # Thermal coefficients
         alpha_local = np.array([lamina.alpha_L, lamina.alpha_T, 0]).reshape(3, 1)
         self.alpha = np.linalg.inv(lamina.T2).dot(alpha_local)
 
         # Contributions to extension, bending and coupling matrix
-        self.Ak = self.Q.dot(lamina.coordinates[1] - lamina.coordinates[0])
-        self.Bk = 1 / 2 * self.Q.dot(lamina.coordinates[1] ** 2 - lamina.coordinates[0] ** 2)
-        self.Dk = 1 / 3 * self.Q.dot(lamina.coordinates[1] ** 3 - lamina.coordinates[0] ** 3)
+        self.Ak, self.Bk, self.Dk = self.compute_stiffness_contributions()
+
+    def __getstate__(self):
+        return properties_state(self)
+
+    def __setstate__(self, state):
+        restore_properties(self, state)
+
+    @property
+    def lamina(self):
+        return self._lamina()
+
+    def compute_stiffness_contributions(self):
+        """Computes the contributions of the lamina to the A, B and D matrices at its current coordinates
+
+              :returns: Ak, Bk, Dk
+              :rtype: ndarray(dtype=float, dim=3,3)
+
+         """
+
+        z1, z2 = self.lamina.coordinates
+
+        Ak = self.Q.dot(z2 - z1)
+        Bk = 1 / 2 * self.Q.dot(z2 ** 2 - z1 ** 2)
+        Dk = 1 / 3 * self.Q.dot(z2 ** 3 - z1 ** 3)
+
+        return Ak, Bk, Dk
 
     def compute_constitutive_matrices(self):
         """Computes the compliance and stiffness tensors in local coordinate system
@@ -245,11 +388,13 @@ class GlobalLaminaProperties:
             mechanical_strains[:, 1, np.newaxis] -= self.lamina.global_properties.alpha * delta_T
 
         if midplane_strains.strain_type == LoadType.thermal:
-            self.thermal_strain = StrainState(mechanical_strains, self.coordinate_system, midplane_strains.strain_type)
+            self.thermal_strain = StrainState(get_policy().store(mechanical_strains), self.coordinate_system,
+                                              midplane_strains.strain_type)
             self.lamina.local_properties.compute_thermal_strains()
 
         elif midplane_strains.strain_type == LoadType.combined:
-            self.total_strain = StrainState(mechanical_strains, self.coordinate_system, midplane_strains.strain_type)
+            self.total_strain = StrainState(get_policy().store(mechanical_strains), self.coordinate_system,
+                                            midplane_strains.strain_type)
             self.lamina.local_properties.compute_total_strains()
 
     def compute_mechanical_stress(self, strains):
@@ -270,13 +415,11 @@ class GlobalLaminaProperties:
         # Calculate stresses corresponding to strains
         if strains.strain_type == LoadType.thermal:
 
-            self.thermal_stress.components[:, 0, np.newaxis] = mechanical_stress[:, 0, np.newaxis]
-            self.thermal_stress.components[:, 1, np.newaxis] = mechanical_stress[:, 1, np.newaxis]
+            self.thermal_stress.components = get_policy().store(mechanical_stress)
             self.lamina.local_properties.compute_thermal_stress()
 
         elif strains.strain_type == LoadType.combined:
-            self.total_stress.components[:, 0, np.newaxis] = mechanical_stress[:, 0, np.newaxis]
-            self.total_stress.components[:, 1, np.newaxis] = mechanical_stress[:, 1, np.newaxis]
+            self.total_stress.components = get_policy().store(mechanical_stress)
             self.lamina.local_properties.compute_total_stress()
 
 
@@ -1,7 +1,12 @@
 import numpy as np
-from strain import StrainState
-from stress import StressState
-from coordinate_systems import CoordinateSystem
+from . strain import StrainState
+from . stress import StressState
+from . coordinate_systems import CoordinateSystem
+from . stack import composite_properties, local_stiffness, global_properties, stiffness_matrices, stiffness_matrix, \
+    thermal_forces
+from . precision import get_policy
+from . interlaminar import shear_stress
+from . constants import EngineeringConstants
 from enum import Enum
 
 
@@ -12,9 +17,14 @@ class Laminate:
                :type laminae: List of instances of lamina
 
                :ivar moments: Moments per unit width [Mx, My, Mxy]
-               :ivar normal_forces: Normal forces per unit width [Nx, Ny]
+               :ivar normal_forces: Normal forces per unit width [Nx, Ny, Nxy]
+               :ivar shear_forces: Transverse shear forces per unit width [Qx, Qy]
                :ivar delta_T: Temperature difference relative unstressed state
+               :ivar reference_temperature: Temperature of the unstressed state, required for temperature dependent materials
+               :ivar thermal_steps: Number of steps used to integrate over delta_T for temperature dependent materials
                :ivar thickness: Total thickness of the the laminate
+               :ivar interlaminar_shear_stress: Stress [tau_xz, tau_yz] at the ply faces of the last combined solution,
+                                                dim=2,nr_laminae*2
 
      """
     def __init__(self, laminae):
@@ -23,16 +33,196 @@ class Laminate:
         self.coordinate_system = CoordinateSystem.xy
 
         # Loads
-        self.moments = [0.0, 0.0, 0.0]
-        self.normal_forces = [0.0, 0.0]
-        self.delta_T = [0.0]
+        self.reset_loads()
         self.thermal_load_vector = np.zeros((6, 1))
+        self.interlaminar_shear_stress = np.zeros((2, len(self.laminae) * 2), dtype=get_policy().storage)
 
         # Initiate stiffness matrices
         self.A, self.B, self.D = self.compute_stiffness_matrices()
 
+        # Stiffness matrix and its inverse of the last call to compliance_matrix
+        self.compliance_cache = None
+
     def add_laminae(self, laminae):
-        self.laminae.append(laminae)
+        """Adds a lamina on top of the laminate
+
+              :param laminae: Lamina to add
+              :type laminae: Instance of Lamina
+
+         """
+
+        self.insert_lamina(len(self.laminae), laminae)
+
+    def insert_lamina(self, position, lamina):
+        """Inserts a lamina at position in the lay up, counted from the bottom
+
+            The laminae above are moved up and the mid-plane is moved to the new centre. The stiffness matrices are
+            updated with the contributions of the new lamina and the moved laminae instead of being rebuilt.
+
+              :param position: Position in the lay up, 0 is the bottom
+              :type position: int
+              :param lamina: Lamina to insert, its coordinates are overwritten
+              :type lamina: Instance of Lamina
+
+         """
+
+        bottom = self.laminae[position].coordinates[0] if position < len(self.laminae) else self.thickness / 2
+
+        self.shift_laminae(self.laminae[position:], lamina.thickness)
+        lamina.set_coordinates([bottom, bottom + lamina.thickness])
+        self.laminae.insert(position, lamina)
+        self.add_contributions(lamina)
+
+        self.thickness += lamina.thickness
+        self.shift_laminae(self.laminae, -lamina.thickness / 2)
+        self.update_indices(position)
+
+    def remove_lamina(self, position):
+        """Removes the lamina at position in the lay up, counted from the bottom
+
+              :param position: Position in the lay up, 0 is the bottom
+              :type position: int
+              :returns: The removed lamina
+              :rtype: Instance of Lamina
+
+         """
+
+        lamina = self.laminae[position]
+
+        self.add_contributions(lamina, sign=-1)
+        del self.laminae[position]
+        self.shift_laminae(self.laminae[position:], -lamina.thickness)
+
+        self.thickness -= lamina.thickness
+        self.shift_laminae(self.laminae, lamina.thickness / 2)
+        self.update_indices(position)
+
+        return lamina
+
+    def replace_lamina(self, position, lamina):
+        """Replaces the lamina at position in the lay up, counted from the bottom
+
+              :param position: Position in the lay up, 0 is the bottom
+              :type position: int
+              :param lamina: Lamina to insert, its coordinates are overwritten
+              :type lamina: Instance of Lamina
+              :returns: The replaced lamina
+              :rtype: Instance of Lamina
+
+         """
+
+        old_lamina = self.laminae[position]
+
+        if lamina.thickness != old_lamina.thickness:
+            self.remove_lamina(position)
+            self.insert_lamina(position, lamina)
+            return old_lamina
+
+        # Same thickness, only the contributions of the lamina changes
+        self.add_contributions(old_lamina, sign=-1)
+        lamina.set_coordinates(old_lamina.coordinates)
+        self.laminae[position] = lamina
+        self.add_contributions(lamina)
+        self.update_indices(position)
+
+        return old_lamina
+
+    def set_angle(self, position, angle):
+        """Changes the angle of the lamina at position in the lay up
+
+              :param position: Position in the lay up, 0 is the bottom
+              :type position: int
+              :param angle: New angle in degrees
+              :type angle: float
+
+         """
+
+        lamina = self.laminae[position]
+
+        self.add_contributions(lamina, sign=-1)
+        lamina.set_angle(angle)
+        self.add_contributions(lamina)
+
+    def set_thickness(self, position, thickness):
+        """Changes the thickness of the lamina at position in the lay up
+
+              :param position: Position in the lay up, 0 is the bottom
+              :type position: int
+              :param thickness: New thickness
+              :type thickness: float
+
+         """
+
+        lamina = self.laminae[position]
+        change = thickness - lamina.thickness
+        bottom = lamina.coordinates[0]
+
+        self.add_contributions(lamina, sign=-1)
+        self.shift_laminae(self.laminae[position + 1:], change)
+        lamina.thickness = thickness
+        lamina.set_coordinates([bottom, bottom + thickness])
+        self.add_contributions(lamina)
+
+        self.thickness += change
+        self.shift_laminae(self.laminae, -change / 2)
+
+    def add_contributions(self, lamina, sign=1):
+        """Adds (or with sign=-1 subtracts) the contributions of lamina to the stiffness matrices
+
+              :param lamina: Lamina at its current coordinates
+              :type lamina: Instance of Lamina
+              :param sign: 1 to add, -1 to subtract
+              :type sign: int
+
+         """
+
+        self.A += sign * lamina.global_properties.Ak
+        self.B += sign * lamina.global_properties.Bk
+        self.D += sign * lamina.global_properties.Dk
+
+    def shift_laminae(self, laminae, offset):
+        """Moves laminae a distance offset in z and corrects the stiffness matrices
+
+            Moving a set of laminae with contributions A_s and B_s a distance offset changes the first and second
+            moments of z, giving B += offset * A_s and D += 2 * offset * B_s + offset**2 * A_s.
+
+              :param laminae: Laminae to move, must be part of the laminate
+              :type laminae: List of instances of lamina
+              :param offset: Distance to move the laminae
+              :type offset: float
+
+         """
+
+        if not laminae or offset == 0:
+            return
+
+        if laminae is self.laminae:
+            A_s, B_s = self.A.copy(), self.B.copy()
+        else:
+            A_s = sum(lamina.global_properties.Ak for lamina in laminae)
+            B_s = sum(lamina.global_properties.Bk for lamina in laminae)
+
+        self.D += 2 * offset * B_s + offset ** 2 * A_s
+        self.B += offset * A_s
+
+        for lamina in laminae:
+            lamina.set_coordinates([lamina.coordinates[0] + offset, lamina.coordinates[1] + offset])
+
+    def update_indices(self, start=0):
+        """Renumbers the laminae from start to match their position in the lay up"""
+
+        for position in range(start, len(self.laminae)):
+            self.laminae[position].index = position + 1
+
+    def reset_loads(self):
+        """Removes all loads from the laminate"""
+
+        self.moments = [0.0, 0.0, 0.0]
+        self.normal_forces = [0.0, 0.0, 0.0]
+        self.shear_forces = [0.0, 0.0]
+        self.delta_T = [0.0]
+        self.reference_temperature = None
+        self.thermal_steps = 100
 
     def add_loads(self, **loads):
         """Adds loads to the laminate instance, support moments, normal forces and temperature loads
@@ -43,7 +233,10 @@ class Laminate:
             :Keyword Arguments:
                  * *moments* (``list``) --
                  * *normal_forces* (``list``) --
+                 * *shear_forces* (``list``) --
                  * *delta_T* (``float``) --
+                 * *reference_temperature* (``float``) --
+                 * *thermal_steps* (``int``) --
 
          """
 
@@ -51,8 +244,46 @@ class Laminate:
             self.moments = loads['moments']
         elif 'normal_forces' in loads:
             self.normal_forces = loads['normal_forces']
+        elif 'shear_forces' in loads:
+            self.shear_forces = loads['shear_forces']
         elif 'delta_T' in loads:
             self.delta_T = loads['delta_T'][0]
+        elif 'reference_temperature' in loads:
+            self.reference_temperature = loads['reference_temperature'][0]
+        elif 'thermal_steps' in loads:
+            thermal_steps = int(loads['thermal_steps'][0])
+            if thermal_steps < 1:
+                raise ValueError('THERMAL_STEPS must be at least 1, got ' + str(thermal_steps))
+            self.thermal_steps = thermal_steps
+
+    def areal_density(self):
+        """Computes the mass per unit area of the laminate
+
+              :returns: Sum of the lamina densities times their thicknesses
+              :rtype: float
+
+         """
+
+        densities = [lamina.density for lamina in self.laminae]
+        if any(density is None for density in densities):
+            raise ValueError('Densities of all fibre and matrix materials are required for the areal density')
+
+        return sum(density * lamina.thickness for density, lamina in zip(densities, self.laminae))
+
+    def is_temperature_dependent(self):
+        """Checks if the thermal solution should account for temperature dependent materials
+
+              :returns: True if a reference temperature is set and any constituent has a property table
+              :rtype: bool
+
+         """
+
+        if self.reference_temperature is None:
+            return False
+
+        # Laminae defined by their homogenised properties have no constituents
+        return any(material is not None and material.is_temperature_dependent
+                   for lamina in self.laminae for material in (lamina.fibre_material, lamina.matrix_material))
 
     def compute_stiffness_matrices(self):
         """Computes A, B and D matrices
@@ -62,9 +293,9 @@ class Laminate:
 
          """
 
-        A = np.zeros(shape=(3, 3))
-        B = np.zeros(shape=(3, 3))
-        D = np.zeros(shape=(3, 3))
+        A = np.zeros(shape=(3, 3), dtype=get_policy().accumulation)
+        B = np.zeros(shape=(3, 3), dtype=get_policy().accumulation)
+        D = np.zeros(shape=(3, 3), dtype=get_policy().accumulation)
 
         for lamina in self.laminae:
 
@@ -74,6 +305,48 @@ class Laminate:
 
         return A, B, D
 
+    def compliance_matrix(self):
+        """Returns the inverse of the laminate stiffness matrix [[A, B], [B, D]]
+
+            The inverse is cached and only recomputed when the stiffness matrices have changed, e.g. by the lay up
+            editing methods.
+
+              :returns: Compliance matrix [[a, b], [b^T, d]]
+              :rtype: ndarray(dtype=float, dim=6,6)
+
+         """
+
+        stiffness = stiffness_matrix(self.A, self.B, self.D)
+
+        if self.compliance_cache is None or not np.array_equal(stiffness, self.compliance_cache[0]):
+            self.compliance_cache = (stiffness, np.linalg.inv(stiffness))
+
+        return self.compliance_cache[1]
+
+    def unit_thermal_load(self):
+        """Computes the thermal forces and moments per unit temperature difference
+
+              :returns: Load vector [N, M]
+              :rtype: ndarray(dtype=float, dim=6)
+
+         """
+
+        Q_bar = np.array([lamina.global_properties.Q for lamina in self.laminae])
+        alpha = np.array([lamina.global_properties.alpha[:, 0] for lamina in self.laminae])
+        z = np.array([lamina.coordinates[0] for lamina in self.laminae] + [self.laminae[-1].coordinates[1]])
+
+        return thermal_forces(Q_bar, alpha, z)
+
+    def engineering_constants(self):
+        """Computes the apparent in-plane and flexural moduli and the thermal coefficients of the laminate
+
+              :returns: Engineering constants, see constants.EngineeringConstants
+              :rtype: EngineeringConstants
+
+         """
+
+        return EngineeringConstants(self.compliance_matrix(), self.thickness, self.unit_thermal_load())
+
     def compute_thermal_forces(self):
         """Computes thermal forces acting on the laminate
 
@@ -92,6 +365,10 @@ class Laminate:
 
     def compute_thermal_stress(self):
 
+        if self.is_temperature_dependent():
+            self.compute_thermal_stress_incremental()
+            return
+
         # Compute the thermal load vector
         self.compute_thermal_forces()
 
@@ -106,6 +383,61 @@ class Laminate:
             # Compute global and local stress in lamina
             lamina.global_properties.compute_mechanical_stress(lamina.global_properties.thermal_strain)
 
+    def compute_thermal_stress_incremental(self):
+        """Computes the thermal stress for temperature dependent materials
+
+            The temperature range from reference_temperature to reference_temperature + delta_T is divided into
+            thermal_steps steps. Properties are interpolated at the mid-point of each step and the strain and stress
+            increments of all steps and laminae are computed at once before being summed.
+
+         """
+
+        delta_T = float(np.squeeze(self.delta_T))
+        step = delta_T / self.thermal_steps
+        temperatures = self.reference_temperature + step * (np.arange(self.thermal_steps) + 0.5)
+
+        # Interpolate the properties of each unique material once, dim=3,steps
+        materials = {id(material): material for lamina in self.laminae
+                     for material in (lamina.fibre_material, lamina.matrix_material)}
+        properties = {key: np.stack(material.interpolate(temperatures)) for key, material in materials.items()}
+
+        # Constituent properties per step and lamina, dim=steps,nr_laminae
+        Ef, vf, alpha_f = np.stack([properties[id(lamina.fibre_material)] for lamina in self.laminae], axis=-1)
+        Em, vm, alpha_m = np.stack([properties[id(lamina.matrix_material)] for lamina in self.laminae], axis=-1)
+        volume_fractions = np.array([lamina.volume_fraction for lamina in self.laminae])
+        angles = np.array([lamina.angle for lamina in self.laminae])
+        z = np.array([lamina.coordinates[0] for lamina in self.laminae] + [self.laminae[-1].coordinates[1]])
+
+        E_L, E_T, v_LT, _, G_LT, alpha_L, alpha_T = composite_properties(Ef, Em, vf, vm, volume_fractions,
+                                                                         alpha_f, alpha_m)
+        Q_bar, alpha = global_properties(local_stiffness(E_L, E_T, v_LT, G_LT), alpha_L, alpha_T, angles)
+
+        # Mid-plane strain and curvature increments of each step, dim=steps,6
+        stiffness = stiffness_matrix(*stiffness_matrices(Q_bar, z))
+        load_increments = step * thermal_forces(Q_bar, alpha, z)
+        strain_increments = np.linalg.solve(stiffness, load_increments[..., np.newaxis])[..., 0]
+
+        # Mechanical strain increments at the bottom and top of each lamina, dim=steps,nr_laminae,2,3
+        z_faces = np.stack((z[:-1], z[1:]), axis=-1)
+        mechanical_strain_increments = strain_increments[:, np.newaxis, np.newaxis, :3] \
+            + z_faces[np.newaxis, :, :, np.newaxis] * strain_increments[:, np.newaxis, np.newaxis, 3:] \
+            - step * alpha[:, :, np.newaxis, :]
+
+        # Sum the increments over all steps, dim=nr_laminae,2,3
+        mechanical_strains = mechanical_strain_increments.sum(axis=0)
+        mechanical_stress = np.einsum('snij,snfj->nfi', Q_bar, mechanical_strain_increments)
+
+        for index, lamina in enumerate(self.laminae):
+            lamina.global_properties.thermal_strain = StrainState(get_policy().store(mechanical_strains[index].T),
+                                                                  self.coordinate_system, LoadType.thermal)
+            lamina.local_properties.compute_thermal_strains()
+            lamina.global_properties.thermal_stress.components = get_policy().store(mechanical_stress[index].T)
+            lamina.local_properties.compute_thermal_stress()
+
+        # Equivalent load vector at the final temperature, used when combining with the outer loads
+        total_stiffness_matrix = stiffness_matrix(self.A, self.B, self.D)
+        self.thermal_load_vector = total_stiffness_matrix.dot(strain_increments.sum(axis=0).reshape(6, 1))
+
     def compute_total_stress(self):
         """Computes the total stress caused by both thermal and outer loading
 
@@ -129,21 +461,39 @@ class Laminate:
             # Compute global and local stress in lamina
             lamina.global_properties.compute_mechanical_stress(lamina.global_properties.total_strain)
 
+        self.interlaminar_shear_stress = self.compute_interlaminar_shear_stress()[1]
+
+    def compute_interlaminar_shear_stress(self, points=2):
+        """Computes the transverse shear stress caused by the shear forces, see interlaminar.shear_stress
+
+              :param points: Number of evenly spaced points per lamina, bottom and top face included
+              :type points: int
+              :returns: z_coordinates, interlaminar_shear_stress
+              :rtype: ndarray(dtype=float, dim=nr_laminae*points), ndarray(dtype=float, dim=2,nr_laminae*points)
+
+         """
+
+        Q_bar = np.array([lamina.global_properties.Q for lamina in self.laminae])
+        z = np.array([lamina.coordinates[0] for lamina in self.laminae] + [self.laminae[-1].coordinates[1]])
+
+        return shear_stress(self.A, self.B, self.D, Q_bar, z, np.ravel(self.shear_forces)[:2], points)
+
     def create_laminate_arrays(self, load_type):
 
         # Initiate stress, strain and coordinates
         z_coordinates = np.zeros((len(self.laminae) * 2))
+        shape, dtype = (3, len(self.laminae) * 2), get_policy().storage
 
         if load_type == LoadType.thermal:
-            mechanical_stress_global = StressState(np.zeros((3, len(self.laminae) * 2)), self.coordinate_system, LoadType.thermal)
-            mechanical_stress_local = StressState(np.zeros((3, len(self.laminae) * 2)), CoordinateSystem.LT, LoadType.thermal)
-            mechanical_strains_global = StrainState(np.zeros((3, len(self.laminae) * 2)), self.coordinate_system, LoadType.thermal)
-            mechanical_strains_local = StrainState(np.zeros((3, len(self.laminae) * 2)), CoordinateSystem.LT, LoadType.thermal)
+            mechanical_stress_global = StressState(np.zeros(shape, dtype), self.coordinate_system, LoadType.thermal)
+            mechanical_stress_local = StressState(np.zeros(shape, dtype), CoordinateSystem.LT, LoadType.thermal)
+            mechanical_strains_global = StrainState(np.zeros(shape, dtype), self.coordinate_system, LoadType.thermal)
+            mechanical_strains_local = StrainState(np.zeros(shape, dtype), CoordinateSystem.LT, LoadType.thermal)
         else:
-            mechanical_stress_global = StressState(np.zeros((3, len(self.laminae) * 2)), self.coordinate_system, LoadType.combined)
-            mechanical_stress_local = StressState(np.zeros((3, len(self.laminae) * 2)), CoordinateSystem.LT, LoadType.combined)
-            mechanical_strains_global = StrainState(np.zeros((3, len(self.laminae) * 2)), self.coordinate_system, LoadType.combined)
-            mechanical_strains_local = StrainState(np.zeros((3, len(self.laminae) * 2)), CoordinateSystem.LT, LoadType.combined)
+            mechanical_stress_global = StressState(np.zeros(shape, dtype), self.coordinate_system, LoadType.combined)
+            mechanical_stress_local = StressState(np.zeros(shape, dtype), CoordinateSystem.LT, LoadType.combined)
+            mechanical_strains_global = StrainState(np.zeros(shape, dtype), self.coordinate_system, LoadType.combined)
+            mechanical_strains_local = StrainState(np.zeros(shape, dtype), CoordinateSystem.LT, LoadType.combined)
 
         # Compute mechanical stress caused by the total loads
         for index, lamina in enumerate(self.laminae):
@@ -165,6 +515,37 @@ class Laminate:
 
         return mechanical_stress_global, mechanical_stress_local, mechanical_strains_global, mechanical_strains_local, z_coordinates
 
+    def set_laminate_arrays(self, load_type, stress_global, stress_local, strains_global, strains_local):
+        """Distributes laminate arrays, as created by create_laminate_arrays, to the laminae
+
+            :param load_type: Either thermal or combined
+            :type load_type: LoadType
+            :param stress_global: Global stress components
+            :type stress_global: ndarray(dtype=float, dim=3,nr_laminae*2)
+            :param stress_local: Local stress components
+            :type stress_local: ndarray(dtype=float, dim=3,nr_laminae*2)
+            :param strains_global: Global strain components
+            :type strains_global: ndarray(dtype=float, dim=3,nr_laminae*2)
+            :param strains_local: Local strain components
+            :type strains_local: ndarray(dtype=float, dim=3,nr_laminae*2)
+
+         """
+
+        for index, lamina in enumerate(self.laminae):
+            columns = slice(2 * index, 2 * index + 2)
+
+            if load_type == LoadType.thermal:
+                lamina.global_properties.thermal_stress.components = stress_global[:, columns].copy()
+                lamina.local_properties.thermal_stress.components = stress_local[:, columns].copy()
+                lamina.global_properties.thermal_strain.components = strains_global[:, columns].copy()
+                lamina.local_properties.thermal_strain.components = strains_local[:, columns].copy()
+
+            elif load_type == LoadType.combined:
+                lamina.global_properties.total_stress.components = stress_global[:, columns].copy()
+                lamina.local_properties.total_stress.components = stress_local[:, columns].copy()
+                lamina.global_properties.total_strain.components = strains_global[:, columns].copy()
+                lamina.local_properties.total_strain.components = strains_local[:, columns].copy()
+
     def compute_strains(self, loads, strain_type):
         """Computes strains for a certain outer load specified by loads
 
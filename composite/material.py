@@ -1,3 +1,4 @@
+import numpy as np
 
 
 class Material:
@@ -5,11 +6,86 @@ class Material:
 
                :param index: Material index
                :type index: int
+               :param modulus: Young's modulus, or one value per temperature in temperatures
+               :type modulus: float or list of floats
+               :param poisson_ratio: Poisson ratio, or one value per temperature in temperatures
+               :type poisson_ratio: float or list of floats
+               :param thermal_coefficient: Thermal coefficient, or one value per temperature in temperatures
+               :type thermal_coefficient: float or list of floats
+               :param temperatures: Temperatures of the property table in increasing order, None for constant properties
+               :type temperatures: list of floats
+               :param density: Mass per unit volume, None if unknown
+               :type density: float
+               :param name: Name in the material library, None for materials defined in the input file
+               :type name: str
+
+               :ivar modulus: Young's modulus at the current temperature
+               :ivar poisson_ratio: Poisson ratio at the current temperature
+               :ivar thermal_coefficient: Thermal coefficient at the current temperature
 
      """
 
-    def __init__(self, index, modulus, poisson_ratio, thermal_coefficient):
+    __slots__ = ('index', 'name', 'temperatures', 'density', 'modulus', 'poisson_ratio', 'thermal_coefficient',
+                 'modulus_table', 'poisson_ratio_table', 'thermal_coefficient_table')
+
+    def __init__(self, index, modulus, poisson_ratio, thermal_coefficient, temperatures=None, density=None,
+                 name=None):
         self.index = index
-        self.modulus = modulus
-        self.poisson_ratio = poisson_ratio
-        self.thermal_coefficient = thermal_coefficient
+        self.name = name
+        self.temperatures = None
+        self.density = density
+
+        if temperatures is None:
+            self.modulus = modulus
+            self.poisson_ratio = poisson_ratio
+            self.thermal_coefficient = thermal_coefficient
+        else:
+            self.temperatures = np.asarray(temperatures, dtype=float)
+            self.modulus_table = np.asarray(modulus, dtype=float)
+            self.poisson_ratio_table = np.asarray(poisson_ratio, dtype=float)
+            self.thermal_coefficient_table = np.asarray(thermal_coefficient, dtype=float)
+
+            if np.any(np.diff(self.temperatures) <= 0):
+                raise ValueError('Temperatures of material {} must be strictly increasing'.format(index))
+
+            # Use the first temperature in the table until another one is set
+            self.set_temperature(self.temperatures[0])
+
+    @property
+    def is_temperature_dependent(self):
+        return self.temperatures is not None
+
+    def set_temperature(self, temperature):
+        """Sets the scalar properties of the material to the values at temperature
+
+              :param temperature: Temperature to evaluate the property table at
+              :type temperature: float
+
+         """
+
+        if self.is_temperature_dependent:
+            self.modulus, self.poisson_ratio, self.thermal_coefficient = \
+                (float(value) for value in self.interpolate(temperature))
+
+    def interpolate(self, temperatures):
+        """Interpolates the properties linearly at temperatures, values outside the table are held constant
+
+              :param temperatures: Temperatures to evaluate the properties at
+              :type temperatures: float or ndarray(dtype=float)
+              :returns: modulus, poisson_ratio, thermal_coefficient
+              :rtype: Tuple of ndarray(dtype=float) with the same shape as temperatures
+
+         """
+
+        temperatures = np.asarray(temperatures, dtype=float)
+
+        if not self.is_temperature_dependent:
+            return (np.full(temperatures.shape, self.modulus, dtype=float),
+                    np.full(temperatures.shape, self.poisson_ratio, dtype=float),
+                    np.full(temperatures.shape, self.thermal_coefficient, dtype=float))
+
+        modulus = np.interp(temperatures, self.temperatures, self.modulus_table)
+        poisson_ratio = np.interp(temperatures, self.temperatures, self.poisson_ratio_table)
+        thermal_coefficient = np.interp(temperatures, self.temperatures, self.thermal_coefficient_table)
+
+        return modulus, poisson_ratio, thermal_coefficient
@@ -0,0 +1,180 @@
+"""Local library of named fibre and matrix materials and of the homogenised properties of their combinations.
+
+The library is an SQLite database. Rows are read once per process and kept in dictionaries, so repeated lookups do
+not query the database, and the homogenised properties of a fibre, matrix and volume fraction combination are
+computed once and stored, so later processes read them instead of recomputing the micromechanics.
+
+Input files reference library materials by name in the MATERIAL_LIBRARY section, see parser.create_materials.
+
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+from . material import Material
+from . stack import composite_properties, KSI_T, KSI_G
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS materials (
+    name TEXT PRIMARY KEY,
+    modulus TEXT NOT NULL,
+    poisson_ratio TEXT NOT NULL,
+    thermal_coefficient TEXT NOT NULL,
+    temperatures TEXT,
+    density REAL
+);
+CREATE TABLE IF NOT EXISTS plies (
+    fibre TEXT NOT NULL,
+    matrix TEXT NOT NULL,
+    volume_fraction REAL NOT NULL,
+    E_L REAL, E_T REAL, v_LT REAL, v_TL REAL, G_LT REAL, alpha_L REAL, alpha_T REAL,
+    PRIMARY KEY (fibre, matrix, volume_fraction)
+);
+"""
+
+_default_library = None
+
+
+def default_library():
+    """Returns the library at the default location, shared by all callers in the process"""
+
+    global _default_library
+
+    if _default_library is None:
+        _default_library = MaterialLibrary()
+
+    return _default_library
+
+
+class MaterialLibrary:
+    """Class for storing materials by name and the homogenised properties of their combinations
+
+          :param filepath: Database file, defaults to ~/.local/share/composite/materials.sqlite
+          :type filepath: str or Path
+
+          :ivar materials: Cached rows of the materials table by name
+          :ivar plies: Cached homogenised properties by fibre, matrix and volume fraction
+
+     """
+
+    def __init__(self, filepath=None):
+        if filepath is None:
+            filepath = Path.home().joinpath('.local', 'share', 'composite', 'materials.sqlite')
+
+        self.filepath = Path(filepath)
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.filepath), check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+        self.materials = {}
+        self.plies = {}
+
+    def close(self):
+        self.connection.close()
+
+    def names(self):
+        """Returns the names of all materials in the library, sorted"""
+
+        return [row[0] for row in self.connection.execute('SELECT name FROM materials ORDER BY name')]
+
+    def add_material(self, name, material):
+        """Stores material under name, replacing a material with the same name and the plies it is part of
+
+              :param name: Name to reference the material by
+              :type name: str
+              :param material: Material to store, its index is not stored
+              :type material: Instance of Material
+
+         """
+
+        if material.is_temperature_dependent:
+            row = (name, json.dumps(material.modulus_table.tolist()), json.dumps(material.poisson_ratio_table.tolist()),
+                   json.dumps(material.thermal_coefficient_table.tolist()), json.dumps(material.temperatures.tolist()),
+                   material.density)
+        else:
+            row = (name, json.dumps(float(material.modulus)), json.dumps(float(material.poisson_ratio)),
+                   json.dumps(float(material.thermal_coefficient)), None, material.density)
+
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO materials VALUES (?, ?, ?, ?, ?, ?)', row)
+            self.connection.execute('DELETE FROM plies WHERE fibre = ? OR matrix = ?', (name, name))
+
+        self.materials[name] = row
+        self.plies = {key: value for key, value in self.plies.items() if name not in key[:2]}
+
+    def remove_material(self, name):
+        with self.connection:
+            self.connection.execute('DELETE FROM materials WHERE name = ?', (name,))
+            self.connection.execute('DELETE FROM plies WHERE fibre = ? OR matrix = ?', (name, name))
+
+        self.materials.pop(name, None)
+        self.plies = {key: value for key, value in self.plies.items() if name not in key[:2]}
+
+    def row(self, name):
+        if name not in self.materials:
+            row = self.connection.execute('SELECT * FROM materials WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                raise KeyError('Material ' + repr(name) + ' is not in the library ' + str(self.filepath))
+            self.materials[name] = row
+
+        return self.materials[name]
+
+    def material(self, name, index=0):
+        """Creates a material from the library
+
+            A new instance is returned on each call as the properties of temperature dependent materials change with
+            Material.set_temperature.
+
+              :param name: Name of the material
+              :type name: str
+              :param index: Material index in the input file
+              :type index: int
+              :returns: material
+              :rtype: Instance of Material
+
+         """
+
+        _, modulus, poisson_ratio, thermal_coefficient, temperatures, density = self.row(name)
+        temperatures = None if temperatures is None else json.loads(temperatures)
+
+        return Material(index, json.loads(modulus), json.loads(poisson_ratio), json.loads(thermal_coefficient),
+                        temperatures=temperatures, density=density, name=name)
+
+    def ply_properties(self, fibre, matrix, volume_fraction):
+        """Returns the homogenised properties of a ply, computed and stored the first time the combination is used
+
+              :param fibre: Name of the fibre material
+              :type fibre: str
+              :param matrix: Name of the matrix material
+              :type matrix: str
+              :param volume_fraction: Fibre volume fraction
+              :type volume_fraction: float
+              :returns: E_L, E_T, v_LT, v_TL, G_LT, alpha_L, alpha_T as computed by stack.composite_properties
+              :rtype: Tuple of floats
+
+         """
+
+        key = (fibre, matrix, float(volume_fraction))
+
+        if key not in self.plies:
+            row = self.connection.execute('SELECT E_L, E_T, v_LT, v_TL, G_LT, alpha_L, alpha_T FROM plies '
+                                          'WHERE fibre = ? AND matrix = ? AND volume_fraction = ?', key).fetchone()
+
+            if row is None:
+                fibre_material, matrix_material = self.material(fibre), self.material(matrix)
+                if fibre_material.is_temperature_dependent or matrix_material.is_temperature_dependent:
+                    raise ValueError('Ply properties of temperature dependent materials depend on the temperature')
+
+                row = tuple(float(value) for value in composite_properties(
+                    fibre_material.modulus, matrix_material.modulus, fibre_material.poisson_ratio,
+                    matrix_material.poisson_ratio, key[2], fibre_material.thermal_coefficient,
+                    matrix_material.thermal_coefficient, KSI_T, KSI_G))
+
+                with self.connection:
+                    self.connection.execute('INSERT OR REPLACE INTO plies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                            key + row)
+
+            self.plies[key] = tuple(row)
+
+        return self.plies[key]
@@ -0,0 +1,200 @@
+"""Process pool solving stacks of cases with inputs and results in shared memory.
+
+Workers receive only the names, shapes and types of the shared blocks and a range of cases, so no Lamina objects or
+arrays are pickled. Each worker maps the blocks once, solves its range with sweep.solve_cases and writes the results
+directly into the output blocks.
+
+"""
+
+import multiprocessing
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from . sweep import RESULTS, solve_cases
+from . precision import PrecisionPolicy, get_policy, set_policy
+
+PLY_INPUTS = ('Ef', 'Em', 'vf', 'vm', 'alpha_f', 'alpha_m', 'volume_fraction', 'angle', 'thickness')
+LOAD_TYPES = ('thermal', 'combined')
+
+# Blocks mapped by the worker process, kept between tasks of the same solve
+_attached = {}
+
+
+class SharedArray:
+    """Class for a NumPy array backed by a shared memory block
+
+               :param shape: Shape of the array
+               :type shape: tuple of int
+               :param dtype: Type of the array
+               :type dtype: NumPy type
+               :param name: Name of an existing block to map, a new block is created if None
+               :type name: str
+
+               :ivar array: The array, valid until close is called
+
+     """
+
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape, dtype=np.int64)) * self.dtype.itemsize)
+
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+    @property
+    def spec(self):
+        """Name, shape and type, enough for another process to map the array"""
+        return self.memory.name, self.shape, self.dtype.str
+
+    def close(self):
+        """Releases the mapping, and the block itself if this process created it"""
+
+        self.array = None
+        try:
+            self.memory.close()
+        except BufferError:
+            # Views of the array are still referenced, the mapping is released with the last of them
+            pass
+        if self.owner:
+            self.memory.unlink()
+
+
+class ParallelSolver:
+    """Solves stacks of cases on a pool of worker processes
+
+        The case range is split into tasks of at least min_task_size cases. Results are returned as views of the
+        shared output blocks, valid until the next call of solve or until the solver is closed.
+
+          :param processes: Number of worker processes, the number of CPUs if None
+          :type processes: int
+          :param min_task_size: Minimum number of cases per task
+          :type min_task_size: int
+
+          :ivar timings: Time in seconds spent by the workers on each task of the last solve
+
+     """
+
+    def __init__(self, processes=None, min_task_size=256):
+        self.processes = processes or os.cpu_count()
+        self.min_task_size = min_task_size
+
+        # Workers must share the resource tracker of this process, otherwise the tracker of a worker unlinks the
+        # blocks it mapped when the worker exits
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(self.processes)
+        self.inputs = {}
+        self.outputs = {}
+        self.timings = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def allocate(self, plies, mechanical_loads, delta_T):
+        """Copies the inputs into shared blocks and creates the output blocks, reusing blocks of the same shape"""
+
+        cases, size = np.shape(plies['angle'])
+        storage = get_policy().storage
+
+        shapes = {name: ((cases, size), np.float64) for name in PLY_INPUTS}
+        shapes.update({'mechanical_loads': ((cases, 6), np.float64), 'delta_T': ((cases,), np.float64)})
+        output_shapes = {'z_coordinates': ((cases, 2 * size), storage)}
+        output_shapes.update({load_type + '_' + name: ((cases, 3, 2 * size), storage)
+                              for load_type in LOAD_TYPES for name in RESULTS})
+
+        for blocks, block_shapes in ((self.inputs, shapes), (self.outputs, output_shapes)):
+            for name, (shape, dtype) in block_shapes.items():
+                block = blocks.get(name)
+                if block is None or block.shape != shape or block.dtype != np.dtype(dtype):
+                    if block is not None:
+                        block.close()
+                    blocks[name] = SharedArray(shape, dtype)
+
+        for name in PLY_INPUTS:
+            self.inputs[name].array[...] = plies[name]
+        self.inputs['mechanical_loads'].array[...] = mechanical_loads
+        self.inputs['delta_T'].array[...] = delta_T
+
+    def solve(self, plies, mechanical_loads, delta_T):
+        """Solves thermal and combined loading of a stack of cases, see sweep.solve_cases
+
+              :returns: Interface coordinates and per load type name the result arrays, as views of shared memory
+              :rtype: ndarray(dtype=float), dict
+
+         """
+
+        self.allocate(plies, mechanical_loads, delta_T)
+
+        cases = len(self.inputs['delta_T'].array)
+        task_size = max(self.min_task_size, -(-cases // (4 * self.processes)))
+        specs = ({name: block.spec for name, block in self.inputs.items()},
+                 {name: block.spec for name, block in self.outputs.items()})
+        # The types of the policy are passed on, so workers use custom policies as well
+        policy = get_policy()
+        policy = (policy.name, policy.storage.str, policy.accumulation.str)
+        tasks = [(specs, start, min(start + task_size, cases), policy) for start in range(0, cases, task_size)]
+
+        self.timings = self.pool.map(solve_task, tasks)
+
+        results = {load_type: {name: self.outputs[load_type + '_' + name].array for name in RESULTS}
+                   for load_type in LOAD_TYPES}
+
+        return self.outputs['z_coordinates'].array, results
+
+    def close(self):
+        """Stops the workers and releases the shared blocks"""
+
+        self.pool.close()
+        self.pool.join()
+
+        for block in list(self.inputs.values()) + list(self.outputs.values()):
+            block.close()
+        self.inputs, self.outputs = {}, {}
+
+
+def attach(specs):
+    """Maps the blocks of specs in a worker, releasing blocks of previous solves"""
+
+    names = {spec[0] for spec in specs.values()}
+    for name in set(_attached) - names:
+        _attached.pop(name).close()
+
+    arrays = {}
+    for key, (name, shape, dtype) in specs.items():
+        if name not in _attached:
+            _attached[name] = SharedArray(shape, dtype, name)
+        arrays[key] = _attached[name].array
+
+    return arrays
+
+
+def solve_task(task):
+    """Solves one range of cases in a worker and returns the time it took"""
+
+    (input_specs, output_specs), start, stop, policy = task
+    begin = time.perf_counter()
+
+    arrays = attach(dict(input_specs, **output_specs))
+    set_policy(PrecisionPolicy(*policy))
+
+    plies = {name: arrays[name][start:stop] for name in PLY_INPUTS}
+    z_coordinates, results = solve_cases(plies, arrays['mechanical_loads'][start:stop], arrays['delta_T'][start:stop])
+
+    arrays['z_coordinates'][start:stop] = z_coordinates
+    for load_type in LOAD_TYPES:
+        for name in RESULTS:
+            arrays[load_type + '_' + name][start:stop] = results[load_type][name]
+
+    return time.perf_counter() - begin
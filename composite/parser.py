@@ -1,5 +1,7 @@
 import composite
+import numpy as np
 from pathlib import Path
+from . stack import interface_coordinates
 
 
 def replace_characters(string):
@@ -14,19 +16,16 @@ def replace_characters(string):
     return string_stripped
 
 
-def read_input_file(filename='', filepath=''):
-    """ Reads the input file and creates an instance of composite.Laminate which in turn holds composite.Laminae instances
+def read_input_data(filepath):
+    """ Reads the input file into a dictionary with one entry per *SECTION, holding one entry per +KEY
 
-                 :param filename: Input file
-                 :type filename: Text file
-                 :return: composite.Laminate instance, project_name
-                 :rtype: Instance of composite.Laminate
+                 :param filepath: Input file
+                 :type filepath: str or Path
+                 :return: input_data
+                 :rtype: dict
 
        """
 
-    if filepath == '':
-        filepath = Path.cwd().joinpath('input', filename)
-
     # Initiate empty dictionary that can store the data
     input_data = {}
 
@@ -44,74 +43,197 @@ def read_input_file(filename='', filepath=''):
                         sub_key = line[1:].rstrip()
                         input_data[key][sub_key] = []
                     else:
-                        if key == 'PROJECT_INFO':
+                        if key in ('PROJECT_INFO', 'MATERIAL_LIBRARY'):
                             input_data[key][sub_key].append(line)
                         else:
                             [input_data[key][sub_key].append(float(num)) for num in line.split(',')]
 
+    return input_data
+
+
+def create_materials(input_data, library=None):
+    """ Creates the materials of the input data, temperature dependent materials are evaluated at the final temperature
+
+        Materials of the MATERIAL_LIBRARY section are given by their name in the material library.
+
+                 :param input_data: Data read by read_input_data
+                 :type input_data: dict
+                 :param library: Library of the MATERIAL_LIBRARY materials, the default library if None
+                 :type library: Instance of composite.MaterialLibrary
+                 :return: materials
+                 :rtype: List of instances of composite.Material
+
+       """
+
     # Create instances of the materials
     materials = []
-    materials_input = input_data['MATERIALS']
+    materials_input = input_data.get('MATERIALS', {})
 
     for material_index, properties in materials_input.items():
         modulus = properties[0]
         poisson_ratio = properties[1]
         thermal_coefficient = properties[2]
-        materials.append(composite.Material(int(material_index), modulus, poisson_ratio, thermal_coefficient))
+        density = properties[3] if len(properties) > 3 else None
+        materials.append(composite.Material(int(material_index), modulus, poisson_ratio, thermal_coefficient,
+                                            density=density))
+
+    # Materials referenced by name in the material library
+    if input_data.get('MATERIAL_LIBRARY'):
+        if library is None:
+            from . material_library import default_library
+            library = default_library()
+        for material_index, names in input_data['MATERIAL_LIBRARY'].items():
+            materials.append(library.material(names[0].strip(), int(material_index)))
+
+    # Property tables on the format (temperature, Young's modulus, poisson ratio, thermal coefficient) per row
+    for material_index, table in input_data.get('MATERIAL_TABLES', {}).items():
+        temperatures, modulus, poisson_ratio, thermal_coefficient = np.reshape(table, (-1, 4)).T
+
+        # The density is constant and kept from *MATERIALS
+        density = next((material.density for material in materials if material.index == int(material_index)), None)
+        materials = [material for material in materials if material.index != int(material_index)]
+        materials.append(composite.Material(int(material_index), modulus, poisson_ratio, thermal_coefficient,
+                                            temperatures=temperatures, density=density))
+
+    # Evaluate temperature dependent materials at the final temperature
+    loads = input_data['LOADS']
+    if any(material.is_temperature_dependent for material in materials):
+        if 'T_REF' not in loads:
+            raise ValueError('T_REF must be specified for temperature dependent materials')
+        final_temperature = loads['T_REF'][0] + loads.get('DELTA_T', [0.0])[0]
+        for material in materials:
+            material.set_temperature(final_temperature)
 
-    # Create an instance of a composite.Lamina
-    lamina_data = input_data['LAMINAE']
+    return materials
 
-    # Create list for storing composite.Laminae
-    laminae = []
-    laminae_properties = []
 
-    for lamina_index, properties in lamina_data.items():
-        thickness = properties[0]
-        angle = properties[1]
-        volume_fraction = properties[4]
+def create_lamina(lamina_index, properties, materials, coordinates, library=None):
+    """ Creates a lamina from one row of the LAMINAE section
 
-        # Assign material instances to the laina
-        for material in materials:
-            if getattr(material, 'index') == int(properties[3]):
-                matrix_material = material
-            elif getattr(material, 'index') == int(properties[2]):
-                fibre_material = material
-            else:
-                print('Must specify a valid material for matrix and fibres')
-
-        # Lamina top and bottom coordinates relative bottom of bottom ply
-        if int(lamina_index) == 1:
-            z1 = 0
-            z2 = thickness
-        else:
-            z1 = z2
-            z2 += thickness
+        The homogenised properties of plies of constant library materials are read from the library.
 
-        laminae_properties.append((int(lamina_index), thickness, matrix_material,
-                                fibre_material, volume_fraction, angle, [z1, z2]))
+                 :param lamina_index: Index in lay up sequence
+                 :type lamina_index: int
+                 :param properties: Thickness, angle, fibre material, matrix material and volume fraction fibres
+                 :type properties: List of floats
+                 :param materials: Materials to pick the fibre and matrix materials from, by index
+                 :type materials: Dict of instances of composite.Material
+                 :param coordinates: Bottom and top coordinates relative the mid-plane
+                 :type coordinates: List of floats
+                 :param library: Library of the materials with a name, the default library if None
+                 :type library: Instance of composite.MaterialLibrary
+                 :return: lamina
+                 :rtype: Instance of composite.Lamina
 
-    for lamina_properties in laminae_properties:
-        lamina_properties[6][0] -= z2/2
-        lamina_properties[6][1] -= z2 / 2
-        laminae.append(composite.Lamina(*lamina_properties))
+       """
 
-    # Create an instance of composite.Laminate with the composite.Laminae
-    laminate = composite.Laminate(laminae)
+    thickness = properties[0]
+    angle = properties[1]
+    volume_fraction = properties[4]
+
+    # Assign material instances to the lamina
+    try:
+        fibre_material = materials[int(properties[2])]
+        matrix_material = materials[int(properties[3])]
+    except KeyError:
+        raise ValueError('Must specify a valid material for matrix and fibres of lamina {}'.format(lamina_index))
+
+    composite_properties = None
+    if fibre_material.name is not None and matrix_material.name is not None and not \
+            (fibre_material.is_temperature_dependent or matrix_material.is_temperature_dependent):
+        if library is None:
+            from . material_library import default_library
+            library = default_library()
+        composite_properties = library.ply_properties(fibre_material.name, matrix_material.name, volume_fraction)
+
+    return composite.Lamina(int(lamina_index), thickness, matrix_material, fibre_material, volume_fraction, angle,
+                            coordinates, properties=composite_properties)
+
+
+def add_loads(laminate, loads):
+    """ Adds the loads of the LOADS section to the laminate
+
+                 :param laminate: Laminate to add the loads to
+                 :type laminate: Instance of composite.Laminate
+                 :param loads: LOADS section of the input data
+                 :type loads: dict
+
+       """
 
-    # Add loads to the composite.Laminate
-    loads = input_data['LOADS']
     for load_type, magnitudes in loads.items():
         if load_type == 'M':
             laminate.add_loads(moments=magnitudes)
         elif load_type == 'N':
             laminate.add_loads(normal_forces=magnitudes)
+        elif load_type == 'Q':
+            laminate.add_loads(shear_forces=magnitudes)
         elif load_type == 'DELTA_T':
             laminate.add_loads(delta_T=magnitudes)
+        elif load_type == 'T_REF':
+            laminate.add_loads(reference_temperature=magnitudes)
+        elif load_type == 'THERMAL_STEPS':
+            laminate.add_loads(thermal_steps=magnitudes)
         else:
             print('Unsupported load type')
 
+
+def create_laminate(input_data, materials=None, library=None):
+    """ Creates an instance of composite.Laminate from the input data
+
+                 :param input_data: Data read by read_input_data
+                 :type input_data: dict
+                 :param materials: Materials to use, created from the input data if None
+                 :type materials: List of instances of composite.Material
+                 :param library: Library of the MATERIAL_LIBRARY materials, the default library if None
+                 :type library: Instance of composite.MaterialLibrary
+                 :return: composite.Laminate instance
+                 :rtype: Instance of composite.Laminate
+
+       """
+
+    if materials is None:
+        materials = create_materials(input_data, library)
+    materials = {material.index: material for material in materials}
+
+    # Create an instance of a composite.Lamina
+    lamina_data = input_data['LAMINAE']
+
+    # Create list for storing composite.Laminae
+    laminae = []
+
+    # Lamina top and bottom coordinates relative the mid-plane
+    z = interface_coordinates([properties[0] for properties in lamina_data.values()])
+
+    for position, (lamina_index, properties) in enumerate(lamina_data.items()):
+        coordinates = [float(z[position]), float(z[position + 1])]
+        laminae.append(create_lamina(lamina_index, properties, materials, coordinates, library))
+
+    # Create an instance of composite.Laminate with the composite.Laminae
+    laminate = composite.Laminate(laminae)
+
+    # Add loads to the composite.Laminate
+    add_loads(laminate, input_data['LOADS'])
+
+    return laminate
+
+
+def read_input_file(filename='', filepath='', library=None):
+    """ Reads the input file and creates an instance of composite.Laminate which in turn holds composite.Laminae instances
+
+                 :param filename: Input file
+                 :type filename: Text file
+                 :param library: Library of the MATERIAL_LIBRARY materials, the default library if None
+                 :type library: Instance of composite.MaterialLibrary
+                 :return: composite.Laminate instance, project_name
+                 :rtype: Instance of composite.Laminate
+
+       """
+
+    if filepath == '':
+        filepath = Path.cwd().joinpath('input', filename)
+
+    input_data = read_input_data(filepath)
+    laminate = create_laminate(input_data, library=library)
     project_info = input_data['PROJECT_INFO']
 
     return laminate, project_info
-
@@ -0,0 +1,263 @@
+"""Rectangular simply supported plates of a laminate, solved with the Navier double Fourier series.
+
+The Navier solution holds for specially orthotropic laminates, i.e. B = 0 and D16 = D26 = 0. The deflection is
+
+    w(x, y) = sum_mn W_mn sin(alpha_m x) sin(beta_n y),    alpha_m = m pi / a,    beta_n = n pi / b
+
+    W_mn = q_mn / (D11 alpha_m^4 + 2 (D12 + 2 D66) alpha_m^2 beta_n^2 + D22 beta_n^4)
+
+where q_mn are the Fourier coefficients of the distributed load. The sine and cosine factors separate in (m, x) and
+(n, y), so the sums over (m, n, x, y) are done as two matrix products per field without forming the four
+dimensional array of terms.
+
+"""
+
+import numpy as np
+
+from . coordinate_systems import CoordinateSystem
+from . precision import get_policy
+
+
+def mode_stiffness(D, alpha, beta):
+    """Computes D11 alpha^4 + 2 (D12 + 2 D66) alpha^2 beta^2 + D22 beta^4 of sine modes of a specially orthotropic plate
+
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param alpha: Wave numbers m pi / a in x direction, broadcast against the leading dimensions of D
+          :type alpha: ndarray(dtype=float)
+          :param beta: Wave numbers n pi / b in y direction, broadcast against the leading dimensions of D
+          :type beta: ndarray(dtype=float)
+          :rtype: ndarray(dtype=float)
+
+     """
+
+    D = np.asarray(D)
+    alpha, beta = np.asarray(alpha) ** 2, np.asarray(beta) ** 2
+
+    return D[..., 0, 0] * alpha ** 2 + 2 * (D[..., 0, 1] + 2 * D[..., 2, 2]) * alpha * beta + D[..., 1, 1] * beta ** 2
+
+
+class UniformLoad:
+    """Uniform pressure over the whole plate
+
+               :param q0: Pressure
+               :type q0: float
+
+     """
+
+    def __init__(self, q0):
+        self.q0 = q0
+
+    def coefficients(self, m, n, a, b):
+        """Returns the Fourier coefficients q_mn, dim=len(m),len(n)"""
+
+        m, n = m[:, np.newaxis], n[np.newaxis, :]
+        odd = (m % 2 == 1) & (n % 2 == 1)
+
+        return np.where(odd, 16 * self.q0 / (np.pi ** 2 * m * n), 0.0)
+
+
+class SinusoidalLoad:
+    """Pressure q0 sin(pi x / a) sin(pi y / b), solved exactly by the first term of the series
+
+               :param q0: Pressure at the centre of the plate
+               :type q0: float
+
+     """
+
+    def __init__(self, q0):
+        self.q0 = q0
+
+    def coefficients(self, m, n, a, b):
+        """Returns the Fourier coefficients q_mn, dim=len(m),len(n)"""
+
+        return np.where((m[:, np.newaxis] == 1) & (n[np.newaxis, :] == 1), float(self.q0), 0.0)
+
+
+class PatchLoad:
+    """Uniform pressure over a rectangular patch
+
+               :param q0: Pressure
+               :type q0: float
+               :param x0: X coordinate of the centre of the patch
+               :type x0: float
+               :param y0: Y coordinate of the centre of the patch
+               :type y0: float
+               :param width: Size of the patch in x direction
+               :type width: float
+               :param height: Size of the patch in y direction
+               :type height: float
+
+     """
+
+    def __init__(self, q0, x0, y0, width, height):
+        self.q0 = q0
+        self.x0, self.y0 = x0, y0
+        self.width, self.height = width, height
+
+    def coefficients(self, m, n, a, b):
+        """Returns the Fourier coefficients q_mn, dim=len(m),len(n)"""
+
+        factor_x = np.sin(m * np.pi * self.x0 / a) * np.sin(m * np.pi * self.width / (2 * a)) / m
+        factor_y = np.sin(n * np.pi * self.y0 / b) * np.sin(n * np.pi * self.height / (2 * b)) / n
+
+        return 16 * self.q0 / np.pi ** 2 * np.outer(factor_x, factor_y)
+
+
+class PointLoad:
+    """Concentrated force
+
+               :param P: Force
+               :type P: float
+               :param x0: X coordinate of the force
+               :type x0: float
+               :param y0: Y coordinate of the force
+               :type y0: float
+
+     """
+
+    def __init__(self, P, x0, y0):
+        self.P = P
+        self.x0, self.y0 = x0, y0
+
+    def coefficients(self, m, n, a, b):
+        """Returns the Fourier coefficients q_mn, dim=len(m),len(n)"""
+
+        return 4 * self.P / (a * b) * np.outer(np.sin(m * np.pi * self.x0 / a), np.sin(n * np.pi * self.y0 / b))
+
+
+class Plate:
+    """Class used to represent a rectangular plate, simply supported on all edges
+
+               :param laminate: Laminate of the plate
+               :type laminate: Instance of Laminate
+               :param a: Length of the plate in x direction
+               :type a: float
+               :param b: Length of the plate in y direction
+               :type b: float
+               :param tolerance: Largest allowed B and D16, D26 relative to the norm of A and D respectively. The
+                                 coupling terms are ignored without a check if None
+               :type tolerance: float
+
+     """
+
+    def __init__(self, laminate, a, b, tolerance=1e-6):
+        self.laminate = laminate
+        self.a, self.b = a, b
+        self.D = np.array(laminate.D, dtype=get_policy().accumulation)
+
+        if tolerance is not None and not self.is_specially_orthotropic(tolerance):
+            raise ValueError('Navier solution requires a specially orthotropic laminate, B = 0 and D16 = D26 = 0')
+
+    def is_specially_orthotropic(self, tolerance=1e-6):
+        """Returns True if the coupling terms B, D16 and D26 are negligible"""
+
+        A, B, D = self.laminate.A, self.laminate.B, self.laminate.D
+        coupling = np.abs(B).max() <= tolerance * np.abs(A).max() * self.laminate.thickness
+        twisting = max(abs(D[0, 2]), abs(D[1, 2])) <= tolerance * np.abs(D).max()
+
+        return coupling and twisting
+
+    def wave_numbers(self, terms):
+        """Returns m, n, alpha_m and beta_n for terms half waves in each direction"""
+
+        m = np.arange(1, terms + 1)
+        n = np.arange(1, terms + 1)
+
+        return m, n, m * np.pi / self.a, n * np.pi / self.b
+
+    def bending_stiffness(self, alpha, beta):
+        """Returns the bending stiffness of the modes, dim=len(alpha),len(beta), see mode_stiffness"""
+
+        return mode_stiffness(self.D, alpha[:, np.newaxis], beta[np.newaxis, :])
+
+    def solve(self, load, terms=99, grid=(101, 101)):
+        """Computes deflections, curvatures and moments on a grid
+
+              :param load: Distributed load, e.g. UniformLoad
+              :type load: Object with a coefficients(m, n, a, b) method
+              :param terms: Number of terms in each direction of the series
+              :type terms: int
+              :param grid: Number of points in x and y direction, edges included
+              :type grid: tuple of int
+              :rtype: PlateResult
+
+         """
+
+        m, n, alpha, beta = self.wave_numbers(terms)
+        x = np.linspace(0, self.a, grid[0])
+        y = np.linspace(0, self.b, grid[1])
+
+        W = load.coefficients(m, n, self.a, self.b) / self.bending_stiffness(alpha, beta)
+
+        # Mode shapes dim=terms,grid
+        sin_x, cos_x = np.sin(np.outer(alpha, x)), np.cos(np.outer(alpha, x))
+        sin_y, cos_y = np.sin(np.outer(beta, y)), np.cos(np.outer(beta, y))
+
+        def series(coefficients, shape_x, shape_y):
+            return shape_x.T @ coefficients @ shape_y
+
+        deflection = series(W, sin_x, sin_y)
+        curvatures = np.stack((series(W * alpha[:, np.newaxis] ** 2, sin_x, sin_y),
+                               series(W * beta[np.newaxis, :] ** 2, sin_x, sin_y),
+                               -2 * series(W * np.outer(alpha, beta), cos_x, cos_y)))
+
+        return PlateResult(self, x, y, deflection, curvatures)
+
+
+class PlateResult:
+    """Class used to represent the solution of a plate
+
+               :ivar x: X coordinates of the grid, dim=nx
+               :ivar y: Y coordinates of the grid, dim=ny
+               :ivar deflection: Deflection, dim=nx,ny
+               :ivar curvatures: Curvatures [kx, ky, kxy], dim=3,nx,ny
+               :ivar moments: Moments per unit width [Mx, My, Mxy], dim=3,nx,ny
+
+     """
+
+    def __init__(self, plate, x, y, deflection, curvatures):
+        self.plate = plate
+        self.x, self.y = x, y
+        policy = get_policy()
+        self.deflection = policy.store(deflection)
+        self.curvatures = policy.store(curvatures)
+        self.moments = policy.store(np.einsum('ij,j...->i...', plate.D, curvatures))
+
+    @property
+    def max_deflection(self):
+        return np.abs(self.deflection).max()
+
+    def lamina_at(self, z):
+        """Returns the lamina containing z, the lower lamina at an interface"""
+
+        for lamina in self.plate.laminate.laminae:
+            if lamina.coordinates[0] <= z <= lamina.coordinates[1]:
+                return lamina
+
+        raise ValueError('z = ' + str(z) + ' is outside the laminate')
+
+    def strains(self, z):
+        """Returns the strains [ex, ey, gxy] at z in global coordinate system, dim=3,nx,ny"""
+
+        return z * self.curvatures
+
+    def stress(self, z, coordinate_system=CoordinateSystem.xy):
+        """Computes the stress at z
+
+              :param z: Z coordinate relative the mid-plane
+              :type z: float
+              :param coordinate_system: Coordinate system of the stress components
+              :type coordinate_system: CoordinateSystem
+              :returns: Stress components, dim=3,nx,ny
+              :rtype: ndarray(dtype=float)
+
+         """
+
+        lamina = self.lamina_at(z)
+        stress = np.einsum('ij,j...->i...', lamina.global_properties.Q, self.strains(z))
+
+        if coordinate_system == CoordinateSystem.LT:
+            stress = np.einsum('ij,j...->i...', lamina.T1, stress)
+
+        return get_policy().store(stress)
@@ -1,6 +1,6 @@
-from coordinate_systems import CoordinateSystem
-from stress import StressState
-from strain import StrainState
+from . coordinate_systems import CoordinateSystem
+from . stress import StressState
+from . strain import StrainState
 
 def plot_stress(axes, coordinates, quantity):
     """Plot graphs of the stress components supplied by stress as a function of z coordinates
@@ -1,9 +1,9 @@
-from coordinate_systems import CoordinateSystem
-from stress import StressState
-from strain import StrainState
+from . coordinate_systems import CoordinateSystem
+from . stress import StressState
+from . strain import StrainState
 
 
-def plot_stress(axes, coordinates, quantity, component):
+def plot_stress(axes, coordinates, quantity, component, label=None, linestyle='-'):
     """Plot graphs of the stress components supplied by stress as a function of z coordinates
 
           :param axes: Axes to hold the graphs
@@ -12,6 +12,10 @@ def plot_stress(axes, coordinates, quantity, component):
           :type coordinates: ndarray(dtype=float, dim=n,1)
           :param quantity: Stress or strain state to be plotted
           :type quantity: Instance of StressState or StrainState
+          :param label: Legend entry of the graph
+          :type label: str
+          :param linestyle: Line style, used to tell the graphs of overlaid laminates apart
+          :type linestyle: str
 
      """
     colors = ['blue', 'green', 'red']
@@ -19,11 +23,13 @@ def plot_stress(axes, coordinates, quantity, component):
     if isinstance(quantity, StressState):
         x_labels_global = [r'$\sigma_x$' + ' [MPa]', r'$\sigma_y$' + ' [MPa]', r'$\sigma_{xy}$' + ' [MPa]']
         x_labels_local = [r'$\sigma_L$' + ' [MPa]', r'$\sigma_T$' + ' [MPa]', r'$\sigma_{LT}$' + ' [MPa]']
-        graph = axes.plot(quantity.components[component, :] / 1e6, coordinates * 1e3, colors[component])
+        graph = axes.plot(quantity.components[component, :] / 1e6, coordinates * 1e3, colors[component],
+                          linestyle=linestyle, label=label)
     else:
         x_labels_global = [r'$\epsilon_x$' + ' [1e-3]', r'$\epsilon_y$' + ' [1e-3]', r'$\epsilon_{xy}$' + ' [1e-3]']
         x_labels_local = [r'$\epsilon_L$' + ' [1e-3]', r'$\epsilon_T$' + ' [1e-3]', r'$\epsilon_{LT}$' + ' [1e-3]']
-        graph = axes.plot(quantity.components[component, :] * 1e3, coordinates * 1e3, colors[component])
+        graph = axes.plot(quantity.components[component, :] * 1e3, coordinates * 1e3, colors[component],
+                          linestyle=linestyle, label=label)
 
     axes.set_ylabel('z ' + "[mm]")
     if quantity.coordinate_system == CoordinateSystem.LT:
@@ -0,0 +1,176 @@
+"""Precision policies for the arrays of the solver and the result store.
+
+A policy has a storage type, used for ply property stacks and result arrays, and an accumulation type, used for
+the sums giving A, B, D and thermal forces and for the solution of the laminate equations. Interface coordinates
+are always kept in the accumulation type since the differences of their squares and cubes cancel.
+
+Error bounds for the single precision policy, relative to the largest magnitude of each result array and with
+u = 2**-24 the unit roundoff of float32:
+
+* Laminate (per lamina objects): A, B, D and the solution are computed in float64 and only the results are
+  rounded, so global components are within u. Local components are transformed from the rounded global ones with
+  matrices whose rows sum to at most 2 in magnitude, giving 5u.
+* composite.stack (vectorized): rounding the ply stiffness tensors perturbs A, B and D by at most u componentwise,
+  which changes the strains by at most cond * u where cond is the Skeel condition number of [[A, B], [B, D]].
+  Ply stresses and local components add the rounding of Q_bar and of the stored results, giving (cond + 6) * u.
+
+compare_precision checks these bounds for a laminate.
+
+"""
+
+import contextlib
+import contextvars
+
+import numpy as np
+
+
+class PrecisionPolicy:
+    """Class that represents the floating point types used by the solver
+
+               :param name: Name of the policy
+               :type name: str
+               :param storage: Type of ply property stacks and result arrays
+               :type storage: NumPy floating point type
+               :param accumulation: Type of stiffness matrix sums and of the solution of the laminate equations
+               :type accumulation: NumPy floating point type
+
+     """
+
+    def __init__(self, name, storage, accumulation):
+        self.name = name
+        self.storage = np.dtype(storage)
+        self.accumulation = np.dtype(accumulation)
+
+    def __repr__(self):
+        return 'PrecisionPolicy({!r}, {}, {})'.format(self.name, self.storage, self.accumulation)
+
+    @property
+    def unit_roundoff(self):
+        return float(np.finfo(self.storage).eps) / 2
+
+    def store(self, array):
+        """Converts array to the storage type, without copying if it already has that type"""
+        return np.asarray(array, dtype=self.storage)
+
+    def accumulate(self, array):
+        """Converts array to the accumulation type, without copying if it already has that type"""
+        return np.asarray(array, dtype=self.accumulation)
+
+    def error_bound(self, condition_number=0.0):
+        """Returns the bound on the error of a result array relative to its largest magnitude
+
+              :param condition_number: Skeel condition number of the laminate stiffness matrix, 0 for results of
+                                       Laminate where the solution is computed in float64
+              :type condition_number: float
+              :rtype: float
+
+         """
+
+        return (condition_number + 6) * self.unit_roundoff
+
+
+DOUBLE = PrecisionPolicy('double', np.float64, np.float64)
+SINGLE = PrecisionPolicy('single', np.float32, np.float64)
+
+# Context variables are local to each thread and asyncio task
+_policy = contextvars.ContextVar('precision_policy', default=DOUBLE)
+
+
+def get_policy():
+    """Returns the precision policy of the current context"""
+    return _policy.get()
+
+
+def set_policy(policy):
+    """Sets the precision policy of the current context
+
+          :param policy: Policy to use
+          :type policy: PrecisionPolicy
+          :returns: Token that can be passed to reset_policy
+          :rtype: contextvars.Token
+
+     """
+
+    return _policy.set(policy)
+
+
+def reset_policy(token):
+    _policy.reset(token)
+
+
+@contextlib.contextmanager
+def precision(policy):
+    """Context manager that uses policy within the with block
+
+          :param policy: Policy to use
+          :type policy: PrecisionPolicy
+
+     """
+
+    token = set_policy(policy)
+    try:
+        yield policy
+    finally:
+        reset_policy(token)
+
+
+def skeel_condition_number(A, B, D):
+    """Computes the Skeel condition number || |K^-1| |K| || of the laminate stiffness matrix K
+
+        Unlike the ordinary condition number it is unaffected by the different units of the A, B and D blocks.
+
+          :rtype: float or ndarray(dtype=float)
+
+     """
+
+    A, B, D = (np.asarray(matrix, dtype=float) for matrix in (A, B, D))
+    K = np.concatenate((np.concatenate((A, B), axis=-1), np.concatenate((B, D), axis=-1)), axis=-2)
+    product = np.abs(np.linalg.inv(K)) @ np.abs(K)
+
+    return np.abs(product).sum(axis=-1).max(axis=-1)
+
+
+def compare_precision(laminate, policy=SINGLE):
+    """Solves the laminate with the double precision policy and with policy and compares the results
+
+        The thermal and combined results are computed in order for both policies, so the laminae hold the results
+        of policy afterwards.
+
+          :param laminate: Laminate to solve
+          :type laminate: Instance of Laminate
+          :param policy: Policy to compare with double precision
+          :type policy: PrecisionPolicy
+          :returns: Maximum error relative to the largest magnitude per result array, the error bound, and whether
+                    all errors are within the bound
+          :rtype: dict
+
+     """
+
+    # Imported here since laminate depends on this module
+    from . laminate import LoadType
+
+    names = ('stress_global', 'stress_local', 'strains_global', 'strains_local')
+
+    def solve():
+        laminate.compute_thermal_stress()
+        thermal = laminate.create_laminate_arrays(LoadType.thermal)
+        laminate.compute_total_stress()
+        combined = laminate.create_laminate_arrays(LoadType.combined)
+        return {'thermal': thermal[:4], 'combined': combined[:4]}
+
+    with precision(DOUBLE):
+        reference = solve()
+    with precision(policy):
+        results = solve()
+
+    errors = {}
+    for load_type in reference:
+        for name, expected, actual in zip(names, reference[load_type], results[load_type]):
+            expected = expected.components
+            actual = np.asarray(actual.components, dtype=float)
+            scale = np.abs(expected).max()
+            errors[load_type + '_' + name] = float(np.abs(actual - expected).max() / scale) if scale else 0.0
+
+    bound = policy.error_bound()
+
+    return {'errors': errors, 'bound': bound, 'within_bound': all(error <= bound for error in errors.values())}
@@ -5,7 +5,7 @@ from pathlib import Path
 import xlwt
 from xlwt import Workbook
 
-from composite import LoadType, Quantity
+from . laminate import LoadType, Quantity
 
 
 class FilePrint:
@@ -127,6 +127,29 @@ class FilePrint:
 
                         self.print_lamina_data(lamina, stress_data, j, file)
 
+            if load_type == LoadType.combined and any(laminate.shear_forces):
+                self.print_interlaminar_data(laminate, file)
+
+    def print_interlaminar_data(self, laminate, file):
+        """Prints the interlaminar shear stress at the faces of each lamina
+
+              :param laminate: Laminate to retrieve data from
+              :type laminate: Instance of Laminate
+              :param file: File to write to
+              :type file: writable file obj
+
+        """
+
+        self.print_title('INTERLAMINAR SHEAR STRESS DATA', file)
+        file.write(self.format_columns(['INDEX', 'ANGLE', 'Z-COORDINATE', 'STRESS_XZ', 'STRESS_YZ'],
+                                       data_type='header'))
+
+        for k, lamina in enumerate(laminate.laminae):
+            for i in range(2):
+                tau = laminate.interlaminar_shear_stress[:, 2 * k + i]
+                data = [lamina.index, lamina.angle, lamina.coordinates[i], tau[0], tau[1]]
+                file.write(self.format_columns(data, data_type='stress/strain'))
+
     def print_lamina_data(self, lamina, stress, i, file):
         """Prints lamina index, coordinate, stress components
 
@@ -153,7 +176,7 @@ class FilePrint:
         """Formats the column data specified in data_type
 
             :param data: Data to print
-            :type data: List(len=6)
+            :type data: List(len=5 or 6)
             :param data_type: Either stress/strain or header, determines the formatting
             :type data_type: str
             :returns: Formatted string ready to print
@@ -161,14 +184,11 @@ class FilePrint:
         """
 
         if data_type == 'stress/strain':
-            data_string = f'{data[0]:>{self.column_width}}{data[1]:>{self.column_width}}' \
-                              f'{data[2]:>{self.column_width}.4e}{data[3]:>{self.column_width}.4e}' \
-                              f'{data[4]:>{self.column_width}.4e}{data[5]:>{self.column_width}.4e}' + '\n'
+            data_string = f'{data[0]:>{self.column_width}}{data[1]:>{self.column_width}}' + \
+                          ''.join(f'{value:>{self.column_width}.4e}' for value in data[2:]) + '\n'
 
         else:
-            data_string = f'{data[0]:>{self.column_width}}{data[1]:>{self.column_width}}' \
-                              f'{data[2]:>{self.column_width}}{data[3]:>{self.column_width}}' \
-                              f'{data[4]:>{self.column_width}}{data[5]:>{self.column_width}}' + '\n'
+            data_string = ''.join(f'{value:>{self.column_width}}' for value in data) + '\n'
 
         return data_string
 
@@ -261,8 +281,26 @@ class ExcelPrint:
                     strain_sheet.write(2 * k + 1 + i, j, column_strain_data)
                     stress_sheet.write(2 * k + 1 + i, j, column_stress_data)
 
+        if load_type == LoadType.combined and any(laminate.shear_forces):
+            self.write_interlaminar_data(laminate, sheet_name)
+
         self.workbook.save(self.filepath)
 
+    def write_interlaminar_data(self, laminate, sheet_name):
+        """Writes the interlaminar shear stress at the faces of each lamina to a new sheet"""
+
+        sheet = self.workbook.add_sheet(sheet_name + ' interlaminar shear')
+
+        for i, header in enumerate(['INDEX', 'ANGLE', 'Z-COORDINATE', 'STRESS_XZ', 'STRESS_YZ']):
+            sheet.write(0, i, header)
+
+        for k, lamina in enumerate(laminate.laminae):
+            for i in range(2):
+                tau = laminate.interlaminar_shear_stress[:, 2 * k + i]
+                row = [lamina.index, lamina.angle, lamina.coordinates[i], float(tau[0]), float(tau[1])]
+                for j, value in enumerate(row):
+                    sheet.write(2 * k + 1 + i, j, value)
+
 
 
 
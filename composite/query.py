@@ -0,0 +1,364 @@
+"""Indexes of result arrays answering extreme value queries without scanning the results.
+
+An index is built in one pass over a result array of dim=cases,3,nr_laminae*2, e.g. a Sweep result file, a chunk of
+cases at a time so memory mapped results larger than the memory can be indexed. For each component it holds
+
+    * The largest and smallest value of each case and the column they occur in
+    * The cases sorted by their largest and smallest values, for top-k and threshold queries
+    * The largest and smallest value of each column over all cases and the case they occur in
+    * The largest and smallest value over the plies of each angle and the case and column they occur in
+    * The top_k cases with the largest and smallest values of each ply, sorted, for top-k queries per ply
+
+so extreme values, e.g. the largest transverse stress of any 90 degree ply, are looked up in constant time, the k
+cases with the largest values, of all plies or of one ply, in O(k) and the cases above a threshold in logarithmic
+time. NaN values, e.g. dropped or padding plies, are ignored.
+
+Indexes are saved as one .npy file per array and loaded memory mapped, see ResultIndex.save and ResultIndex.load.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+# Component names of each result, as in the FilePrint headers
+COMPONENTS = {'stress_global': ('STRESS_X', 'STRESS_Y', 'STRESS_XY'),
+              'stress_local': ('STRESS_L', 'STRESS_T', 'STRESS_LT'),
+              'strains_global': ('STRAIN_X', 'STRAIN_Y', 'STRAIN_XY'),
+              'strains_local': ('STRAIN_L', 'STRAIN_T', 'STRAIN_LT')}
+
+# Arrays of an index, each with the component first
+ARRAYS = ('case_max', 'case_max_column', 'case_min', 'case_min_column', 'order_max', 'sorted_max', 'order_min',
+          'sorted_min', 'column_max', 'column_max_case', 'column_min', 'column_min_case', 'angles', 'angle_max',
+          'angle_max_case', 'angle_max_column', 'angle_min', 'angle_min_case', 'angle_min_column', 'ply_top_max',
+          'ply_top_max_case', 'ply_top_min', 'ply_top_min_case')
+
+# Default number of cases read at a time while building an index
+CHUNK_SIZE = 2**16
+
+# Default number of cases kept per ply for top-k queries per ply
+TOP_K = 100
+
+
+def merge_top_cases(values, cases, k, sign):
+    """Keeps the k most extreme values of each row, sorted with the most extreme first
+
+          :param values: Values to select from
+          :type values: ndarray(dtype=float, dim=...,n)
+          :param cases: Case of each value
+          :type cases: ndarray(dtype=int, dim=...,n)
+          :param k: Number of values to keep
+          :type k: int
+          :param sign: 1 to keep the largest values, -1 to keep the smallest
+          :type sign: int
+          :returns: Values and cases, dim=...,min(k,n)
+          :rtype: ndarray(dtype=float), ndarray(dtype=int)
+
+     """
+
+    k = min(k, values.shape[-1])
+    keys = -sign * values
+
+    if k < values.shape[-1]:
+        selected = np.argpartition(keys, k - 1, axis=-1)[..., :k]
+        values, cases = np.take_along_axis(values, selected, axis=-1), np.take_along_axis(cases, selected, axis=-1)
+        keys = -sign * values
+
+    order = np.argsort(keys, axis=-1, kind='stable')
+
+    return np.take_along_axis(values, order, axis=-1), np.take_along_axis(cases, order, axis=-1)
+
+
+class Extremum:
+    """Extreme value found by a query
+
+          :ivar value: The value, NaN if no value matched the query
+          :ivar case: Case of the value
+          :ivar column: Column of the value in the result arrays, two per ply with the bottom face first
+
+     """
+
+    def __init__(self, value, case, column):
+        self.value = float(value)
+        self.case = int(case)
+        self.column = int(column)
+
+    @property
+    def ply(self):
+        """Position of the ply in the lay up, 0 is the bottom"""
+
+        return self.column // 2
+
+    @property
+    def face(self):
+        return 'top' if self.column % 2 else 'bottom'
+
+    def __repr__(self):
+        return 'Extremum(value={!r}, case={}, ply={}, face={})'.format(self.value, self.case, self.ply, self.face)
+
+
+class ResultIndex:
+    """Precomputed extrema of one result array, built with ResultIndex.build or read with ResultIndex.load
+
+          :param arrays: The arrays of ARRAYS by name
+          :type arrays: dict
+          :param components: Names of the three components, e.g. COMPONENTS['stress_local']
+          :type components: tuple of str
+
+     """
+
+    def __init__(self, arrays, components=('0', '1', '2')):
+        self.arrays = arrays
+        self.components = tuple(components)
+
+    @classmethod
+    def build(cls, values, angles, components=('0', '1', '2'), chunk_size=CHUNK_SIZE, top_k=TOP_K):
+        """Indexes a result array
+
+              :param values: Results, e.g. a memory mapped Sweep result file
+              :type values: ndarray(dtype=float, dim=cases,3,nr_laminae*2)
+              :param angles: Ply angles of every case or of all cases, or a function returning the angles of the cases
+                             start to stop for large sweeps
+              :type angles: ndarray(dtype=float, dim=cases,nr_laminae or nr_laminae) or callable
+              :param components: Names of the three components
+              :type components: tuple of str
+              :param chunk_size: Number of cases read at a time
+              :type chunk_size: int
+              :param top_k: Number of cases kept per ply for top-k queries per ply
+              :type top_k: int
+              :rtype: ResultIndex
+
+         """
+
+        cases, _, columns = values.shape
+
+        if not callable(angles):
+            angle_array = np.asarray(angles, dtype=float)
+
+            def angles(start, stop):
+                if angle_array.ndim == 1:
+                    return np.broadcast_to(angle_array, (stop - start, columns // 2))
+                return angle_array[start:stop]
+
+        arrays = {'case_max': np.empty((3, cases)), 'case_max_column': np.empty((3, cases), dtype=np.int32),
+                  'case_min': np.empty((3, cases)), 'case_min_column': np.empty((3, cases), dtype=np.int32),
+                  'column_max': np.full((3, columns), -np.inf), 'column_max_case': np.zeros((3, columns), dtype=int),
+                  'column_min': np.full((3, columns), np.inf), 'column_min_case': np.zeros((3, columns), dtype=int)}
+
+        # Top cases of each ply so far, dim=3,nr_laminae,top_k once top_k cases are read
+        for extremum, fill in (('max', -np.inf), ('min', np.inf)):
+            arrays['ply_top_' + extremum] = np.full((3, columns // 2, 0), fill)
+            arrays['ply_top_' + extremum + '_case'] = np.zeros((3, columns // 2, 0), dtype=int)
+
+        # Extremum of each angle as value, case and column of each component, by angle and extremum
+        by_angle = {}
+
+        for start in range(0, cases, chunk_size):
+            stop = min(start + chunk_size, cases)
+            chunk = np.swapaxes(np.asarray(values[start:stop], dtype=float), 0, 1)
+            missing = np.isnan(chunk)
+            ply_angles = np.repeat(angles(start, stop), 2, axis=-1)
+
+            for extremum, fill, select in (('max', -np.inf, np.argmax), ('min', np.inf, np.argmin)):
+                sign = 1 if extremum == 'max' else -1
+                filled = np.where(missing, fill, chunk)
+
+                column = select(filled, axis=2)
+                arrays['case_' + extremum][:, start:stop] = np.take_along_axis(filled, column[..., np.newaxis],
+                                                                              axis=2)[..., 0]
+                arrays['case_' + extremum + '_column'][:, start:stop] = column
+
+                # Extremum of each ply over its two faces, dim=3,nr_laminae,cases, merged with the top cases so far
+                faces = np.swapaxes(filled.reshape(3, stop - start, -1, 2), 1, 2)
+                ply_values = faces.max(axis=-1) if extremum == 'max' else faces.min(axis=-1)
+                ply_cases = np.broadcast_to(np.arange(start, stop), ply_values.shape)
+                arrays['ply_top_' + extremum], arrays['ply_top_' + extremum + '_case'] = merge_top_cases(
+                    np.concatenate((arrays['ply_top_' + extremum], ply_values), axis=-1),
+                    np.concatenate((arrays['ply_top_' + extremum + '_case'], ply_cases), axis=-1), top_k, sign)
+
+                case = select(filled, axis=1)
+                found = np.take_along_axis(filled, case[:, np.newaxis], axis=1)[:, 0]
+                better = sign * found > sign * arrays['column_' + extremum]
+                arrays['column_' + extremum][better] = found[better]
+                arrays['column_' + extremum + '_case'][better] = (case + start)[better]
+
+                for angle in np.unique(ply_angles):
+                    masked = np.where(ply_angles == angle, filled, fill).reshape(3, -1)
+                    position = select(masked, axis=1)
+                    found = masked[np.arange(3), position]
+                    case, column = np.unravel_index(position, (stop - start, columns))
+
+                    current = by_angle.setdefault((float(angle), extremum), (np.full(3, fill), np.zeros(3, dtype=int),
+                                                                             np.zeros(3, dtype=int)))
+                    better = sign * found > sign * current[0]
+                    current[0][better], current[1][better], current[2][better] = \
+                        found[better], (case + start)[better], column[better]
+
+        # Cases in ascending order, cases without values first by their largest and last by their smallest value
+        for extremum in ('max', 'min'):
+            arrays['order_' + extremum] = np.argsort(arrays['case_' + extremum], axis=1, kind='stable')
+            arrays['sorted_' + extremum] = np.take_along_axis(arrays['case_' + extremum],
+                                                              arrays['order_' + extremum], axis=1)
+
+        arrays['angles'] = np.array(sorted({angle for angle, _ in by_angle}))
+        for extremum in ('max', 'min'):
+            found = [by_angle[(angle, extremum)] for angle in arrays['angles']]
+            for offset, suffix in enumerate(('', '_case', '_column')):
+                arrays['angle_' + extremum + suffix] = np.array([entry[offset] for entry in found]).T.reshape(3, -1)
+
+        # Extrema over NaN only are reported as NaN
+        for name in ('case_max', 'case_min', 'column_max', 'column_min', 'angle_max', 'angle_min', 'ply_top_max',
+                     'ply_top_min'):
+            arrays[name][np.isinf(arrays[name])] = np.nan
+
+        return cls(arrays, components)
+
+    def save(self, directory):
+        """Writes the index as one .npy file per array to directory, created if missing"""
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name in ARRAYS:
+            np.save(directory.joinpath(name + '.npy'), self.arrays[name])
+        with open(directory.joinpath('components.txt'), 'w') as file:
+            file.write('\n'.join(self.components))
+
+    @classmethod
+    def load(cls, directory):
+        """Reads an index written by save, the arrays are memory mapped and read when queried"""
+
+        directory = Path(directory)
+        arrays = {name: np.load(directory.joinpath(name + '.npy'), mmap_mode='r') for name in ARRAYS}
+        with open(directory.joinpath('components.txt')) as file:
+            components = file.read().split('\n')
+
+        return cls(arrays, components)
+
+    @property
+    def cases(self):
+        return self.arrays['case_max'].shape[1]
+
+    def component(self, component):
+        """Returns the position of a component given by position or name, e.g. 1 or STRESS_T"""
+
+        if isinstance(component, str):
+            names = [name.upper() for name in self.components]
+            if component.upper() not in names:
+                raise KeyError('Unknown component ' + component + ', expected one of ' + ', '.join(self.components))
+            return names.index(component.upper())
+
+        return int(component)
+
+    def extremum(self, extremum, component, angle=None, ply=None, case=None):
+        """Looks up the max or min extremum of a component, see maximum"""
+
+        component = self.component(component)
+        arrays = self.arrays
+
+        if sum(selection is not None for selection in (angle, ply, case)) > 1:
+            raise ValueError('Only one of angle, ply and case can be given')
+
+        if angle is not None:
+            matches = np.flatnonzero(np.isclose(arrays['angles'], angle))
+            if not len(matches):
+                return Extremum(np.nan, -1, -1)
+            prefix = 'angle_' + extremum
+            return Extremum(arrays[prefix][component, matches[0]], arrays[prefix + '_case'][component, matches[0]],
+                            arrays[prefix + '_column'][component, matches[0]])
+
+        if ply is not None:
+            prefix = 'column_' + extremum
+            faces = np.array(arrays[prefix][component, 2 * ply:2 * ply + 2])
+            column = 2 * ply
+            if not np.isnan(faces).all():
+                column += int(np.nanargmax(faces) if extremum == 'max' else np.nanargmin(faces))
+            return Extremum(arrays[prefix][component, column], arrays[prefix + '_case'][component, column], column)
+
+        if case is None:
+            # The last of the sorted largest values or the first of the sorted smallest values
+            case = arrays['order_' + extremum][component, -1 if extremum == 'max' else 0]
+
+        prefix = 'case_' + extremum
+        return Extremum(arrays[prefix][component, case], case, arrays[prefix + '_column'][component, case])
+
+    def maximum(self, component, angle=None, ply=None, case=None):
+        """Returns the largest value of a component in constant time
+
+              :param component: Position or name of the component, e.g. STRESS_T
+              :type component: int or str
+              :param angle: Only plies of this angle, e.g. 90
+              :type angle: float
+              :param ply: Only the ply at this position in the lay up, 0 is the bottom
+              :type ply: int
+              :param case: Only this case
+              :type case: int
+              :rtype: Extremum
+
+         """
+
+        return self.extremum('max', component, angle, ply, case)
+
+    def minimum(self, component, angle=None, ply=None, case=None):
+        """Returns the smallest value of a component in constant time, see maximum"""
+
+        return self.extremum('min', component, angle, ply, case)
+
+    def top_cases(self, component, k=20, largest=True, ply=None):
+        """Returns the k cases with the largest (or smallest) values of a component
+
+              :param component: Position or name of the component
+              :type component: int or str
+              :param k: Number of cases, at most the top_k of the index if ply is given
+              :type k: int
+              :param largest: Rank by the largest value of each case if True, by the smallest if False
+              :type largest: bool
+              :param ply: Only the ply at this position in the lay up, 0 is the bottom
+              :type ply: int
+              :returns: Cases and their largest (or smallest) values, in order
+              :rtype: ndarray(dtype=int, dim=k), ndarray(dtype=float, dim=k)
+
+         """
+
+        component = self.component(component)
+
+        if ply is not None:
+            prefix = 'ply_top_' + ('max' if largest else 'min')
+            kept = self.arrays[prefix].shape[-1]
+            if k > kept and kept < self.cases:
+                raise ValueError('Only the top {} cases of each ply are indexed, build the index with a larger '
+                                 'top_k'.format(kept))
+            return np.array(self.arrays[prefix + '_case'][component, ply, :k]), \
+                np.array(self.arrays[prefix][component, ply, :k])
+
+        if largest:
+            cases = self.arrays['order_max'][component, :-k - 1:-1] if k else np.zeros(0, dtype=int)
+            values = self.arrays['sorted_max'][component, :-k - 1:-1] if k else np.zeros(0)
+        else:
+            cases, values = self.arrays['order_min'][component, :k], self.arrays['sorted_min'][component, :k]
+
+        return np.array(cases), np.array(values)
+
+    def cases_beyond(self, component, value, largest=True):
+        """Returns the cases with a value of a component above (or below) value in logarithmic time plus the number
+           of cases returned
+
+              :param component: Position or name of the component
+              :type component: int or str
+              :param value: Threshold
+              :type value: float
+              :param largest: Cases with any value above the threshold if True, below if False
+              :type largest: bool
+              :returns: Cases, ordered with the most extreme first
+              :rtype: ndarray(dtype=int)
+
+         """
+
+        component = self.component(component)
+
+        if largest:
+            start = np.searchsorted(self.arrays['sorted_max'][component], value, side='right')
+            return np.array(self.arrays['order_max'][component, start:][::-1])
+
+        stop = np.searchsorted(self.arrays['sorted_min'][component], value, side='left')
+        return np.array(self.arrays['order_min'][component, :stop])
@@ -0,0 +1,323 @@
+"""Export of laminates as shell sections of finite element models.
+
+Nastran bulk data is written as MAT8 and PCOMP entries and Abaqus input as *MATERIAL and *SHELL SECTION, COMPOSITE
+definitions, or as *SHELL GENERAL SECTION with the A, B and D matrices of the laminate. Laminae with the same
+homogenised properties, as computed by Lamina.compute_composite_properties, share one material regardless of which
+laminate they belong to.
+
+The laminates are written one at a time and the lines are collected in a buffer that is flushed when full, so a
+generator of laminates can be exported without holding all of them, or all of the output, in memory.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+# Suffixes of files exported as Nastran bulk data and as Abaqus input
+NASTRAN_SUFFIXES = ('.bdf', '.dat', '.nas')
+ABAQUS_SUFFIXES = ('.inp',)
+
+
+def ply_material(lamina, digits=10):
+    """Creates a key of the homogenised properties of a lamina, equal for laminae that can share a material
+
+          :param lamina: Lamina to create the key for
+          :type lamina: Instance of Lamina
+          :param digits: Number of significant digits compared
+          :type digits: int
+          :returns: E_L, E_T, v_LT, G_LT, alpha_L, alpha_T, density, rounded to digits significant digits
+          :rtype: tuple of floats
+
+     """
+
+    properties = (lamina.E_L, lamina.E_T, lamina.v_LT, lamina.G_LT, lamina.alpha_L, lamina.alpha_T, lamina.density)
+
+    return tuple(None if value is None else float('{:.{}g}'.format(value, digits)) for value in properties)
+
+
+def nastran_real(value, width=8):
+    """Formats a real number to fit a Nastran field, using the exponent notation without E when shorter
+
+          :param value: Number to format
+          :type value: float
+          :param width: Field width, 8 for small and 16 for large fields
+          :type width: int
+          :returns: Formatted number with a decimal point
+          :rtype: str
+
+     """
+
+    value = float(value)
+    if value == 0:
+        return '0.'
+
+    for digits in range(width, 0, -1):
+        text = '{:.{}g}'.format(value, digits)
+
+        if 'e' in text:
+            mantissa, exponent = text.split('e')
+            text = mantissa + ('' if '.' in mantissa else '.') + '{:+d}'.format(int(exponent))
+        elif '.' not in text:
+            text += '.'
+
+        if len(text) <= width:
+            return text
+
+    raise ValueError('{} does not fit a Nastran field of width {}'.format(value, width))
+
+
+class ShellSectionExport:
+    """Base class of the shell section exporters, handles the shared materials and the buffered writing
+
+          :param filepath: File to write
+          :type filepath: str or Path
+          :param buffer_lines: Number of lines collected before they are written to the file
+          :type buffer_lines: int
+          :param digits: Number of significant digits compared when deduplicating materials
+          :type digits: int
+
+          :ivar materials: Material id per key of ply_material, in the order of creation
+          :ivar sections: Number of sections written
+
+     """
+
+    def __init__(self, filepath, buffer_lines=2**14, digits=10):
+        self.filepath = Path(filepath)
+        self.buffer_lines = buffer_lines
+        self.digits = digits
+        self.materials = {}
+        self.sections = 0
+        self.buffer = []
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.filepath, 'w', newline='\n')
+        self.write_header()
+
+        return self
+
+    def __exit__(self, *exception):
+        self.write_footer()
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def write_lines(self, lines):
+        self.buffer.extend(lines)
+
+        if len(self.buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(self.buffer)
+        self.buffer.clear()
+
+    def material_id(self, lamina):
+        """Returns the id of the material of lamina, the material is written the first time its properties are seen
+
+              :param lamina: Lamina to find the material of
+              :type lamina: Instance of Lamina
+              :returns: Material id
+              :rtype: int
+
+         """
+
+        key = ply_material(lamina, self.digits)
+        material_id = self.materials.get(key)
+
+        if material_id is None:
+            material_id = self.materials[key] = len(self.materials) + 1
+            self.write_lines(self.material_lines(material_id, key))
+
+        return material_id
+
+    def write(self, laminates, section_ids=None):
+        """Writes one section per laminate
+
+              :param laminates: Laminates to export, may be a generator
+              :type laminates: iterable of instances of Laminate
+              :param section_ids: Section ids, continues the numbering of previous calls if None
+              :type section_ids: iterable of int
+
+         """
+
+        if section_ids is None:
+            section_ids = range(self.sections + 1, 2**31)
+
+        for section_id, laminate in zip(section_ids, laminates):
+            self.write_lines(self.section_lines(section_id, laminate, self.plies(laminate)))
+            self.sections += 1
+
+    def plies(self, laminate):
+        """Pairs the laminae of laminate, from the bottom, with the ids of their materials"""
+
+        return [(self.material_id(lamina), lamina) for lamina in laminate.laminae]
+
+    def write_header(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    def material_lines(self, material_id, properties):
+        raise NotImplementedError
+
+    def section_lines(self, section_id, laminate, plies):
+        raise NotImplementedError
+
+
+class NastranExport(ShellSectionExport):
+    """Writes laminates as Nastran PCOMP entries with MAT8 materials
+
+        The transverse shear moduli G1Z and G2Z are set to G_LT, which classical laminate theory does not
+        distinguish. The plies are listed from the bottom, with the default offset Z0 of half the thickness.
+
+          :param large_field: Write large field entries, 16 instead of 8 characters per field
+          :type large_field: bool
+
+     """
+
+    def __init__(self, filepath, large_field=False, **kwargs):
+        super().__init__(filepath, **kwargs)
+        self.large_field = large_field
+
+    def card(self, name, fields):
+        """Formats a bulk data entry, with continuation lines as needed
+
+              :param name: Entry name, e.g. PCOMP
+              :type name: str
+              :param fields: Data fields, None for blank fields
+              :type fields: list of int, float, str or None
+              :returns: Lines of the entry
+              :rtype: list of str
+
+         """
+
+        width, per_line = (16, 4) if self.large_field else (8, 8)
+        formatted = []
+
+        for value in fields:
+            if value is None:
+                text = ''
+            elif isinstance(value, (int, np.integer)):
+                text = str(value)
+            elif isinstance(value, str):
+                text = value
+            else:
+                text = nastran_real(value, width)
+            formatted.append(text.rjust(width) if text else ' ' * width)
+
+        if self.large_field:
+            first, continuation = (name + '*').ljust(8), '*'.ljust(8)
+        else:
+            first, continuation = name.ljust(8), ' ' * 8
+
+        return [(first if start == 0 else continuation) + ''.join(formatted[start:start + per_line]).rstrip() + '\n'
+                for start in range(0, max(len(formatted), 1), per_line)]
+
+    def material_lines(self, material_id, properties):
+        E_L, E_T, v_LT, G_LT, alpha_L, alpha_T, density = properties
+
+        return self.card('MAT8', [material_id, E_L, E_T, v_LT, G_LT, G_LT, G_LT, density, alpha_L, alpha_T])
+
+    def section_lines(self, section_id, laminate, plies):
+        fields = [section_id, None, None, None, None, None, None, None]
+
+        for material_id, lamina in plies:
+            fields += [material_id, lamina.thickness, float(lamina.angle), 'YES']
+
+        return self.card('PCOMP', fields)
+
+
+class AbaqusExport(ShellSectionExport):
+    """Writes laminates as Abaqus shell sections with TYPE=LAMINA materials
+
+        Composite sections list the plies from the bottom, SNEG, to the top, SPOS. General sections give the 6x6
+        section stiffness of the A, B and D matrices directly, the materials are then not needed and not written.
+        The element sets are named by elset_format with the section id and the transverse shear moduli G13 and G23
+        are set to G_LT.
+
+          :param general: Write *SHELL GENERAL SECTION with the A, B and D matrices instead of composite sections
+          :type general: bool
+          :param integration_points: Number of integration points through each ply of composite sections
+          :type integration_points: int
+          :param elset_format: Format of the element set names
+          :type elset_format: str
+
+     """
+
+    def __init__(self, filepath, general=False, integration_points=3, elset_format='LAMINATE-{}', **kwargs):
+        super().__init__(filepath, **kwargs)
+        self.general = general
+        self.integration_points = integration_points
+        self.elset_format = elset_format
+
+    @staticmethod
+    def data_lines(values):
+        # At most eight values per data line
+        return [', '.join('{:.10g}'.format(value) for value in values[start:start + 8]) + '\n'
+                for start in range(0, len(values), 8)]
+
+    def write_header(self):
+        self.write_lines(['** Shell sections exported from the composite package\n'])
+
+    def material_lines(self, material_id, properties):
+        E_L, E_T, v_LT, G_LT, alpha_L, alpha_T, density = properties
+
+        lines = ['*MATERIAL, NAME=PLY-MATERIAL-{}\n'.format(material_id), '*ELASTIC, TYPE=LAMINA\n']
+        lines += self.data_lines([E_L, E_T, v_LT, G_LT, G_LT, G_LT])
+        lines += ['*EXPANSION, TYPE=ORTHO\n'] + self.data_lines([alpha_L, alpha_T, 0.0])
+        if density is not None:
+            lines += ['*DENSITY\n'] + self.data_lines([density])
+
+        return lines
+
+    def plies(self, laminate):
+        # The materials of general sections are part of the section stiffness
+        return [] if self.general else super().plies(laminate)
+
+    def section_lines(self, section_id, laminate, plies):
+        elset = self.elset_format.format(section_id)
+
+        if self.general:
+            stiffness = np.block([[laminate.A, laminate.B], [laminate.B, laminate.D]])
+            # Upper triangle by columns, D11, D12, D22, D13, D23, D33, ...
+            upper = [stiffness[row, column] for column in range(6) for row in range(column + 1)]
+
+            return ['*SHELL GENERAL SECTION, ELSET={}\n'.format(elset)] + self.data_lines(upper)
+
+        lines = ['*SHELL SECTION, ELSET={}, COMPOSITE\n'.format(elset)]
+        for material_id, lamina in plies:
+            lines.append('{:.10g}, {}, PLY-MATERIAL-{}, {:.10g}, PLY-{}\n'.format(
+                lamina.thickness, self.integration_points, material_id, float(lamina.angle), lamina.index))
+
+        return lines
+
+
+def export_shell_sections(laminates, filepath, **kwargs):
+    """Writes laminates as shell sections, as Nastran bulk data or Abaqus input depending on the file suffix
+
+          :param laminates: Laminates to export, may be a generator
+          :type laminates: iterable of instances of Laminate
+          :param filepath: File to write, .bdf, .dat or .nas for Nastran and .inp for Abaqus
+          :type filepath: str or Path
+          :param kwargs: Arguments of NastranExport or AbaqusExport
+          :returns: The exporter, holding the written materials and number of sections
+          :rtype: Instance of NastranExport or AbaqusExport
+
+     """
+
+    filepath = Path(filepath)
+
+    if filepath.suffix.lower() in NASTRAN_SUFFIXES:
+        exporter = NastranExport(filepath, **kwargs)
+    elif filepath.suffix.lower() in ABAQUS_SUFFIXES:
+        exporter = AbaqusExport(filepath, **kwargs)
+    else:
+        raise ValueError('Unknown finite element file type ' + filepath.suffix)
+
+    with exporter:
+        exporter.write(laminates)
+
+    return exporter
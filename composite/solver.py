@@ -0,0 +1,323 @@
+"""Stateless solver: a laminate definition and loads in, an immutable result out.
+
+Unlike Laminate.compute_thermal_stress and Laminate.compute_total_stress nothing is stored on the laminate or its
+laminae, and the combined results include the thermal loads of the same call instead of those left by a previous
+thermal solution. Definitions and results hold read-only arrays and solve only reads its arguments, so one
+definition can be solved from many threads at once. The work is done in a few vectorized NumPy calls, which release
+the GIL while they run, so a thread pool scales until the Python overhead between the calls dominates.
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . lamina import OrthotropicLamina
+from . interlaminar import shear_stress
+from . precision import get_policy, precision
+from . stack import composite_properties, local_stiffness, global_properties, transformation_matrices, \
+    interface_coordinates, stiffness_matrices, stiffness_matrix, thermal_forces, solve_strains, face_strains, \
+    face_stress, transform, component_arrays
+
+
+def read_only(array, dtype=float):
+    """Returns a read-only copy of array"""
+
+    array = np.array(array, dtype=dtype)
+    array.setflags(write=False)
+
+    return array
+
+
+class LaminateDefinition:
+    """Immutable description of the lay up and constituents of a laminate
+
+               :param thickness: Ply thicknesses from the bottom
+               :type thickness: list of floats
+               :param angle: Ply angles in degrees
+               :type angle: list of floats
+               :param volume_fraction: Fibre volume fraction of each ply
+               :type volume_fraction: list of floats
+               :param fibre: Modulus, poisson ratio and thermal coefficient of the fibres of each ply
+               :type fibre: ndarray(dtype=float, dim=nr_laminae,3)
+               :param matrix: Modulus, poisson ratio and thermal coefficient of the matrix of each ply
+               :type matrix: ndarray(dtype=float, dim=nr_laminae,3)
+               :param fibre_tables: Temperatures and properties, dim=3,nr_temperatures, of the fibres of each ply,
+                                    None for plies with constant properties
+               :type fibre_tables: list of tuples
+               :param matrix_tables: As fibre_tables for the matrix
+               :type matrix_tables: list of tuples
+
+     """
+
+    def __init__(self, thickness, angle, volume_fraction, fibre, matrix, fibre_tables=None, matrix_tables=None):
+        self.thickness = read_only(thickness)
+        self.angle = read_only(angle)
+        self.volume_fraction = read_only(volume_fraction)
+        self.fibre = read_only(fibre).reshape(-1, 3)
+        self.matrix = read_only(matrix).reshape(-1, 3)
+
+        size = len(self.thickness)
+        self.fibre_tables = tuple(None if table is None else (read_only(table[0]), read_only(table[1]))
+                                  for table in (fibre_tables or [None] * size))
+        self.matrix_tables = tuple(None if table is None else (read_only(table[0]), read_only(table[1]))
+                                   for table in (matrix_tables or [None] * size))
+
+        if not all(len(values) == size for values in (self.angle, self.volume_fraction, self.fibre, self.matrix,
+                                                       self.fibre_tables, self.matrix_tables)):
+            raise ValueError('All ply properties must have one entry per lamina')
+
+    @classmethod
+    def from_laminate(cls, laminate):
+        """Takes a snapshot of the lay up and materials of a laminate
+
+              :param laminate: Laminate to describe
+              :type laminate: Instance of Laminate
+              :rtype: LaminateDefinition
+
+         """
+
+        def properties(material):
+            return material.modulus, material.poisson_ratio, material.thermal_coefficient
+
+        def table(material):
+            if not material.is_temperature_dependent:
+                return None
+            return material.temperatures, (material.modulus_table, material.poisson_ratio_table,
+                                           material.thermal_coefficient_table)
+
+        laminae = laminate.laminae
+        if any(isinstance(lamina, OrthotropicLamina) for lamina in laminae):
+            raise ValueError('Laminae defined by their homogenised properties, e.g. imported from bulk data, are not '
+                             'supported')
+
+        return cls([lamina.thickness for lamina in laminae], [lamina.angle for lamina in laminae],
+                   [lamina.volume_fraction for lamina in laminae],
+                   [properties(lamina.fibre_material) for lamina in laminae],
+                   [properties(lamina.matrix_material) for lamina in laminae],
+                   [table(lamina.fibre_material) for lamina in laminae],
+                   [table(lamina.matrix_material) for lamina in laminae])
+
+    @property
+    def size(self):
+        return len(self.thickness)
+
+    @property
+    def is_temperature_dependent(self):
+        return any(table is not None for table in self.fibre_tables + self.matrix_tables)
+
+    def constituent_properties(self, temperatures=None):
+        """Returns the fibre and matrix properties of each ply
+
+              :param temperatures: Temperatures to interpolate the property tables at, the scalar properties are
+                                   used if None
+              :type temperatures: float or ndarray(dtype=float)
+              :returns: Fibre and matrix properties, each dim=3,...,nr_laminae where ... is the shape of temperatures
+              :rtype: ndarray(dtype=float), ndarray(dtype=float)
+
+         """
+
+        if temperatures is None:
+            return self.fibre.T, self.matrix.T
+
+        temperatures = np.asarray(temperatures, dtype=float)
+
+        def interpolate(scalars, tables):
+            values = np.empty((3,) + temperatures.shape + (self.size,))
+            for ply, (properties, table) in enumerate(zip(scalars, tables)):
+                for index in range(3):
+                    values[index, ..., ply] = properties[index] if table is None else \
+                        np.interp(temperatures, table[0], table[1][index])
+            return values
+
+        return interpolate(self.fibre, self.fibre_tables), interpolate(self.matrix, self.matrix_tables)
+
+
+class Loads:
+    """Immutable loads acting on a laminate
+
+               :param normal_forces: Normal forces in order x, y, xy
+               :type normal_forces: list of floats
+               :param moments: Moments in order x, y, xy
+               :type moments: list of floats
+               :param delta_T: Temperature difference
+               :type delta_T: float
+               :param reference_temperature: Temperature at which the laminate is free of thermal stress, needed
+                                             for temperature dependent materials
+               :type reference_temperature: float
+               :param thermal_steps: Number of steps of the thermal solution for temperature dependent materials
+               :type thermal_steps: int
+               :param shear_forces: Transverse shear forces per unit width [Qx, Qy]
+               :type shear_forces: list of floats
+
+     """
+
+    def __init__(self, normal_forces=(0.0, 0.0, 0.0), moments=(0.0, 0.0, 0.0), delta_T=0.0,
+                 reference_temperature=None, thermal_steps=100, shear_forces=(0.0, 0.0)):
+        self.normal_forces = read_only(np.concatenate((np.ravel(normal_forces), np.zeros(3)))[:3])
+        self.moments = read_only(np.concatenate((np.ravel(moments), np.zeros(3)))[:3])
+        self.delta_T = float(np.squeeze(delta_T))
+        self.reference_temperature = reference_temperature
+        self.thermal_steps = int(thermal_steps)
+        if self.thermal_steps < 1:
+            raise ValueError('thermal_steps must be at least 1, got ' + str(self.thermal_steps))
+        self.shear_forces = read_only(np.concatenate((np.ravel(shear_forces), np.zeros(2)))[:2])
+
+    @classmethod
+    def from_laminate(cls, laminate):
+        """Takes a snapshot of the loads of a laminate"""
+
+        return cls(laminate.normal_forces, laminate.moments, laminate.delta_T, laminate.reference_temperature,
+                   laminate.thermal_steps, laminate.shear_forces)
+
+    @property
+    def vector(self):
+        """Mechanical load vector [N, M]"""
+        return np.concatenate((self.normal_forces, self.moments))
+
+
+class LoadCaseResult:
+    """Immutable results of one load type, laid out as in Laminate.create_laminate_arrays
+
+        The face results are kept in the storage type of the precision policy.
+
+               :ivar midplane_strains: Mid-plane strains, dim=3
+               :ivar curvatures: Curvatures, dim=3
+               :ivar stress_global: Global stress, dim=3,nr_laminae*2
+               :ivar stress_local: Local stress, dim=3,nr_laminae*2
+               :ivar strains_global: Global strains, dim=3,nr_laminae*2
+               :ivar strains_local: Local strains, dim=3,nr_laminae*2
+               :ivar interlaminar_shear_stress: Stress [tau_xz, tau_yz] at the ply faces due to the shear forces,
+                                                dim=2,nr_laminae*2, zero for thermal loading
+
+     """
+
+    def __init__(self, strains, stress, strain, T1, T2, interlaminar_shear_stress=None):
+        storage = get_policy().storage
+        self.midplane_strains = read_only(strains[:3])
+        self.curvatures = read_only(strains[3:])
+        self.stress_global = read_only(component_arrays(stress), storage)
+        self.stress_local = read_only(component_arrays(transform(T1, stress)), storage)
+        self.strains_global = read_only(component_arrays(strain), storage)
+        self.strains_local = read_only(component_arrays(transform(T2, strain)), storage)
+        self.interlaminar_shear_stress = read_only(np.zeros((2, 2 * len(stress))) if interlaminar_shear_stress is None
+                                                   else interlaminar_shear_stress, storage)
+
+
+class LaminateResult:
+    """Immutable results of solve
+
+               :ivar A: Extension matrix, dim=3,3
+               :ivar B: Coupling matrix, dim=3,3
+               :ivar D: Bending matrix, dim=3,3
+               :ivar z_coordinates: Z coordinates, two at each inner interface, dim=nr_laminae*2
+               :ivar thermal_load_vector: Equivalent thermal forces and moments [N, M], dim=6
+               :ivar thermal: Results of thermal loading, instance of LoadCaseResult
+               :ivar combined: Results of thermal and mechanical loading, instance of LoadCaseResult
+
+     """
+
+    def __init__(self, A, B, D, z, thermal_load_vector, thermal, combined):
+        self.A = read_only(A)
+        self.B = read_only(B)
+        self.D = read_only(D)
+        self.z_coordinates = read_only(np.repeat(z, 2)[1:-1])
+        self.thermal_load_vector = read_only(thermal_load_vector)
+        self.thermal = thermal
+        self.combined = combined
+
+    def __getitem__(self, load_type):
+        """Returns the results of a LoadType"""
+        return getattr(self, load_type.name)
+
+
+def ply_properties(fibre, matrix, volume_fraction, angle):
+    """Computes the stiffness tensors and thermal coefficients of the plies in global coordinate system"""
+
+    Ef, vf, alpha_f = fibre
+    Em, vm, alpha_m = matrix
+    E_L, E_T, v_LT, _, G_LT, alpha_L, alpha_T = composite_properties(Ef, Em, vf, vm, volume_fraction, alpha_f,
+                                                                     alpha_m)
+
+    return global_properties(local_stiffness(E_L, E_T, v_LT, G_LT), alpha_L, alpha_T, angle)
+
+
+def solve(definition, loads):
+    """Solves thermal and combined loading of a laminate
+
+        With a reference temperature and temperature dependent constituents the thermal solution is computed in
+        loads.thermal_steps steps with properties interpolated at the mid-point of each step, as in
+        Laminate.compute_thermal_stress_incremental, and the stiffness matrices use the properties at the final
+        temperature.
+
+          :param definition: Laminate to solve
+          :type definition: LaminateDefinition
+          :param loads: Loads acting on the laminate
+          :type loads: Loads
+          :rtype: LaminateResult
+
+     """
+
+    T1, T2 = transformation_matrices(definition.angle)
+    z = interface_coordinates(definition.thickness)
+    incremental = loads.reference_temperature is not None and definition.is_temperature_dependent
+
+    final_temperature = loads.reference_temperature + loads.delta_T if incremental else None
+    Q_bar, alpha = ply_properties(*definition.constituent_properties(final_temperature), definition.volume_fraction,
+                                  definition.angle)
+    A, B, D = stiffness_matrices(Q_bar, z)
+
+    if incremental:
+        step = loads.delta_T / loads.thermal_steps
+        temperatures = loads.reference_temperature + step * (np.arange(loads.thermal_steps) + 0.5)
+
+        # Properties, strain increments and stress increments of each step, dim=steps,...
+        step_Q_bar, step_alpha = ply_properties(*definition.constituent_properties(temperatures),
+                                                definition.volume_fraction, definition.angle)
+        step_A, step_B, step_D = stiffness_matrices(step_Q_bar, z)
+        strain_increments = solve_strains(step_A, step_B, step_D, step * thermal_forces(step_Q_bar, step_alpha, z))
+        strain_faces = face_strains(strain_increments, z, step_alpha, step)
+
+        thermal_strains = strain_increments.sum(axis=0)
+        thermal_strain = strain_faces.sum(axis=0)
+        thermal_stress = face_stress(step_Q_bar, strain_faces).sum(axis=0)
+        thermal_load_vector = stiffness_matrix(A, B, D).dot(thermal_strains)
+    else:
+        thermal_load_vector = loads.delta_T * thermal_forces(Q_bar, alpha, z)
+        thermal_strains = solve_strains(A, B, D, thermal_load_vector)
+        thermal_strain = face_strains(thermal_strains, z, alpha, loads.delta_T)
+        thermal_stress = face_stress(Q_bar, thermal_strain)
+
+    # The free thermal strains are not subtracted for the combined results, as in Laminate.compute_total_stress
+    total_strains = solve_strains(A, B, D, thermal_load_vector + loads.vector)
+    total_strain = face_strains(total_strains, z)
+
+    # The interlaminar shear stress belongs to the combined solution, as in Laminate.compute_total_stress
+    _, tau = shear_stress(A, B, D, Q_bar, z, loads.shear_forces)
+
+    return LaminateResult(A, B, D, z, thermal_load_vector,
+                          LoadCaseResult(thermal_strains, thermal_stress, thermal_strain, T1, T2),
+                          LoadCaseResult(total_strains, face_stress(Q_bar, total_strain), total_strain, T1, T2, tau))
+
+
+def solve_all(cases, max_workers=None):
+    """Solves several laminates on a thread pool
+
+          :param cases: Pairs of LaminateDefinition and Loads
+          :type cases: iterable of tuples
+          :param max_workers: Number of threads, see concurrent.futures.ThreadPoolExecutor
+          :type max_workers: int
+          :returns: Results in the order of cases
+          :rtype: list of LaminateResult
+
+     """
+
+    # Threads start with the default policy, so the policy of the caller is set in each task
+    policy = get_policy()
+
+    def solve_case(case):
+        with precision(policy):
+            return solve(*case)
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(solve_case, cases))
@@ -0,0 +1,344 @@
+"""Vectorized functions operating on stacks of plies.
+
+The functions mirror the per lamina computations in Lamina, LocalLaminaProperties, GlobalLaminaProperties and
+Laminate, but accept arrays with arbitrary leading dimensions (e.g. temperature steps or load cases) in front of the
+ply dimension so that many evaluations are done in a few NumPy calls.
+
+Ply property stacks and results use the storage type of the current precision policy, while the sums over the plies
+and the solution of the laminate equations use its accumulation type.
+
+"""
+
+import numpy as np
+
+from . precision import get_policy
+
+# Halpin Tsai parameters
+KSI_T = 2
+KSI_G = 1
+
+
+def composite_properties(Ef, Em, vf, vm, Vf, alpha_f, alpha_m, ksi_T=KSI_T, ksi_G=KSI_G):
+    """Computes the composite properties of plies using the properties of the constituents.
+
+        Theory based on rules of mixtures, Halpin Tsai and inverse rule of mixtures. All arguments broadcast.
+
+          :returns: E_L, E_T, v_LT, v_TL, G_LT, alpha_L, alpha_T
+          :rtype: Tuple of floats or ndarray(dtype=float)
+     """
+
+    G_m = Em / 2 / (1 + vm)
+    G_f = Ef / 2 / (1 + vf)
+
+    # Inverse rule of mixtures
+    E_L = Ef * Vf + Em * (1 - Vf)
+    v_LT = Vf * vf + vm * (1 - Vf)
+
+    # Halpin Tsai for transverse properties
+    eta_T = (Ef/Em - 1) / (Ef/Em + ksi_T)
+    E_T = Em * (1 + ksi_T*eta_T*Vf) / (1 - eta_T*Vf)
+    v_TL = v_LT * E_T / E_L
+
+    # Halpin Tsai for shear properties
+    eta_G = (G_f/G_m - 1) / (G_f/G_m + ksi_G)
+    G_LT = G_m * (1 + ksi_G * eta_G * Vf) / (1 - eta_G * Vf)
+
+    # Thermal expansion coefficients
+    alpha_L = 1 / E_L * (alpha_f * Ef * Vf + alpha_m * Em * (1 - Vf))
+    alpha_T = (1 + vf) * alpha_f * Vf + (1 + vm) * alpha_m * (1 - Vf) - alpha_L * v_LT
+
+    return E_L, E_T, v_LT, v_TL, G_LT, alpha_L, alpha_T
+
+
+def transformation_matrices(angles):
+    """Computes the coordinate transformation matrices for stress and strain tensors
+
+          :param angles: Ply angles in degrees
+          :type angles: ndarray(dtype=float, dim=...)
+          :returns: T_1, T_2
+          :rtype: ndarray(dtype=float, dim=...,3,3)
+
+     """
+
+    m = np.cos(np.deg2rad(angles))
+    n = np.sin(np.deg2rad(angles))
+
+    T1 = np.empty(np.shape(angles) + (3, 3))
+    T2 = np.empty(np.shape(angles) + (3, 3))
+
+    # For stress matrix
+    T1[..., 0, 0], T1[..., 0, 1], T1[..., 0, 2] = m**2, n**2, 2*m*n
+    T1[..., 1, 0], T1[..., 1, 1], T1[..., 1, 2] = n**2, m**2, -2*m*n
+    T1[..., 2, 0], T1[..., 2, 1], T1[..., 2, 2] = -m*n, m*n, m**2 - n**2
+
+    # For strain matrix
+    T2[..., 0, 0], T2[..., 0, 1], T2[..., 0, 2] = m**2, n**2, m*n
+    T2[..., 1, 0], T2[..., 1, 1], T2[..., 1, 2] = n**2, m**2, -m*n
+    T2[..., 2, 0], T2[..., 2, 1], T2[..., 2, 2] = -2*m*n, 2*m*n, m**2 - n**2
+
+    return T1, T2
+
+
+def local_stiffness(E_L, E_T, v_LT, G_LT):
+    """Computes the stiffness tensors in local coordinate system
+
+          :returns: Q
+          :rtype: ndarray(dtype=float, dim=...,3,3)
+     """
+
+    E_L, E_T, v_LT, G_LT = np.broadcast_arrays(E_L, E_T, v_LT, G_LT)
+    denominator = 1 - v_LT**2 * E_T / E_L
+
+    Q = np.zeros(E_L.shape + (3, 3))
+    Q[..., 0, 0] = E_L / denominator
+    Q[..., 0, 1] = Q[..., 1, 0] = v_LT * E_T / denominator
+    Q[..., 1, 1] = E_T / denominator
+    Q[..., 2, 2] = G_LT
+
+    return Q
+
+
+def global_properties(Q, alpha_L, alpha_T, angles):
+    """Transforms the stiffness tensors and thermal coefficients to the global coordinate system
+
+          :param Q: Stiffness tensors in local coordinate system
+          :type Q: ndarray(dtype=float, dim=...,3,3)
+          :param alpha_L: Thermal coefficients in longitudinal direction
+          :type alpha_L: ndarray(dtype=float, dim=...)
+          :param alpha_T: Thermal coefficients in transverse direction
+          :type alpha_T: ndarray(dtype=float, dim=...)
+          :param angles: Ply angles in degrees, broadcast against the leading dimensions of Q
+          :type angles: ndarray(dtype=float, dim=...)
+          :returns: Q_bar, alpha
+          :rtype: ndarray(dtype=float, dim=...,3,3), ndarray(dtype=float, dim=...,3)
+
+     """
+
+    # The inverse of a transformation matrix is the transformation matrix of the opposite angle
+    angles = np.asarray(angles, dtype=float)
+    T1_inv, T2_inv = transformation_matrices(-angles)
+    T2 = transformation_matrices(angles)[1]
+
+    Q_bar = T1_inv @ Q @ T2
+
+    alpha_local = np.stack(np.broadcast_arrays(alpha_L, alpha_T, 0.0), axis=-1)
+    alpha = np.einsum('...ij,...j->...i', T2_inv, alpha_local)
+
+    return get_policy().store(Q_bar), get_policy().store(alpha)
+
+
+def interface_coordinates(thicknesses):
+    """Computes the z coordinates of the ply interfaces relative the mid-plane
+
+          :param thicknesses: Ply thicknesses from bottom to top
+          :type thicknesses: ndarray(dtype=float, dim=...,n)
+          :returns: z
+          :rtype: ndarray(dtype=float, dim=...,n+1)
+
+     """
+
+    thicknesses = np.asarray(thicknesses, dtype=float)
+    z = np.zeros(thicknesses.shape[:-1] + (thicknesses.shape[-1] + 1,))
+    np.cumsum(thicknesses, axis=-1, out=z[..., 1:])
+
+    return z - z[..., -1:] / 2
+
+
+def stiffness_matrices(Q_bar, z):
+    """Computes A, B and D matrices
+
+          :param Q_bar: Ply stiffness tensors in global coordinate system
+          :type Q_bar: ndarray(dtype=float, dim=...,n,3,3)
+          :param z: Interface coordinates
+          :type z: ndarray(dtype=float, dim=...,n+1)
+          :returns: A, B, D matrices
+          :rtype: ndarray(dtype=float, dim=...,3,3)
+
+     """
+
+    z = np.asarray(z, dtype=float)
+    dtype = get_policy().accumulation
+    A = np.einsum('...k,...kij->...ij', z[..., 1:] - z[..., :-1], Q_bar, dtype=dtype)
+    B = np.einsum('...k,...kij->...ij', (z[..., 1:]**2 - z[..., :-1]**2) / 2, Q_bar, dtype=dtype)
+    D = np.einsum('...k,...kij->...ij', (z[..., 1:]**3 - z[..., :-1]**3) / 3, Q_bar, dtype=dtype)
+
+    return A, B, D
+
+
+def stiffness_matrix(A, B, D):
+    """Assembles the 6x6 laminate stiffness matrix [[A, B], [B, D]]
+
+          :returns: ABD
+          :rtype: ndarray(dtype=float, dim=...,6,6)
+
+     """
+
+    upper = np.concatenate((A, B), axis=-1)
+    lower = np.concatenate((B, D), axis=-1)
+
+    return np.concatenate((upper, lower), axis=-2)
+
+
+def thermal_forces(Q_bar, alpha, z):
+    """Computes thermal forces and moments acting on the laminate per unit temperature difference
+
+          :param Q_bar: Ply stiffness tensors in global coordinate system
+          :type Q_bar: ndarray(dtype=float, dim=...,n,3,3)
+          :param alpha: Ply thermal coefficients in global coordinate system
+          :type alpha: ndarray(dtype=float, dim=...,n,3)
+          :param z: Interface coordinates
+          :type z: ndarray(dtype=float, dim=...,n+1)
+          :returns: Load vector [N, M]
+          :rtype: ndarray(dtype=float, dim=...,6)
+
+     """
+
+    z = np.asarray(z, dtype=float)
+    dtype = get_policy().accumulation
+    Q_alpha = np.einsum('...kij,...kj->...ki', Q_bar, alpha, dtype=dtype)
+    normal_forces = np.einsum('...k,...ki->...i', z[..., 1:] - z[..., :-1], Q_alpha, dtype=dtype)
+    moments = np.einsum('...k,...ki->...i', (z[..., 1:]**2 - z[..., :-1]**2) / 2, Q_alpha, dtype=dtype)
+
+    return np.concatenate((normal_forces, moments), axis=-1)
+
+
+def solve_strains(A, B, D, loads):
+    """Solves the laminate equations for mid-plane strains and curvatures
+
+          :param A: Extension matrices
+          :type A: ndarray(dtype=float, dim=...,3,3)
+          :param B: Coupling matrices
+          :type B: ndarray(dtype=float, dim=...,3,3)
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param loads: Load vectors [N, M]
+          :type loads: ndarray(dtype=float, dim=...,6)
+          :returns: Strain vectors [midplane strains, curvatures]
+          :rtype: ndarray(dtype=float, dim=...,6)
+
+     """
+
+    policy = get_policy()
+    ABD = policy.accumulate(stiffness_matrix(A, B, D))
+
+    return np.linalg.solve(ABD, policy.accumulate(loads)[..., np.newaxis])[..., 0]
+
+
+def face_strains(strains, z, alpha=None, delta_T=0.0):
+    """Computes the strains at the bottom and top face of each ply
+
+          :param strains: Strain vectors [midplane strains, curvatures]
+          :type strains: ndarray(dtype=float, dim=...,6)
+          :param z: Interface coordinates
+          :type z: ndarray(dtype=float, dim=...,n+1)
+          :param alpha: Ply thermal coefficients, if given the free thermal strains are subtracted
+          :type alpha: ndarray(dtype=float, dim=...,n,3)
+          :param delta_T: Temperature difference
+          :type delta_T: float or ndarray(dtype=float, dim=...)
+          :returns: Strain components
+          :rtype: ndarray(dtype=float, dim=...,n,2,3)
+
+     """
+
+    z = np.asarray(z, dtype=float)
+    z_faces = np.stack((z[..., :-1], z[..., 1:]), axis=-1)
+    strains = np.asarray(strains)[..., np.newaxis, np.newaxis, :]
+
+    components = strains[..., :3] + z_faces[..., np.newaxis] * strains[..., 3:]
+
+    if alpha is not None:
+        components = components - np.asarray(delta_T)[..., np.newaxis, np.newaxis, np.newaxis] \
+                     * alpha[..., :, np.newaxis, :]
+
+    return get_policy().store(components)
+
+
+def face_stress(Q_bar, strains):
+    """Computes the stress at the bottom and top face of each ply
+
+          :param Q_bar: Ply stiffness tensors in global coordinate system
+          :type Q_bar: ndarray(dtype=float, dim=...,n,3,3)
+          :param strains: Strain components as returned by face_strains
+          :type strains: ndarray(dtype=float, dim=...,n,2,3)
+          :returns: Stress components
+          :rtype: ndarray(dtype=float, dim=...,n,2,3)
+
+     """
+
+    return np.einsum('...kij,...kfj->...kfi', Q_bar, strains)
+
+
+def transform(T, components):
+    """Transforms face components with one transformation matrix per ply, e.g. T1 for stress and T2 for strain
+
+          :param T: Transformation matrices
+          :type T: ndarray(dtype=float, dim=...,n,3,3)
+          :param components: Components as returned by face_strains or face_stress
+          :type components: ndarray(dtype=float, dim=...,n,2,3)
+          :returns: Transformed components
+          :rtype: ndarray(dtype=float, dim=...,n,2,3)
+
+     """
+
+    policy = get_policy()
+
+    return policy.store(np.einsum('...kij,...kfj->...kfi', T, components, dtype=policy.accumulation))
+
+
+def component_arrays(components):
+    """Rearranges face components to the layout of Laminate.create_laminate_arrays
+
+          :param components: Components as returned by face_strains or face_stress
+          :type components: ndarray(dtype=float, dim=...,n,2,3)
+          :returns: Components with two columns per ply, bottom face first
+          :rtype: ndarray(dtype=float, dim=...,3,nr_laminae*2)
+
+     """
+
+    components = np.asarray(components)
+    shape = components.shape[:-3] + (2 * components.shape[-3], 3)
+
+    return np.swapaxes(components.reshape(shape), -1, -2)
+
+
+def solve_load_cases(Q_bar, alpha, T1, T2, z, A, B, D, thermal_loads, mechanical_loads, delta_T):
+    """Solves thermal and combined loading, following Laminate.compute_thermal_stress and
+       Laminate.compute_total_stress
+
+          :param Q_bar: Ply stiffness tensors in global coordinate system
+          :type Q_bar: ndarray(dtype=float, dim=...,n,3,3)
+          :param alpha: Ply thermal coefficients in global coordinate system
+          :type alpha: ndarray(dtype=float, dim=...,n,3)
+          :param T1: Stress transformation matrices
+          :type T1: ndarray(dtype=float, dim=...,n,3,3)
+          :param T2: Strain transformation matrices
+          :type T2: ndarray(dtype=float, dim=...,n,3,3)
+          :param z: Interface coordinates
+          :type z: ndarray(dtype=float, dim=...,n+1)
+          :param A, B, D: Stiffness matrices
+          :type A, B, D: ndarray(dtype=float, dim=...,3,3)
+          :param thermal_loads: Thermal forces and moments
+          :type thermal_loads: ndarray(dtype=float, dim=...,6)
+          :param mechanical_loads: Mechanical load vectors [N, M]
+          :type mechanical_loads: ndarray(dtype=float, dim=...,6)
+          :param delta_T: Temperature differences
+          :type delta_T: ndarray(dtype=float, dim=...)
+          :returns: Strain vectors, dim=2,...,6 with thermal first, and per load type name the result arrays
+                    stress_global, stress_local, strains_global and strains_local, dim=...,3,n*2
+          :rtype: ndarray(dtype=float), dict
+
+     """
+
+    strains = solve_strains(A, B, D, np.stack((thermal_loads, thermal_loads + mechanical_loads)))
+
+    results = {}
+    for load_type, case_strains, free_strains in (('thermal', strains[0], (alpha, delta_T)),
+                                                  ('combined', strains[1], (None, 0.0))):
+        strain = face_strains(case_strains, z, *free_strains)
+        stress = face_stress(Q_bar, strain)
+        results[load_type] = {'stress_global': component_arrays(stress),
+                              'stress_local': component_arrays(transform(T1, stress)),
+                              'strains_global': component_arrays(strain),
+                              'strains_local': component_arrays(transform(T2, strain))}
+
+    return strains, results
@@ -3,7 +3,9 @@ from enum import Enum
 
 class StrainState:
 
+    __slots__ = ('components', 'coordinate_system', 'strain_type')
+
     def __init__(self, components, coordinate_system: Enum, strain_type: Enum):
         self.components = components
         self.coordinate_system = coordinate_system
-        self.strain_type = strain_type
\ No newline at end of file
+        self.strain_type = strain_type
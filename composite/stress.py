@@ -3,6 +3,8 @@ from enum import Enum
 
 class StressState:
 
+    __slots__ = ('components', 'coordinate_system', 'stress_type')
+
     def __init__(self, components, coordinate_system: Enum, stress_type: Enum):
         self.components = components
         self.coordinate_system = coordinate_system
@@ -0,0 +1,441 @@
+"""Parameter sweeps evaluated in chunks with the results streamed to disk.
+
+The design space is the Cartesian product of the values of each parameter. Cases are solved a chunk at a time with
+the vectorized functions of composite.stack and each result array is appended to a .npy file, so only one chunk is
+held in memory regardless of the number of cases. The files can be opened with numpy.load(..., mmap_mode='r').
+
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from . laminate import LoadType
+from . lamina import OrthotropicLamina
+from . stack import composite_properties, local_stiffness, global_properties, transformation_matrices, \
+    interface_coordinates, stiffness_matrices, thermal_forces, solve_load_cases
+from . precision import get_policy
+from . query import ResultIndex, COMPONENTS
+
+# Parameters changing the properties of plies and parameters changing the loads
+PLY_PARAMETERS = ('angle', 'thickness', 'volume_fraction')
+LOAD_PARAMETERS = ('delta_T', 'N', 'M')
+
+RESULTS = ('stress_global', 'stress_local', 'strains_global', 'strains_local')
+
+# Estimated number of floats held per ply and per case while a chunk is solved, see Sweep.case_bytes
+WORKING_FLOATS_PER_PLY = 160
+WORKING_FLOATS_PER_CASE = 96
+
+
+class SweepParameter:
+    """Class that represents one axis of the design space
+
+               :param name: One of angle, thickness, volume_fraction, delta_T, N or M
+               :type name: str
+               :param values: Values of the parameter
+               :type values: list of floats
+               :param positions: Positions in the lay up of the laminae the value is applied to, all if None. Only
+                                 used for ply parameters
+               :type positions: list of int
+               :param component: Component of N or M the value is applied to
+               :type component: int
+
+     """
+
+    def __init__(self, name, values, positions=None, component=0):
+        if name not in PLY_PARAMETERS + LOAD_PARAMETERS:
+            raise ValueError('Unknown sweep parameter ' + str(name))
+
+        self.name = name
+        self.values = np.asarray(values, dtype=float).ravel()
+        self.positions = None if positions is None else list(positions)
+        self.component = component
+
+        if not len(self.values):
+            raise ValueError('Sweep parameter ' + name + ' has no values')
+
+    def definition(self):
+        return {'name': self.name, 'values': self.values.tolist(), 'positions': self.positions,
+                'component': self.component}
+
+
+class ChunkReport:
+    """Timing of a solved chunk, passed to the progress callback of Sweep.run
+
+               :ivar index: Index of the chunk
+               :ivar start: First case of the chunk
+               :ivar stop: Case after the last case of the chunk
+               :ivar seconds: Time to solve and write the chunk
+               :ivar bytes_written: Size of the results written
+
+     """
+
+    def __init__(self, index, start, stop, seconds, bytes_written):
+        self.index = index
+        self.start = start
+        self.stop = stop
+        self.seconds = seconds
+        self.bytes_written = bytes_written
+
+    @property
+    def cases(self):
+        return self.stop - self.start
+
+    @property
+    def cases_per_second(self):
+        return self.cases / self.seconds if self.seconds else float('inf')
+
+    @property
+    def megabytes_per_second(self):
+        return self.bytes_written / 2**20 / self.seconds if self.seconds else float('inf')
+
+    def __str__(self):
+        return 'Chunk {}: cases {}-{} in {:.1f} ms, {:.0f} cases/s, {:.1f} MB/s'.format(
+            self.index, self.start, self.stop - 1, self.seconds * 1e3, self.cases_per_second,
+            self.megabytes_per_second)
+
+
+class Sweep:
+    """Class for solving a laminate for every combination of a set of parameter values
+
+        Thermal results follow Laminate.compute_thermal_stress and combined results follow
+        Laminate.compute_total_stress with the thermal load vector of the same case.
+
+          :param laminate: Laminate whose lay up, materials and loads are the base of every case
+          :type laminate: Instance of Laminate
+
+     """
+
+    def __init__(self, laminate):
+        if laminate.is_temperature_dependent():
+            raise ValueError('Sweeps of laminates with temperature dependent materials are not supported')
+        if any(isinstance(lamina, OrthotropicLamina) for lamina in laminate.laminae):
+            raise ValueError('Sweeps of laminae defined by their homogenised properties, e.g. imported from bulk data, '
+                             'are not supported')
+
+        laminae = laminate.laminae
+        self.size = len(laminae)
+        self.parameters = []
+
+        # Base ply properties, dim=nr_laminae
+        self.plies = {
+            'Ef': np.array([lamina.fibre_material.modulus for lamina in laminae], dtype=float),
+            'Em': np.array([lamina.matrix_material.modulus for lamina in laminae], dtype=float),
+            'vf': np.array([lamina.fibre_material.poisson_ratio for lamina in laminae], dtype=float),
+            'vm': np.array([lamina.matrix_material.poisson_ratio for lamina in laminae], dtype=float),
+            'alpha_f': np.array([lamina.fibre_material.thermal_coefficient for lamina in laminae], dtype=float),
+            'alpha_m': np.array([lamina.matrix_material.thermal_coefficient for lamina in laminae], dtype=float),
+            'volume_fraction': np.array([lamina.volume_fraction for lamina in laminae], dtype=float),
+            'angle': np.array([lamina.angle for lamina in laminae], dtype=float),
+            'thickness': np.array([lamina.thickness for lamina in laminae], dtype=float)}
+
+        # Base loads
+        self.loads = {'N': np.zeros(3), 'M': np.zeros(3), 'delta_T': float(np.squeeze(laminate.delta_T))}
+        self.loads['N'][:len(laminate.normal_forces)] = np.ravel(laminate.normal_forces)
+        self.loads['M'][:len(laminate.moments)] = np.ravel(laminate.moments)
+
+    def add_parameter(self, name, values, positions=None, component=0):
+        """Adds an axis to the design space, see SweepParameter
+
+              :returns: The sweep, so calls can be chained
+              :rtype: Sweep
+
+         """
+
+        parameter = SweepParameter(name, values, positions, component)
+        if name in PLY_PARAMETERS and parameter.positions is not None \
+                and not all(0 <= position < self.size for position in parameter.positions):
+            raise ValueError('Lamina position out of range for sweep parameter ' + name)
+
+        self.parameters.append(parameter)
+
+        return self
+
+    @property
+    def shape(self):
+        return tuple(len(parameter.values) for parameter in self.parameters)
+
+    @property
+    def cases(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def case_values(self, start, stop):
+        """Returns the value of each parameter for the cases start to stop
+
+              :returns: One array per parameter
+              :rtype: list of ndarray(dtype=float, dim=cases)
+
+         """
+
+        indices = np.unravel_index(np.arange(start, stop), self.shape) if self.parameters else ()
+
+        return [parameter.values[index] for parameter, index in zip(self.parameters, indices)]
+
+    def case_inputs(self, start, stop):
+        """Returns the ply properties and loads of the cases start to stop
+
+              :returns: Ply properties, dim=cases,nr_laminae, and loads, dim=cases,6 and dim=cases
+              :rtype: dict, ndarray(dtype=float), ndarray(dtype=float)
+
+         """
+
+        cases = stop - start
+        plies = {key: np.repeat(values[np.newaxis], cases, axis=0) for key, values in self.plies.items()}
+        mechanical_loads = np.repeat(np.concatenate((self.loads['N'], self.loads['M']))[np.newaxis], cases, axis=0)
+        delta_T = np.full(cases, self.loads['delta_T'])
+
+        for parameter, values in zip(self.parameters, self.case_values(start, stop)):
+            if parameter.name in PLY_PARAMETERS:
+                positions = slice(None) if parameter.positions is None else parameter.positions
+                plies[parameter.name][:, positions] = values[:, np.newaxis]
+            elif parameter.name == 'delta_T':
+                delta_T = values
+            else:
+                mechanical_loads[:, parameter.component + (3 if parameter.name == 'M' else 0)] = values
+
+        return plies, mechanical_loads, delta_T
+
+    def solve_chunk(self, start, stop):
+        """Solves the cases start to stop
+
+              :returns: Interface coordinates, dim=cases,nr_laminae*2, and per load type name the result arrays,
+                        dim=cases,3,nr_laminae*2, in the storage type of the precision policy
+              :rtype: ndarray(dtype=float), dict
+
+         """
+
+        return solve_cases(*self.case_inputs(start, stop))
+
+    def case_bytes(self):
+        """Estimates the memory used per case while a chunk is solved
+
+            Covers the ply property stacks, transformation matrices, face components of both load types and the
+            result arrays before they are written.
+
+              :rtype: int
+
+         """
+
+        return 8 * (WORKING_FLOATS_PER_PLY * self.size + WORKING_FLOATS_PER_CASE)
+
+    def chunk_size(self, memory_budget):
+        """Returns the number of cases per chunk keeping the estimated memory use below memory_budget bytes"""
+
+        return int(max(1, min(self.cases, memory_budget // self.case_bytes())))
+
+    def run(self, directory, memory_budget=256 * 2**20, load_types=(LoadType.thermal, LoadType.combined),
+            progress=None, solver=None):
+        """Solves all cases and writes the results to directory
+
+            Creates parameters.json describing the design space, z_coordinates.npy and one file per load type and
+            result, e.g. thermal_stress_global.npy with dim=cases,3,nr_laminae*2.
+
+              :param directory: Directory for the result files, created if missing
+              :type directory: str or Path
+              :param memory_budget: Approximate peak memory in bytes used for solving
+              :type memory_budget: int
+              :param load_types: Load types to write
+              :type load_types: list of LoadType
+              :param progress: Function called with a ChunkReport after each chunk
+              :type progress: callable
+              :param solver: Solver distributing each chunk over several processes, solved in this process if None
+              :type solver: Instance of composite.ParallelSolver
+              :returns: The results
+              :rtype: SweepResult
+
+         """
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # Indexes of previous results in directory are stale
+        shutil.rmtree(directory.joinpath('index'), ignore_errors=True)
+
+        with open(directory.joinpath('parameters.json'), 'w') as file:
+            json.dump({'shape': self.shape, 'laminae': self.size, 'angles': self.plies['angle'].tolist(),
+                       'parameters': [parameter.definition() for parameter in self.parameters]}, file)
+
+        dtype = get_policy().storage
+        shape = (self.cases, 3, 2 * self.size)
+        files = {'z_coordinates': open_array(directory.joinpath('z_coordinates.npy'), shape[::2], dtype)}
+        for load_type in load_types:
+            for name in RESULTS:
+                key = load_type.name + '_' + name
+                files[key] = open_array(directory.joinpath(key + '.npy'), shape, dtype)
+
+        chunk_size = self.chunk_size(memory_budget)
+
+        try:
+            for index, start in enumerate(range(0, self.cases, chunk_size)):
+                chunk_start = time.perf_counter()
+                stop = min(start + chunk_size, self.cases)
+
+                if solver is None:
+                    z_coordinates, results = self.solve_chunk(start, stop)
+                else:
+                    z_coordinates, results = solver.solve(*self.case_inputs(start, stop))
+                bytes_written = write_array(files['z_coordinates'], z_coordinates, dtype)
+                for load_type in load_types:
+                    for name in RESULTS:
+                        bytes_written += write_array(files[load_type.name + '_' + name], results[load_type.name][name],
+                                                     dtype)
+                del z_coordinates, results
+
+                if progress is not None:
+                    progress(ChunkReport(index, start, stop, time.perf_counter() - chunk_start, bytes_written))
+        finally:
+            for file in files.values():
+                file.close()
+
+        return SweepResult(directory)
+
+
+class SweepResult:
+    """Class for reading the results of Sweep.run
+
+          :param directory: Directory the results were written to
+          :type directory: str or Path
+
+     """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+        with open(self.directory.joinpath('parameters.json')) as file:
+            definition = json.load(file)
+
+        self.shape = tuple(definition['shape'])
+        self.parameters = [SweepParameter(**parameter) for parameter in definition['parameters']]
+
+        # Base ply angles, missing in results written before they were stored
+        self.angles = None if 'angles' not in definition else np.array(definition['angles'])
+
+    @property
+    def cases(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def load(self, load_type, name):
+        """Maps a result array into memory without reading it
+
+              :param load_type: Load type of the result
+              :type load_type: LoadType
+              :param name: One of stress_global, stress_local, strains_global and strains_local
+              :type name: str
+              :rtype: numpy.memmap, dim=cases,3,nr_laminae*2
+
+         """
+
+        return np.load(self.directory.joinpath(load_type.name + '_' + name + '.npy'), mmap_mode='r')
+
+    def z_coordinates(self):
+        return np.load(self.directory.joinpath('z_coordinates.npy'), mmap_mode='r')
+
+    def ply_angles(self, start, stop):
+        """Returns the ply angles of the cases start to stop
+
+              :rtype: ndarray(dtype=float, dim=cases,nr_laminae)
+
+         """
+
+        if self.angles is None:
+            raise ValueError('The ply angles are not stored with the results in ' + str(self.directory))
+
+        angles = np.repeat(self.angles[np.newaxis], stop - start, axis=0)
+        indices = np.unravel_index(np.arange(start, stop), self.shape) if self.parameters else ()
+
+        for parameter, index in zip(self.parameters, indices):
+            if parameter.name == 'angle':
+                positions = slice(None) if parameter.positions is None else parameter.positions
+                angles[:, positions] = parameter.values[index][:, np.newaxis]
+
+        return angles
+
+    def index(self, load_type, name):
+        """Returns the index of the extrema of a result array, built and saved with the results on first use
+
+              :param load_type: Load type of the result
+              :type load_type: LoadType
+              :param name: One of stress_global, stress_local, strains_global and strains_local
+              :type name: str
+              :rtype: ResultIndex
+
+         """
+
+        directory = self.directory.joinpath('index', load_type.name + '_' + name)
+
+        if directory.joinpath('components.txt').exists():
+            return ResultIndex.load(directory)
+
+        index = ResultIndex.build(self.load(load_type, name), self.ply_angles, COMPONENTS[name])
+        index.save(directory)
+
+        return index
+
+    def case_values(self, case):
+        """Returns the parameter values of a case as a dictionary from parameter description to value"""
+
+        indices = np.unravel_index(case, self.shape) if self.parameters else ()
+        values = {}
+        for parameter, index in zip(self.parameters, indices):
+            key = parameter.name
+            if parameter.name in PLY_PARAMETERS and parameter.positions is not None:
+                key += str(parameter.positions)
+            elif parameter.name in ('N', 'M'):
+                key += str(parameter.component)
+            values[key] = float(parameter.values[index])
+
+        return values
+
+
+def solve_cases(plies, mechanical_loads, delta_T):
+    """Solves thermal and combined loading of a stack of cases
+
+          :param plies: Ply properties Ef, Em, vf, vm, alpha_f, alpha_m, volume_fraction, angle and thickness
+          :type plies: dict of ndarray(dtype=float, dim=cases,nr_laminae)
+          :param mechanical_loads: Mechanical load vectors [N, M]
+          :type mechanical_loads: ndarray(dtype=float, dim=cases,6)
+          :param delta_T: Temperature differences
+          :type delta_T: ndarray(dtype=float, dim=cases)
+          :returns: Interface coordinates, dim=cases,nr_laminae*2, and per load type name the result arrays,
+                    dim=cases,3,nr_laminae*2, in the storage type of the precision policy
+          :rtype: ndarray(dtype=float), dict
+
+     """
+
+    E_L, E_T, v_LT, _, G_LT, alpha_L, alpha_T = composite_properties(
+        plies['Ef'], plies['Em'], plies['vf'], plies['vm'], plies['volume_fraction'], plies['alpha_f'],
+        plies['alpha_m'])
+    Q_bar, alpha = global_properties(local_stiffness(E_L, E_T, v_LT, G_LT), alpha_L, alpha_T, plies['angle'])
+    T1, T2 = transformation_matrices(plies['angle'])
+    z = interface_coordinates(plies['thickness'])
+
+    A, B, D = stiffness_matrices(Q_bar, z)
+    thermal_loads = delta_T[:, np.newaxis] * thermal_forces(Q_bar, alpha, z)
+    _, results = solve_load_cases(Q_bar, alpha, T1, T2, z, A, B, D, thermal_loads, mechanical_loads, delta_T)
+
+    z_coordinates = np.repeat(z, 2, axis=-1)[:, 1:-1]
+
+    return z_coordinates, results
+
+
+def open_array(path, shape, dtype):
+    """Creates a .npy file for an array of the given shape whose data is appended with write_array"""
+
+    file = open(path, 'wb')
+    np.lib.format.write_array_header_2_0(file, {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                'fortran_order': False, 'shape': tuple(shape)})
+
+    return file
+
+
+def write_array(file, array, dtype):
+    """Appends array in C order to a file created by open_array and returns the number of bytes written"""
+
+    array = np.ascontiguousarray(array, dtype=dtype)
+    array.tofile(file)
+
+    return array.nbytes
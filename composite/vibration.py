@@ -0,0 +1,98 @@
+"""Natural frequencies of rectangular simply supported plates of specially orthotropic laminates.
+
+The sine mode (m, n) is a free vibration mode of the plate with the angular frequency
+
+    omega_mn^2 = (D11 alpha_m^4 + 2 (D12 + 2 D66) alpha_m^2 beta_n^2 + D22 beta_n^4) / rho_A
+
+where rho_A is the mass per unit area. As in buckling, bending matrices, areal densities and plate dimensions
+broadcast, so the frequencies of many laminates and plate sizes are computed in one call.
+
+"""
+
+import numpy as np
+
+from . plate import mode_stiffness
+
+
+def areal_densities(thickness, density):
+    """Computes the mass per unit area of stacks of plies
+
+          :param thickness: Ply thicknesses
+          :type thickness: ndarray(dtype=float, dim=...,nr_laminae)
+          :param density: Ply densities
+          :type density: ndarray(dtype=float, dim=...,nr_laminae)
+          :returns: Areal densities
+          :rtype: ndarray(dtype=float, dim=...)
+
+     """
+
+    return np.sum(np.asarray(thickness, dtype=float) * np.asarray(density, dtype=float), axis=-1)
+
+
+def natural_frequencies(D, areal_density, a, b, count=5, modes=(10, 10)):
+    """Computes the lowest natural frequencies and their mode numbers
+
+        D, areal_density, a and b broadcast, e.g. D of dim=laminates,1,3,3 with a of dim=sizes gives results of
+        dim=laminates,sizes,count.
+
+          :param D: Bending matrices
+          :type D: ndarray(dtype=float, dim=...,3,3)
+          :param areal_density: Mass per unit area
+          :type areal_density: float or ndarray(dtype=float)
+          :param a: Length of the plates in x direction
+          :type a: float or ndarray(dtype=float)
+          :param b: Length of the plates in y direction
+          :type b: float or ndarray(dtype=float)
+          :param count: Number of frequencies to return, at most modes[0] * modes[1]
+          :type count: int
+          :param modes: Largest number of half waves in x and y direction
+          :type modes: tuple of int
+          :returns: Frequencies in Hz in increasing order and the number of half waves m and n of each mode,
+                    dim=...,count
+          :rtype: ndarray(dtype=float), ndarray(dtype=int), ndarray(dtype=int)
+
+     """
+
+    D = np.asarray(D, dtype=float)
+    shape = np.broadcast_shapes(D.shape[:-2], np.shape(areal_density), np.shape(a), np.shape(b))
+
+    def expand(value):
+        # Trailing dimensions for the mode numbers
+        return np.broadcast_to(value, shape)[..., np.newaxis, np.newaxis]
+
+    m = np.arange(1, modes[0] + 1)[:, np.newaxis]
+    n = np.arange(1, modes[1] + 1)[np.newaxis, :]
+    D = np.broadcast_to(D, shape + (3, 3))[..., np.newaxis, np.newaxis, :, :]
+
+    omega_squared = mode_stiffness(D, m * np.pi / expand(a), n * np.pi / expand(b)) / expand(areal_density)
+    flat = omega_squared.reshape(shape + (-1,))
+
+    # Partition before sorting, only count of the modes are needed
+    count = min(count, flat.shape[-1])
+    index = np.argpartition(flat, count - 1, axis=-1)[..., :count]
+    index = np.take_along_axis(index, np.take_along_axis(flat, index, axis=-1).argsort(axis=-1), axis=-1)
+    m_modes, n_modes = np.unravel_index(index, modes)
+
+    frequencies = np.sqrt(np.take_along_axis(flat, index, axis=-1)) / (2 * np.pi)
+
+    return frequencies, m_modes + 1, n_modes + 1
+
+
+def laminate_frequencies(laminates, a, b, count=5, modes=(10, 10)):
+    """Computes the natural frequencies of plates of several laminates, see natural_frequencies
+
+          :param laminates: Laminates with densities for all constituents
+          :type laminates: list of instances of Laminate
+          :param a: Length of the plates in x direction, broadcast against the laminates in the last dimension
+          :type a: float or ndarray(dtype=float)
+          :param b: Length of the plates in y direction, broadcast against the laminates in the last dimension
+          :type b: float or ndarray(dtype=float)
+          :returns: Frequencies in Hz and mode numbers, dim=...,laminates,count
+          :rtype: ndarray(dtype=float), ndarray(dtype=int), ndarray(dtype=int)
+
+     """
+
+    D = np.array([laminate.D for laminate in laminates], dtype=float)
+    areal_density = np.array([laminate.areal_density() for laminate in laminates])
+
+    return natural_frequencies(D, areal_density, a, b, count, modes)
@@ -0,0 +1,229 @@
+import time
+from pathlib import Path
+
+import composite
+
+
+class InputChanges:
+    """Describes what changed between two versions of an input file
+
+               :ivar laminae: Positions in the lay up of laminae that were rebuilt, moved or rotated
+               :ivar lay_up: True if laminae were added, removed or changed
+               :ivar loads: True if the loads changed
+               :ivar project_info: True if the project info changed
+
+     """
+
+    def __init__(self):
+        self.laminae = set()
+        self.lay_up = False
+        self.loads = False
+        self.project_info = False
+
+    def __bool__(self):
+        return self.lay_up or self.loads or self.project_info
+
+    def requires_solution(self):
+        return self.lay_up or self.loads
+
+
+class InputWatcher:
+    """Keeps a laminate in sync with an input file
+
+        When the file changes, the new input data is compared with the previous version and only the laminae whose
+        properties changed are rebuilt, using the editing methods of Laminate to update A, B and D in place.
+
+          :param filepath: Input file to watch
+          :type filepath: str or Path
+
+          :ivar laminate: Laminate described by the latest valid version of the input file
+          :ivar project_info: Project info of the latest valid version of the input file
+
+     """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.status = self.file_status()
+        self.input_data = composite.parser.read_input_data(self.filepath)
+        self.materials = {material.index: material for material in composite.parser.create_materials(self.input_data)}
+        self.laminate = composite.parser.create_laminate(self.input_data, list(self.materials.values()))
+        self.project_info = self.input_data['PROJECT_INFO']
+
+    def file_status(self):
+        try:
+            status = self.filepath.stat()
+        except FileNotFoundError:
+            return None
+        return status.st_mtime_ns, status.st_size
+
+    def check(self):
+        """Reloads the input file if it was modified since the last check
+
+              :returns: The changes, None if the file is unmodified or could not be parsed
+              :rtype: InputChanges
+
+         """
+
+        status = self.file_status()
+        if status is None or status == self.status:
+            return None
+
+        self.status = status
+
+        return self.reload()
+
+    def reload(self):
+        """Reads the input file and applies the differences to the laminate
+
+            Files that cannot be parsed, e.g. while being written, are ignored and the previous state is kept.
+
+              :returns: The changes, None if the file could not be parsed
+              :rtype: InputChanges
+
+         """
+
+        try:
+            input_data = composite.parser.read_input_data(self.filepath)
+            materials = composite.parser.create_materials(input_data)
+        except (OSError, ValueError, KeyError, UnboundLocalError):
+            return None
+
+        if not is_complete(input_data, materials):
+            return None
+
+        changes = InputChanges()
+        changed_materials = self.update_materials(materials)
+        self.update_laminae(input_data['LAMINAE'], changed_materials, changes)
+
+        if input_data['LOADS'] != self.input_data['LOADS']:
+            self.laminate.reset_loads()
+            composite.parser.add_loads(self.laminate, input_data['LOADS'])
+            changes.loads = True
+
+        if input_data['PROJECT_INFO'] != self.input_data['PROJECT_INFO']:
+            self.project_info = input_data['PROJECT_INFO']
+            changes.project_info = True
+
+        self.input_data = input_data
+
+        return changes
+
+    def update_materials(self, materials):
+        """Replaces the materials whose properties changed
+
+              :param materials: Materials created from the new input data
+              :type materials: List of instances of composite.Material
+              :returns: Indices of the changed materials
+              :rtype: set of int
+
+         """
+
+        changed_materials = set()
+        new_materials = {}
+
+        for material in materials:
+            old_material = self.materials.get(material.index)
+
+            if old_material is not None and material_properties(old_material) == material_properties(material):
+                new_materials[material.index] = old_material
+            else:
+                new_materials[material.index] = material
+                changed_materials.add(material.index)
+
+        self.materials = new_materials
+
+        return changed_materials
+
+    def update_laminae(self, lamina_data, changed_materials, changes):
+        """Applies the differences in the LAMINAE section to the laminate
+
+              :param lamina_data: LAMINAE section of the new input data
+              :type lamina_data: dict
+              :param changed_materials: Indices of the materials that changed
+              :type changed_materials: set of int
+              :param changes: Changes to record the affected laminae in
+              :type changes: InputChanges
+
+         """
+
+        laminate = self.laminate
+        old_rows = list(self.input_data['LAMINAE'].values())
+        new_rows = list(lamina_data.values())
+        materials = self.materials
+
+        for position, (old_row, new_row) in enumerate(zip(old_rows, new_rows)):
+            thickness, angle, fibre_index, matrix_index, volume_fraction = new_row[:5]
+
+            if (old_row[2:5] != new_row[2:5] or int(fibre_index) in changed_materials
+                    or int(matrix_index) in changed_materials):
+                lamina = composite.parser.create_lamina(position + 1, new_row, materials, [0.0, thickness])
+                laminate.replace_lamina(position, lamina)
+                changes.laminae.add(position)
+                continue
+
+            if old_row[0] != thickness:
+                laminate.set_thickness(position, thickness)
+                changes.laminae.update(range(position, len(laminate.laminae)))
+
+            if old_row[1] != angle:
+                laminate.set_angle(position, angle)
+                changes.laminae.add(position)
+
+        # Remove laminae from the top or add new ones
+        for position in range(len(old_rows) - 1, len(new_rows) - 1, -1):
+            laminate.remove_lamina(position)
+
+        for position in range(len(old_rows), len(new_rows)):
+            lamina = composite.parser.create_lamina(position + 1, new_rows[position], materials,
+                                                    [0.0, new_rows[position][0]])
+            laminate.add_laminae(lamina)
+            changes.laminae.add(position)
+
+        changes.lay_up = bool(changes.laminae) or len(old_rows) != len(new_rows)
+
+    def watch(self, callback, interval=0.05):
+        """Calls callback with the changes each time the input file is modified, until interrupted
+
+              :param callback: Function taking the watcher and an instance of InputChanges
+              :type callback: callable
+              :param interval: Time in seconds between checks of the file
+              :type interval: float
+
+         """
+
+        while True:
+            changes = self.check()
+            if changes:
+                callback(self, changes)
+            time.sleep(interval)
+
+
+def is_complete(input_data, materials):
+    """Checks that the input data has all sections and that every lamina refers to existing materials
+
+          :param input_data: Data read by composite.parser.read_input_data
+          :type input_data: dict
+          :param materials: Materials created from the input data
+          :type materials: List of instances of composite.Material
+          :rtype: bool
+
+     """
+
+    if not all(section in input_data for section in ('LAMINAE', 'LOADS', 'PROJECT_INFO')):
+        return False
+
+    indices = {material.index for material in materials}
+
+    return all(len(row) == 5 and int(row[2]) in indices and int(row[3]) in indices
+               for row in input_data['LAMINAE'].values())
+
+
+def material_properties(material):
+    """Returns the properties of a material that affect the laminae made of it"""
+
+    if material.is_temperature_dependent:
+        return (material.modulus, material.poisson_ratio, material.thermal_coefficient, material.density,
+                material.temperatures.tolist(), material.modulus_table.tolist(),
+                material.poisson_ratio_table.tolist(), material.thermal_coefficient_table.tolist())
+
+    return material.modulus, material.poisson_ratio, material.thermal_coefficient, material.density
@@ -0,0 +1,232 @@
+"""Zones of a tapered part obtained by dropping plies of a master laminate.
+
+A zone is the subset of the plies of the master laminate present in a region of the part. The ply stiffness, thermal
+coefficients and transformation matrices are taken once from the master laminate and shared by all zones. Dropped
+plies are given zero thickness, so the interface coordinates of every zone, the cumulative sums of the thicknesses of
+its plies re-centered on its own mid-plane, are computed in one call and the stiffness matrices, strains and stress
+of all zones follow from the vectorized functions of composite.stack.
+
+Zones are defined in code with ZonedLaminate.add_zone or in the ZONES section of an input file, one +NAME per zone
+followed by the numbers of the LAMINAE dropped in the zone, see read_zone_file.
+
+"""
+
+import copy
+from pathlib import Path
+
+import numpy as np
+
+from . laminate import LoadType
+from . parser import read_input_data, create_laminate
+from . stack import interface_coordinates, stiffness_matrices, thermal_forces, solve_strains, face_strains, \
+    face_stress, transform, component_arrays
+
+RESULTS = ('stress_global', 'stress_local', 'strains_global', 'strains_local')
+
+
+class ZonedLaminate:
+    """Class for the zones of a part made from one master laminate
+
+          :param master: Laminate holding every ply of the part, its loads are the default loads of the zones
+          :type master: Instance of Laminate
+
+          :ivar names: Zone names
+          :ivar present: Whether each ply of the master laminate is present in each zone, dim=nr_zones,nr_laminae
+          :ivar loads: Mechanical load vectors [N, M] of each zone, dim=nr_zones,6
+          :ivar delta_T: Temperature difference of each zone, dim=nr_zones
+
+     """
+
+    def __init__(self, master):
+        if master.is_temperature_dependent():
+            raise ValueError('Zones of laminates with temperature dependent materials are not supported')
+
+        laminae = master.laminae
+        self.master = master
+        self.size = len(laminae)
+
+        # Ply properties shared by all zones
+        self.thickness = np.array([lamina.thickness for lamina in laminae], dtype=float)
+        self.Q_bar = np.array([lamina.global_properties.Q for lamina in laminae])
+        self.alpha = np.array([lamina.global_properties.alpha[:, 0] for lamina in laminae])
+        self.T1 = np.array([lamina.T1 for lamina in laminae])
+        self.T2 = np.array([lamina.T2 for lamina in laminae])
+
+        self.names = []
+        self.present = np.zeros((0, self.size), dtype=bool)
+        self.loads = np.zeros((0, 6))
+        self.delta_T = np.zeros(0)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_zone(self, name, dropped=(), normal_forces=None, moments=None, delta_T=None):
+        """Adds a zone with the plies of the master laminate except the dropped
+
+              :param name: Name of the zone
+              :type name: str
+              :param dropped: Positions in the master lay up of the dropped plies, 0 is the bottom
+              :type dropped: list of int
+              :param normal_forces: Normal forces [Nx, Ny, Nxy], those of the master laminate if None
+              :type normal_forces: list of floats
+              :param moments: Moments [Mx, My, Mxy], those of the master laminate if None
+              :type moments: list of floats
+              :param delta_T: Temperature difference, that of the master laminate if None
+              :type delta_T: float
+              :returns: Position of the zone
+              :rtype: int
+
+         """
+
+        present = np.ones(self.size, dtype=bool)
+        present[list(dropped)] = False
+        if not present.any():
+            raise ValueError('Zone ' + str(name) + ' drops every ply')
+
+        master = self.master
+        loads = np.zeros(6)
+        for offset, values in ((0, master.normal_forces if normal_forces is None else normal_forces),
+                               (3, master.moments if moments is None else moments)):
+            values = np.ravel(values)
+            loads[offset:offset + len(values)] = values
+
+        self.names.append(name)
+        self.present = np.append(self.present, present[np.newaxis], axis=0)
+        self.loads = np.append(self.loads, loads[np.newaxis], axis=0)
+        self.delta_T = np.append(self.delta_T, float(np.squeeze(master.delta_T if delta_T is None else delta_T)))
+
+        return len(self.names) - 1
+
+    def interface_coordinates(self):
+        """Computes the interface coordinates of every zone relative its mid-plane, dropped plies have zero thickness
+
+              :returns: z
+              :rtype: ndarray(dtype=float, dim=nr_zones,nr_laminae+1)
+
+         """
+
+        return interface_coordinates(self.present * self.thickness)
+
+    def stiffness_matrices(self):
+        """Computes the A, B and D matrices of every zone
+
+              :returns: A, B, D matrices
+              :rtype: ndarray(dtype=float, dim=nr_zones,3,3)
+
+         """
+
+        return stiffness_matrices(self.Q_bar, self.interface_coordinates())
+
+    def solve(self):
+        """Solves thermal and combined loading of every zone, see ZoneResult"""
+
+        return ZoneResult(self)
+
+    def laminate(self, zone):
+        """Creates the laminate of a zone as a copy of the master laminate without the dropped plies
+
+              :param zone: Position of the zone
+              :type zone: int
+              :rtype: Laminate
+
+         """
+
+        laminate = copy.deepcopy(self.master)
+        for position in np.flatnonzero(~self.present[zone])[::-1]:
+            laminate.remove_lamina(int(position))
+
+        laminate.normal_forces = self.loads[zone, :3].tolist()
+        laminate.moments = self.loads[zone, 3:].tolist()
+        laminate.delta_T = float(self.delta_T[zone])
+
+        return laminate
+
+
+class ZoneResult:
+    """Results of all zones, following Laminate.compute_thermal_stress and Laminate.compute_total_stress
+
+        The result arrays have two columns per ply of the master laminate, which are NaN for the plies dropped in a
+        zone.
+
+          :param zones: Zones to solve
+          :type zones: ZonedLaminate
+
+          :ivar A, B, D: Stiffness matrices of each zone, dim=nr_zones,3,3
+          :ivar z: Interface coordinates of each zone, dim=nr_zones,nr_laminae+1
+          :ivar strains: Mid-plane strains and curvatures of each zone, dim=2,nr_zones,6 with thermal first
+          :ivar stress_global, stress_local, strains_global, strains_local: Results of each zone as in
+                create_laminate_arrays, dim=2,nr_zones,3,nr_laminae*2
+
+     """
+
+    def __init__(self, zones):
+        self.zones = zones
+        self.z = zones.interface_coordinates()
+        self.A, self.B, self.D = stiffness_matrices(zones.Q_bar, self.z)
+
+        thermal_loads = zones.delta_T[:, np.newaxis] * thermal_forces(zones.Q_bar, zones.alpha, self.z)
+        self.strains = solve_strains(self.A, self.B, self.D, np.stack((thermal_loads, thermal_loads + zones.loads)))
+
+        thermal_strain = face_strains(self.strains[0], self.z, zones.alpha, zones.delta_T)
+        total_strain = face_strains(self.strains[1], self.z)
+        strain = np.stack((thermal_strain, total_strain))
+        stress = face_stress(zones.Q_bar, strain)
+
+        dropped = np.repeat(~zones.present, 2, axis=-1)[:, np.newaxis, :]
+        for name, components in zip(RESULTS, (stress, transform(zones.T1, stress), strain,
+                                              transform(zones.T2, strain))):
+            setattr(self, name, np.where(dropped, np.nan, component_arrays(components)))
+
+    def zone(self, position, load_type=LoadType.combined):
+        """Returns the results of one zone without the dropped plies
+
+              :param position: Position of the zone
+              :type position: int
+              :param load_type: Load type of the results
+              :type load_type: LoadType
+              :returns: Zone name, A, B, D, mid-plane strains, curvatures and the result arrays
+              :rtype: dict
+
+         """
+
+        index = 0 if load_type == LoadType.thermal else 1
+        columns = np.repeat(self.zones.present[position], 2)
+        result = {'name': self.zones.names[position], 'A': self.A[position], 'B': self.B[position],
+                  'D': self.D[position], 'midplane_strains': self.strains[index, position, :3],
+                  'curvatures': self.strains[index, position, 3:]}
+
+        for name in RESULTS:
+            result[name] = getattr(self, name)[index, position][:, columns]
+
+        return result
+
+
+def read_zone_file(filename='', filepath='', library=None):
+    """Reads an input file with a ZONES section into the zones of its laminate
+
+        Each zone is a +NAME followed by the comma separated numbers of the LAMINAE dropped in the zone, or no line if
+        no plies are dropped. The loads of the file apply to every zone.
+
+              :param filename: Input file
+              :type filename: str
+              :param library: Library of the MATERIAL_LIBRARY materials, the default library if None
+              :type library: Instance of composite.MaterialLibrary
+              :returns: Zones, project_info
+              :rtype: ZonedLaminate, dict
+
+     """
+
+    if filepath == '':
+        filepath = Path.cwd().joinpath('input', filename)
+
+    input_data = read_input_data(filepath)
+    zones = ZonedLaminate(create_laminate(input_data, library=library))
+    positions = {int(index): position for position, index in enumerate(input_data['LAMINAE'])}
+
+    for name, dropped in input_data.get('ZONES', {}).items():
+        unknown = [int(index) for index in dropped if int(index) not in positions]
+        if unknown:
+            raise ValueError('Zone ' + name + ' drops unknown laminae ' + str(unknown))
+        zones.add_zone(name, [positions[int(index)] for index in dropped])
+
+    return zones, input_data['PROJECT_INFO']
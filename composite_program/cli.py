@@ -0,0 +1,122 @@
+import argparse
+import time
+from pathlib import Path
+
+import composite
+from composite import LoadType, ResultCache, InputWatcher, DOUBLE, SINGLE, set_policy
+
+
+def parse_arguments(arguments=None):
+    """Parses the command line arguments
+
+          :param arguments: Arguments to parse, defaults to sys.argv
+          :type arguments: list of str
+          :returns: Parsed arguments
+          :rtype: argparse.Namespace
+
+     """
+
+    parser = argparse.ArgumentParser(description='Computes laminate results for an input file')
+    parser.add_argument('input_file', type=Path, help='Input file on the *SECTION/+KEY format')
+    parser.add_argument('--output', type=Path, help='Result file, .txt for text and .xls for Excel output')
+    parser.add_argument('--thermal', action='store_true', help='Include results due to thermal loading')
+    parser.add_argument('--total', action='store_true', help='Include results due to combined loading')
+    parser.add_argument('--cache-dir', type=Path, help='Directory of the result cache')
+    parser.add_argument('--cache-size', type=int, default=256, help='Maximum size of the result cache in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Always recompute the results')
+    parser.add_argument('--precision', choices=[DOUBLE.name, SINGLE.name], default=DOUBLE.name,
+                        help='Floating point type of the stored results, single halves the memory use')
+    parser.add_argument('--fe-export', type=Path,
+                        help='Shell section file, .bdf, .dat or .nas for Nastran and .inp for Abaqus')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and recompute the results each time the input file is saved')
+
+    return parser.parse_args(arguments)
+
+
+def compute(laminate, load_types, cache=None):
+    """Computes the results of load_types, in order, using the cache if supplied
+
+          :param laminate: Laminate to compute results for
+          :type laminate: Instance of Laminate
+          :param load_types: Load types to compute
+          :type load_types: list of LoadType
+          :param cache: Result cache, None to always recompute
+          :type cache: Instance of ResultCache
+
+     """
+
+    for load_type in load_types:
+        if cache is not None:
+            cache.compute(laminate, load_type)
+        elif load_type == LoadType.thermal:
+            laminate.compute_thermal_stress()
+        else:
+            laminate.compute_total_stress()
+
+
+def export(laminate, project_info, filepath, load_types):
+    """Writes the results of load_types to a text or Excel file depending on the file suffix
+
+        The exporters are only imported here, through the lazy attributes of composite, so runs without output do
+        not load them.
+
+     """
+
+    info = {'PROJECT_INFO': project_info}
+
+    if filepath.suffix == '.xls':
+        print_object = composite.ExcelPrint(info, filepath)
+        for load_type in load_types:
+            print_object.write_data(laminate, load_type=load_type)
+    else:
+        print_object = composite.FilePrint(info, filepath=filepath)
+        print_object.print_project_info()
+        for load_type in load_types:
+            print_object.print_output_data(laminate, load_type=load_type)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    set_policy(SINGLE if arguments.precision == SINGLE.name else DOUBLE)
+
+    # Thermal results are computed first as the combined results include the thermal loads
+    load_types = [load_type for load_type, include in ((LoadType.thermal, arguments.thermal),
+                                                       (LoadType.combined, arguments.total)) if include]
+    if not load_types:
+        load_types = [LoadType.thermal, LoadType.combined]
+
+    cache = None
+    if not arguments.no_cache:
+        cache = ResultCache(arguments.cache_dir, max_size=arguments.cache_size * 2**20)
+
+    watcher = InputWatcher(arguments.input_file)
+    compute(watcher.laminate, load_types, cache)
+
+    if arguments.output:
+        export(watcher.laminate, watcher.project_info, arguments.output, load_types)
+    if arguments.fe_export:
+        composite.export_shell_sections([watcher.laminate], arguments.fe_export)
+
+    if arguments.watch:
+        def update(watcher, changes):
+            start = time.perf_counter()
+
+            if changes.requires_solution():
+                compute(watcher.laminate, load_types, cache)
+            if arguments.output:
+                export(watcher.laminate, watcher.project_info, arguments.output, load_types)
+            if arguments.fe_export:
+                composite.export_shell_sections([watcher.laminate], arguments.fe_export)
+
+            print('Updated {} laminae in {:.1f} ms'.format(len(changes.laminae), (time.perf_counter() - start) * 1e3))
+
+        print('Watching ' + str(arguments.input_file) + ', press Ctrl+C to stop')
+        try:
+            watcher.watch(update)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
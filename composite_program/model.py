@@ -1,8 +1,12 @@
+import time
+from collections import OrderedDict
+
 import numpy as np
+from pathlib import Path
 from PyQt5.QtCore import *
 
-from composite import read_input_file, FilePrint, LoadType, Laminate, Quantity, ExcelPrint
-from coordinate_systems import CoordinateSystem
+from composite import FilePrint, LoadType, Quantity, ExcelPrint, ResultCache, InputWatcher
+from composite.coordinate_systems import CoordinateSystem
 
 
 class ResultData:
@@ -18,12 +22,15 @@ class ResultData:
         :type strains_local: ndarray(dtype=float, dim=3,nr_laminae*2)
         :param: z_coordinates: Z coordinates (two at each interface) at each interface of the laminate
         :type z_coordinates: ndarray(dtype=float, dim=1,nr_laminae*2)
+        :param: interlaminar_shear_stress: Stress [tau_xz, tau_yz] at the ply faces due to the shear forces, None
+                for thermal results
+        :type interlaminar_shear_stress: ndarray(dtype=float, dim=2,nr_laminae*2)
 
 
     """
 
     def __init__(self, stresses_global, stresses_local, strains_global,
-                 strains_local, z_coordinates):
+                 strains_local, z_coordinates, interlaminar_shear_stress=None):
 
         # Data that should be displayed
         self.global_stress = stresses_global
@@ -31,6 +38,102 @@ class ResultData:
         self.global_strains = strains_global
         self.local_strains = strains_local
         self.z_coordinates = z_coordinates
+        self.interlaminar_shear_stress = interlaminar_shear_stress
+
+
+class Project:
+    """Class for a loaded input file and the results computed for it
+
+        :param filepath: Path of the input file
+        :type filepath: str
+        :param name: Name of the project
+        :type name: str
+
+        :ivar input_watcher: Keeps the laminate in sync with the input file
+        :ivar result_thermal: Results due to thermal loading, None until computed
+        :ivar result_total: Results due to combined loading, None until computed
+
+    """
+
+    def __init__(self, filepath, name):
+        self.filepath = filepath
+        self.name = name
+        self.input_watcher = InputWatcher(filepath)
+        self.project_info = self.input_watcher.project_info
+        self.result_thermal = None
+        self.result_total = None
+
+    @property
+    def laminate(self):
+        return self.input_watcher.laminate
+
+    @property
+    def key(self):
+        """Resolved path and modification time of the input file version the project holds"""
+        return str(Path(self.filepath).resolve()), self.input_watcher.status[0]
+
+    @property
+    def label(self):
+        return self.name + time.strftime(' (%H:%M:%S)', time.localtime(self.key[1] / 1e9))
+
+    def result(self, load_type):
+        return self.result_thermal if load_type == LoadType.thermal else self.result_total
+
+    def compute(self, load_type, result_cache):
+        """Computes the results of load_type, using the result cache, and stores them in the project
+
+            :param load_type: Load type to compute
+            :type load_type: LoadType
+            :param result_cache: Cache of computed results
+            :type result_cache: Instance of ResultCache
+            :rtype: ResultData
+
+        """
+
+        result = ResultData(*result_cache.compute(self.laminate, load_type))
+
+        if load_type == LoadType.thermal:
+            self.result_thermal = result
+        else:
+            result.interlaminar_shear_stress = self.laminate.interlaminar_shear_stress
+            self.result_total = result
+
+        return result
+
+
+class ProjectCache(OrderedDict):
+    """Projects keyed by input file path and modification time, the least recently used are removed first
+
+        :param max_projects: Maximum number of projects kept
+        :type max_projects: int
+
+    """
+
+    def __init__(self, max_projects=8):
+        super().__init__()
+        self.max_projects = max_projects
+
+    def lookup(self, key):
+        """Returns the project of key, marking it as recently used, or None if it is not loaded"""
+
+        project = self.get(key)
+        if project is not None:
+            self.move_to_end(key)
+        return project
+
+    def insert(self, project):
+        self[project.key] = project
+        self.move_to_end(project.key)
+        while len(self) > self.max_projects:
+            self.popitem(last=False)
+
+    def rekey(self, project):
+        """Moves a project whose input file was modified to its new key"""
+
+        for key, cached_project in list(self.items()):
+            if cached_project is project:
+                del self[key]
+        self.insert(project)
 
 
 class Model(QObject):
@@ -39,17 +142,27 @@ class Model(QObject):
 
     # Establish signals to the view
     plot_display_data = pyqtSignal()
+    projects_changed = pyqtSignal()
+    project_switched = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, max_projects=8):
         super().__init__()
         self.input_directory = ""
         self.project_name = ""
-        self.project_info = dict()
-        self.laminate = Laminate
+        self.result_cache = ResultCache()
+
+        # Loaded projects, the laminate, input watcher and results of the current one are properties of the model
+        self.projects = ProjectCache(max_projects)
+        self.project = None
 
-        # Objects to store the computed data
-        self.result_thermal = ResultData
-        self.result_total = ResultData
+        # Projects whose results are drawn on top of those of the current project
+        self.overlays = []
+
+        # Watching of the input file, exports are repeated with the same options when the file changes
+        self.file_watcher = QFileSystemWatcher()
+        self.file_watcher.fileChanged.connect(self.input_file_changed)
+        self.text_export = None
+        self.Excel_export = None
 
         # Attributes that keeps track of what is currently displayed on the canvas canvas
         self.display_load_type = self.result_thermal
@@ -58,6 +171,30 @@ class Model(QObject):
         self.display_coordinates = CoordinateSystem.LT
         self.z_coordinates = np.ndarray
 
+    @property
+    def laminate(self):
+        return self.project.laminate if self.project is not None else None
+
+    @property
+    def input_watcher(self):
+        return self.project.input_watcher if self.project is not None else None
+
+    @property
+    def project_info(self):
+        return self.project.project_info if self.project is not None else dict()
+
+    @project_info.setter
+    def project_info(self, project_info):
+        self.project.project_info = project_info
+
+    @property
+    def result_thermal(self):
+        return self.project.result_thermal if self.project is not None else None
+
+    @property
+    def result_total(self):
+        return self.project.result_total if self.project is not None else None
+
     def set_display_loadtype(self, load_type: LoadType):
         """Sets the currently displayed load type
 
@@ -112,7 +249,10 @@ class Model(QObject):
 
     def set_project_name(self, name):
         self.project_name = name
-        self.project_info['NAME'] = [name]
+        if self.project is not None:
+            self.project.name = name
+            self.project_info['NAME'] = [name]
+            self.projects_changed.emit()
 
     def calculate(self, thermal_stress, total_stress):
         """Redirects the signal to calculate to either thermal or total stress methods"""
@@ -121,52 +261,203 @@ class Model(QObject):
         if total_stress is True:
             self.calculate_total_stress()
 
-    def calculate_thermal_stress(self):
-        """Calculates the thermal stress and stores the results in results_thermal"""
+    def calculate_thermal_stress(self, reset_display=True):
+        """Calculates the thermal stress and stores the results in results_thermal
 
-        self.laminate.compute_thermal_stress()
-        thermal_stresses_global, thermal_stresses_local, thermal_strains_global, \
-            thermal_strains_local, z_coordinates = self.laminate.create_laminate_arrays(LoadType.thermal)
-        self.z_coordinates = z_coordinates
+            :param reset_display: True to display the default component, False to keep the current display options
+
+        """
 
         # Create result object for thermal loads
-        self.result_thermal = ResultData(thermal_stresses_global, thermal_stresses_local, thermal_strains_global, \
-            thermal_strains_local, z_coordinates)
+        previous_result = self.result_thermal
+        self.project.compute(LoadType.thermal, self.result_cache)
+        self.z_coordinates = self.result_thermal.z_coordinates
 
         # Plot the local thermal stress component 0 in local coordinates as default
-        self.set_display_component(0)
-        self.set_display_coordinates(CoordinateSystem.LT)
-        self.set_display_quantity(Quantity.stress)
-        self.display_load_type = self.result_thermal
+        if reset_display:
+            self.set_display_component(0)
+            self.set_display_coordinates(CoordinateSystem.LT)
+            self.set_display_quantity(Quantity.stress)
+            self.display_load_type = self.result_thermal
+        elif self.display_load_type is previous_result:
+            self.display_load_type = self.result_thermal
         self.plot_display_data.emit()
 
-    def calculate_total_stress(self):
-        """Calculates the total stress and stores the results in results_thermal"""
+    def calculate_total_stress(self, reset_display=True):
+        """Calculates the total stress and stores the results in results_thermal
 
-        self.laminate.compute_total_stress()
-        total_stresses_global, total_stresses_local, total_strains_global, \
-            total_strains_local, z_coordinates = self.laminate.create_laminate_arrays(LoadType.combined)
-        self.z_coordinates = z_coordinates
+            :param reset_display: True to display the default component, False to keep the current display options
 
-        # Create result object for thermal loads
-        self.result_total = ResultData(total_stresses_global, total_stresses_local, total_strains_global, \
-                            total_strains_local, z_coordinates)
+        """
+
+        # Create result object for combined loads
+        previous_result = self.result_total
+        self.project.compute(LoadType.combined, self.result_cache)
+        self.z_coordinates = self.result_total.z_coordinates
 
         # Plot the local total stress component 0 in local coordinates as default
-        self.set_display_component(0)
-        self.set_display_coordinates(CoordinateSystem.LT)
-        self.set_display_quantity(Quantity.stress)
-        self.display_load_type = self.result_total
+        if reset_display:
+            self.set_display_component(0)
+            self.set_display_coordinates(CoordinateSystem.LT)
+            self.set_display_quantity(Quantity.stress)
+            self.display_load_type = self.result_total
+        elif self.display_load_type is previous_result:
+            self.display_load_type = self.result_total
         self.plot_display_data.emit()
 
     def change_display_coordinates(self, coordinates: CoordinateSystem):
         self.display_coordinates = coordinates
 
     def read_input_file(self):
-        """Reads the input file and create a laminate instance"""
+        """Reads the input file and create a laminate instance
+
+            A project already loaded from the same version of the file is reused together with its results.
 
-        # Create a laminate instance
-        self.laminate, self.project_info = read_input_file(filepath=self.input_directory)
+        """
+
+        status = Path(self.input_directory).stat()
+        project = self.projects.lookup((str(Path(self.input_directory).resolve()), status.st_mtime_ns))
+
+        if project is None:
+            project = Project(self.input_directory, Path(self.input_directory).stem)
+            self.projects.insert(project)
+
+        self.switch_project(project.key)
+
+    def switch_project(self, key):
+        """Makes a loaded project the current one without recomputing its results
+
+            :param key: Key of the project in the project cache
+            :type key: tuple
+
+        """
+
+        project = self.projects.lookup(key)
+        if project is None:
+            return
+
+        self.project = project
+        self.input_directory = project.filepath
+        self.project_name = project.name
+        self.overlays = [overlay for overlay in self.overlays if overlay is not project]
+
+        # Display the results of the project that are already computed
+        result = project.result_thermal if project.result_thermal is not None else project.result_total
+        self.display_load_type = result
+        if result is not None:
+            self.z_coordinates = result.z_coordinates
+
+        self.projects_changed.emit()
+        self.project_switched.emit()
+
+    def project_list(self):
+        """Returns the label and key of the loaded projects, most recently used first
+
+            :rtype: list of tuples
+
+        """
+
+        return [(project.label, key) for key, project in reversed(self.projects.items())]
+
+    def add_overlay(self, key):
+        """Draws the results of a loaded project on top of those of the current project
+
+            :param key: Key of the project in the project cache
+            :type key: tuple
+
+        """
+
+        project = self.projects.get(key)
+        if project is None or project is self.project or project in self.overlays:
+            return
+
+        self.overlays.append(project)
+        self.plot_display_data.emit()
+
+    def clear_overlays(self):
+        self.overlays = []
+        if self.display_load_type is not None:
+            self.plot_display_data.emit()
+
+    def displayed_load_type(self):
+        """Returns the load type of the displayed results"""
+
+        if self.display_load_type is not None and self.display_load_type is self.result_total:
+            return LoadType.combined
+        return LoadType.thermal
+
+    def overlay_results(self):
+        """Returns the name and results of the overlaid projects for the displayed load type
+
+            Results already computed for a project are reused, missing ones are computed once and kept.
+
+            :rtype: list of tuples of str and ResultData
+
+        """
+
+        load_type = self.displayed_load_type()
+        results = []
+
+        for project in self.overlays:
+            if project not in self.projects.values():
+                continue
+            result = project.result(load_type)
+            if result is None:
+                result = project.compute(load_type, self.result_cache)
+            results.append((project.label, result))
+
+        return results
+
+    def set_watch_input_file(self, watch):
+        """Starts or stops watching the input file for changes
+
+            :param watch: True to update the results each time the input file is saved
+            :type watch: bool
+
+        """
+
+        if self.file_watcher.files():
+            self.file_watcher.removePaths(self.file_watcher.files())
+        if watch and self.input_directory:
+            self.file_watcher.addPath(self.input_directory)
+
+    def input_file_changed(self, path):
+        """Applies the changes of the input file and refreshes the results, plot and exports
+
+            :param path: Path of the changed file
+            :type path: str
+
+        """
+
+        # Editors that save by replacing the file make the watcher drop the path
+        if path not in self.file_watcher.files() and Path(path).exists():
+            self.file_watcher.addPath(path)
+
+        if self.project is None:
+            return
+
+        changes = self.input_watcher.check()
+
+        # The project now holds the new version of the file
+        if self.project.key not in self.projects:
+            self.projects.rekey(self.project)
+            self.projects_changed.emit()
+
+        if not changes:
+            return
+
+        self.project_info = self.input_watcher.project_info
+
+        if changes.requires_solution():
+            if isinstance(self.result_thermal, ResultData):
+                self.calculate_thermal_stress(reset_display=False)
+            if isinstance(self.result_total, ResultData):
+                self.calculate_total_stress(reset_display=False)
+
+        if self.text_export is not None:
+            self.export_text_file(*self.text_export)
+        if self.Excel_export is not None:
+            self.export_Excel_file(*self.Excel_export)
 
     def export_text_file(self, filepath, include_thermal=False, include_total=False):
         """Prints the result specified to a text file
@@ -178,6 +469,8 @@ class Model(QObject):
 
         """
 
+        self.text_export = (filepath, include_thermal, include_total)
+
         print_obj = FilePrint({'PROJECT_INFO': self.project_info}, filepath=filepath)
         print_obj.print_project_info()
 
@@ -196,6 +489,8 @@ class Model(QObject):
 
         """
 
+        self.Excel_export = (filepath, include_thermal, include_total)
+
         print_object = ExcelPrint({'PROJECT_INFO': self.project_info}, filepath)
 
         if include_thermal:
@@ -0,0 +1,421 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from composite.stack import composite_properties, local_stiffness, global_properties, transformation_matrices, \
+    interface_coordinates, stiffness_matrices, thermal_forces, solve_load_cases
+
+
+class LRUCache(OrderedDict):
+    """Dictionary that removes the least recently used entries when it holds more than max_entries
+
+          :param max_entries: Maximum number of entries
+          :type max_entries: int
+
+     """
+
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """Returns the entry of key, marking it as recently used, or None if it is missing"""
+
+        value = self.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.move_to_end(key)
+        return value
+
+    def insert(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+
+class LaminateStack:
+    """Ply arrays and stiffness matrices of one laminate definition, kept in the laminate cache
+
+          :ivar Q_bar: Ply stiffness tensors in global coordinate system, dim=n,3,3
+          :ivar alpha: Ply thermal coefficients in global coordinate system, dim=n,3
+          :ivar T1: Stress transformation matrices, dim=n,3,3
+          :ivar T2: Strain transformation matrices, dim=n,3,3
+          :ivar z: Interface coordinates, dim=n+1
+          :ivar A, B, D: Stiffness matrices, dim=3,3
+          :ivar thermal_load: Thermal forces and moments per unit temperature difference, dim=6
+
+     """
+
+    def __init__(self, Q_bar, alpha, T1, T2, z):
+        self.Q_bar = Q_bar
+        self.alpha = alpha
+        self.T1 = T1
+        self.T2 = T2
+        self.z = z
+        self.A, self.B, self.D = stiffness_matrices(Q_bar, z)
+        self.thermal_load = thermal_forces(Q_bar, alpha, z)
+
+    @property
+    def size(self):
+        return len(self.Q_bar)
+
+
+class SolveRequest:
+    """A request waiting for the next batch
+
+          :param stack: Laminate to solve
+          :type stack: LaminateStack
+          :param loads: Mechanical load vector [N, M], dim=6
+          :param delta_T: Temperature difference
+
+     """
+
+    def __init__(self, stack, loads, delta_T):
+        self.stack = stack
+        self.loads = loads
+        self.delta_T = delta_T
+        self.received = time.perf_counter()
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class CalculationService:
+    """Solver service that coalesces concurrent requests into batched solves
+
+        Requests arriving within batch_window seconds of the first request of a batch are solved together with one
+        stacked call per step of the solution, padding laminae with fewer plies with plies of zero thickness.
+
+          :param batch_window: Time in seconds to wait for more requests before solving
+          :type batch_window: float
+          :param max_batch: Maximum number of requests per batch
+          :type max_batch: int
+          :param max_laminates: Size of the laminate cache
+          :type max_laminates: int
+          :param max_plies: Size of the micromechanics cache
+          :type max_plies: int
+
+     """
+
+    def __init__(self, batch_window=0.002, max_batch=1024, max_laminates=4096, max_plies=65536):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.laminate_cache = LRUCache(max_laminates)
+        self.micromechanics_cache = LRUCache(max_plies)
+        self.queue = []
+        self.batch_timer = None
+
+        # Metrics
+        self.latencies = deque(maxlen=10000)
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+
+    def laminate_stack(self, definition):
+        """Returns the cached stack of a laminate definition, building it if missing
+
+              :param definition: Dictionary with materials and laminae, see parse_definition
+              :type definition: dict
+              :rtype: LaminateStack
+
+         """
+
+        key = json.dumps([definition['materials'], definition['laminae']], sort_keys=True)
+        stack = self.laminate_cache.lookup(key)
+
+        if stack is None:
+            stack = self.build_stack(definition['materials'], definition['laminae'])
+            self.laminate_cache.insert(key, stack)
+
+        return stack
+
+    def build_stack(self, materials, laminae):
+        """Builds the ply arrays of a laminate, computing micromechanics only for unseen ply compositions"""
+
+        rows = []
+        for lamina in laminae:
+            fibre = materials[str(lamina['fibre_material'])]
+            matrix = materials[str(lamina['matrix_material'])]
+            rows.append((fibre['modulus'], matrix['modulus'], fibre['poisson_ratio'], matrix['poisson_ratio'],
+                         lamina['volume_fraction'], fibre['thermal_coefficient'], matrix['thermal_coefficient']))
+
+        # Homogenise the unseen compositions in one call, kept locally as the cache may evict them again
+        compositions = {row: self.micromechanics_cache.lookup(row) for row in dict.fromkeys(rows)}
+        missing = [row for row, ply in compositions.items() if ply is None]
+        if missing:
+            E_L, E_T, v_LT, _, G_LT, alpha_L, alpha_T = composite_properties(*np.array(missing).T)
+            Q = local_stiffness(E_L, E_T, v_LT, G_LT)
+            for index, row in enumerate(missing):
+                compositions[row] = (Q[index], alpha_L[index], alpha_T[index])
+                self.micromechanics_cache.insert(row, compositions[row])
+
+        properties = [compositions[row] for row in rows]
+        Q = np.array([ply[0] for ply in properties])
+        alpha_L = np.array([ply[1] for ply in properties])
+        alpha_T = np.array([ply[2] for ply in properties])
+        angles = np.array([lamina['angle'] for lamina in laminae], dtype=float)
+
+        Q_bar, alpha = global_properties(Q, alpha_L, alpha_T, angles)
+        T1, T2 = transformation_matrices(angles)
+        z = interface_coordinates([lamina['thickness'] for lamina in laminae])
+
+        return LaminateStack(Q_bar, alpha, T1, T2, z)
+
+    async def solve(self, definition):
+        """Queues a request and waits for the batch it ends up in
+
+              :param definition: Parsed request body
+              :type definition: dict
+              :returns: Response body
+              :rtype: dict
+
+         """
+
+        loads = definition.get('loads', {})
+        mechanical_loads = np.zeros(6)
+        for offset, key in ((0, 'N'), (3, 'M')):
+            values = np.array(loads.get(key, []), dtype=float)[:3]
+            mechanical_loads[offset:offset + len(values)] = values
+        request = SolveRequest(self.laminate_stack(definition), mechanical_loads, float(loads.get('delta_T', 0.0)))
+
+        self.queue.append(request)
+        if len(self.queue) >= self.max_batch:
+            self.solve_batch()
+        elif self.batch_timer is None:
+            self.batch_timer = asyncio.get_running_loop().call_later(self.batch_window, self.solve_batch)
+
+        return await request.future
+
+    def solve_batch(self):
+        """Solves all queued requests as one batch"""
+
+        if self.batch_timer is not None:
+            self.batch_timer.cancel()
+            self.batch_timer = None
+
+        batch, self.queue = self.queue, []
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            results = solve_stacks([request.stack for request in batch],
+                                   np.array([request.loads for request in batch]),
+                                   np.array([request.delta_T for request in batch]))
+        except Exception:
+            # Solve the requests one at a time so that only those failing, e.g. singular laminates, get the error
+            results = [self.solve_request(request) for request in batch]
+
+        end = time.perf_counter()
+        self.batches += 1
+
+        for request, result in zip(batch, results):
+            if request.future.done():
+                continue
+
+            if isinstance(result, Exception):
+                self.errors += 1
+                request.future.set_exception(result)
+                continue
+
+            latency = {'queue_ms': (start - request.received) * 1e3, 'solve_ms': (end - start) * 1e3,
+                       'total_ms': (end - request.received) * 1e3, 'batch_size': len(batch)}
+            self.latencies.append(latency['total_ms'])
+            self.requests += 1
+            result['latency'] = latency
+            request.future.set_result(result)
+
+    @staticmethod
+    def solve_request(request):
+        """Solves one request on its own, returning its result or the exception raised"""
+
+        try:
+            return solve_stacks([request.stack], request.loads[np.newaxis], np.array([request.delta_T]))[0]
+        except Exception as error:
+            return error
+
+    def metrics(self):
+        """Returns aggregated latency and cache metrics"""
+
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+
+        return {'requests': self.requests, 'batches': self.batches, 'errors': self.errors,
+                'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'latency_ms': {'mean': float(latencies.mean()), 'p50': float(np.percentile(latencies, 50)),
+                               'p95': float(np.percentile(latencies, 95)), 'max': float(latencies.max())},
+                'laminate_cache': {'entries': len(self.laminate_cache), 'hits': self.laminate_cache.hits,
+                                   'misses': self.laminate_cache.misses},
+                'micromechanics_cache': {'entries': len(self.micromechanics_cache),
+                                         'hits': self.micromechanics_cache.hits,
+                                         'misses': self.micromechanics_cache.misses}}
+
+
+def solve_stacks(stacks, loads, delta_T):
+    """Solves thermal and combined loading of several laminates at once
+
+        The results follow Laminate.compute_thermal_stress and Laminate.compute_total_stress.
+
+          :param stacks: Laminates to solve
+          :type stacks: list of LaminateStack
+          :param loads: Mechanical load vectors [N, M]
+          :type loads: ndarray(dtype=float, dim=nr_stacks,6)
+          :param delta_T: Temperature differences
+          :type delta_T: ndarray(dtype=float, dim=nr_stacks)
+          :returns: One result dictionary per laminate
+          :rtype: list of dict
+
+     """
+
+    sizes = [stack.size for stack in stacks]
+    n = max(sizes)
+
+    # Pad with plies of zero thickness at the top
+    Q_bar = np.zeros((len(stacks), n, 3, 3))
+    alpha = np.zeros((len(stacks), n, 3))
+    T1 = np.zeros((len(stacks), n, 3, 3))
+    T2 = np.zeros((len(stacks), n, 3, 3))
+    z = np.zeros((len(stacks), n + 1))
+
+    for index, stack in enumerate(stacks):
+        size = stack.size
+        Q_bar[index, :size], alpha[index, :size] = stack.Q_bar, stack.alpha
+        T1[index, :size], T2[index, :size] = stack.T1, stack.T2
+        z[index, :size + 1], z[index, size + 1:] = stack.z, stack.z[-1]
+
+    A = np.array([stack.A for stack in stacks])
+    B = np.array([stack.B for stack in stacks])
+    D = np.array([stack.D for stack in stacks])
+    thermal_loads = delta_T[:, np.newaxis] * np.array([stack.thermal_load for stack in stacks])
+
+    strains, face_components = solve_load_cases(Q_bar, alpha, T1, T2, z, A, B, D, thermal_loads, loads, delta_T)
+
+    results = []
+    for index, size in enumerate(sizes):
+        result = {'A': A[index].tolist(), 'B': B[index].tolist(), 'D': D[index].tolist(),
+                  'z_coordinates': np.repeat(z[index, :size + 1], 2)[1:-1].tolist()}
+
+        for case, (load_type, arrays) in enumerate(face_components.items()):
+            result[load_type] = {'midplane_strains': strains[case, index, :3].tolist(),
+                                 'curvatures': strains[case, index, 3:].tolist()}
+            for name, array in arrays.items():
+                result[load_type][name] = array[index, :, :2 * size].tolist()
+
+        results.append(result)
+
+    return results
+
+
+def parse_definition(body):
+    """Parses and checks a request body
+
+        The body holds "materials" (index to modulus, poisson_ratio and thermal_coefficient), "laminae" (thickness,
+        angle, fibre_material, matrix_material and volume_fraction, from the bottom) and optionally "loads" (N, M
+        and delta_T).
+
+          :param body: Request body
+          :type body: bytes
+          :returns: definition
+          :rtype: dict
+
+     """
+
+    definition = json.loads(body)
+
+    if not isinstance(definition, dict) or not definition.get('laminae') or 'materials' not in definition:
+        raise ValueError('Request must contain materials and at least one lamina')
+
+    materials, laminae = definition['materials'], definition['laminae']
+    if not isinstance(materials, dict) or not all(isinstance(material, dict) for material in materials.values()):
+        raise ValueError('materials must be an object of material objects')
+    if not isinstance(laminae, list) or not all(isinstance(lamina, dict) for lamina in laminae):
+        raise ValueError('laminae must be an array of lamina objects')
+
+    definition['materials'] = {str(index): material for index, material in materials.items()}
+
+    for lamina in laminae:
+        for key in ('fibre_material', 'matrix_material'):
+            if str(lamina[key]) not in definition['materials']:
+                raise ValueError('Unknown material ' + str(lamina[key]))
+
+    return definition
+
+
+async def handle_connection(service, reader, writer):
+    """Serves one HTTP/1.1 request on the connection, POST /solve or GET /metrics"""
+
+    try:
+        try:
+            request_line = await reader.readline()
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            if method == 'POST' and path == '/solve':
+                status, response = 200, await service.solve(parse_definition(body))
+            elif method == 'GET' and path == '/metrics':
+                status, response = 200, service.metrics()
+            else:
+                status, response = 404, {'error': 'Not found'}
+
+        except (ValueError, KeyError, TypeError, asyncio.IncompleteReadError) as error:
+            status, response = 400, {'error': str(error)}
+        except np.linalg.LinAlgError as error:
+            status, response = 422, {'error': str(error)}
+        except Exception as error:
+            status, response = 500, {'error': '{}: {}'.format(type(error).__name__, error)}
+
+        payload = json.dumps(response).encode()
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 422: 'Unprocessable Entity',
+                   500: 'Internal Server Error'}
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                     'Connection: close\r\n\r\n'.format(status, reasons[status], len(payload)).encode() + payload)
+        await writer.drain()
+    except ConnectionError:
+        # The client closed the connection before the response was sent
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=8765, **options):
+    """Runs the service until cancelled"""
+
+    service = CalculationService(**options)
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(service, reader, writer), host, port)
+
+    async with server:
+        await server.serve_forever()
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Local laminate calculation service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--batch-window', type=float, default=2.0, help='Batching window in ms')
+    parser.add_argument('--max-batch', type=int, default=1024, help='Maximum number of requests per batch')
+    arguments = parser.parse_args(arguments)
+
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, batch_window=arguments.batch_window / 1e3,
+                          max_batch=arguments.max_batch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
 from composite import plot_tools_GUI, LoadType
-from coordinate_systems import CoordinateSystem
+from composite.coordinate_systems import CoordinateSystem
 from model import Quantity, ResultData
 
 matplotlib.use('Qt5Agg')
@@ -95,6 +95,9 @@ class View(QGroupBox):
         self.input_group = InputGroup(self.model, self)
         self.calculate_group = CalculateGroup(self.model, self)
 
+        # Show the results of a project when switching to it
+        self.model.project_switched.connect(self.show_project)
+
         # Create main layout of the window and add subgroups
         self.main_layout = QHBoxLayout()
         self.left_panel_layout = QVBoxLayout()
@@ -110,6 +113,23 @@ class View(QGroupBox):
         self.canvas_group.plot_properties.reset_load_types()
         self.canvas_group.canvas.reset_axes()
 
+    def show_project(self):
+        """Updates the GUI with the project name and the already computed results of the current project"""
+
+        self.reset_GUI()
+        self.input_group.update_placeholder_text(self.model.project_name)
+        self.model.set_watch_input_file(self.input_group.check_box_watch.isChecked())
+
+        if self.model.result_thermal is not None:
+            self.canvas_group.plot_properties.add_load_types(LoadType.thermal)
+        if self.model.result_total is not None:
+            self.canvas_group.plot_properties.add_load_types(LoadType.combined)
+
+        if self.model.display_load_type is not None:
+            self.canvas_group.plot_data()
+        else:
+            self.canvas_group.canvas.draw()
+
 class CanvasGroup(QGroupBox):
     """ Group box containing canvas object and plot properties group box
 
@@ -120,6 +140,9 @@ class CanvasGroup(QGroupBox):
 
     """
 
+    # Line styles of overlaid projects
+    OVERLAY_LINESTYLES = ['--', ':', '-.']
+
     def __init__(self, model, parent):
         super().__init__("Result Display")
 
@@ -178,26 +201,47 @@ class CanvasGroup(QGroupBox):
         canvas_axes = self.canvas.axes
 
         # Retrieve the data from the display_quantity
+        quantity = self.model.display_quantity
+        array_to_plot = self.select_array(self.model.display_load_type)
+        state_type = array_to_plot.stress_type if quantity == Quantity.stress else array_to_plot.strain_type
+        self.canvas.set_axis_title(state_type, quantity, self.model.display_component)
+
+        # Results of other projects are drawn with other line styles on top of the current ones
+        overlays = self.model.overlay_results()
+        label = self.model.project.label if overlays else None
+
+        self.canvas.graph = plot_tools_GUI.plot_stress(axes=canvas_axes, coordinates=self.model.z_coordinates, quantity=array_to_plot, component=self.model.display_component, label=label)
+        for index, (overlay_label, result) in enumerate(overlays):
+            plot_tools_GUI.plot_stress(axes=canvas_axes, coordinates=result.z_coordinates,
+                                       quantity=self.select_array(result), component=self.model.display_component,
+                                       label=overlay_label, linestyle=self.OVERLAY_LINESTYLES[index % 3])
+        if overlays:
+            canvas_axes.legend()
+
+        self.canvas.figure.tight_layout(w_pad=1)
+        self.canvas.axes.grid(grid)
+        self.canvas.draw()
+
+    def select_array(self, result):
+        """Returns the stress or strain state of result matching the displayed quantity and coordinates
+
+            :param result: Results to select from
+            :type result: ResultData
+            :rtype: StressState or StrainState
+
+        """
+
         quantity = self.model.display_quantity
         coordinates = self.model.display_coordinates
 
         if quantity == Quantity.stress and coordinates == CoordinateSystem.LT:
-            array_to_plot = self.model.display_load_type.local_stress
-            self.canvas.set_axis_title(self.model.display_load_type.local_stress.stress_type, quantity, self.model.display_component)
+            return result.local_stress
         elif quantity == Quantity.stress and coordinates == CoordinateSystem.xy:
-            array_to_plot = self.model.display_load_type.global_stress
-            self.canvas.set_axis_title(self.model.display_load_type.global_stress.stress_type, quantity, self.model.display_component)
+            return result.global_stress
         elif quantity == Quantity.strain and coordinates == CoordinateSystem.LT:
-            array_to_plot = self.model.display_load_type.local_strains
-            self.canvas.set_axis_title(self.model.display_load_type.local_strains.strain_type, quantity, self.model.display_component)
+            return result.local_strains
         else:
-            array_to_plot = self.model.display_load_type.global_strains
-            self.canvas.set_axis_title(self.model.display_load_type.local_strains.strain_type, quantity, self.model.display_component)
-
-        self.canvas.graph = plot_tools_GUI.plot_stress(axes=canvas_axes, coordinates=self.model.z_coordinates, quantity=array_to_plot, component=self.model.display_component)
-        self.canvas.figure.tight_layout(w_pad=1)
-        self.canvas.axes.grid(grid)
-        self.canvas.draw()
+            return result.global_strains
 
 
 class PlotPropertiesGroup(QGroupBox):
@@ -335,6 +379,18 @@ class InputGroup(QGroupBox):
         self.buttons_layout = QVBoxLayout()
         self.input_file_button = QPushButton("Select Input File")
         self.buttons_layout.addWidget(self.input_file_button)
+        self.check_box_watch = QCheckBox("Update Results When Input File Is Saved")
+        self.buttons_layout.addWidget(self.check_box_watch)
+
+        # Loaded projects, switching is instant as their results are kept
+        self.projects_layout = QVBoxLayout()
+        self.combo_box_projects = QComboBox(self)
+        self.combo_box_projects.addItem("Select Loaded Project")
+        self.overlay_button = QPushButton("Overlay Selected Project")
+        self.clear_overlays_button = QPushButton("Clear Overlays")
+        self.projects_layout.addWidget(self.combo_box_projects)
+        self.projects_layout.addWidget(self.overlay_button)
+        self.projects_layout.addWidget(self.clear_overlays_button)
 
         # Line edit layout
         self.line_edit_layout = QFormLayout()
@@ -346,6 +402,7 @@ class InputGroup(QGroupBox):
         self.main_layout = QVBoxLayout()
         self.main_layout.addLayout(self.buttons_layout)
         self.main_layout.addLayout(self.line_edit_layout)
+        self.main_layout.addLayout(self.projects_layout)
         self.setLayout(self.main_layout)
 
         # Controllers for input file button and project name line edit
@@ -358,12 +415,35 @@ class InputGroup(QGroupBox):
             self.filename = filepath.split('/')[-1].replace('.txt', '')
             self.update_placeholder_text(self.filename)
 
-            # Update model
+            # Update model, the name is set after reading as it applies to the current project
             self.model.set_input_directory(filepath)
-            self.model.set_project_name(self.filename)
             self.model.read_input_file()
+            self.model.set_project_name(self.filename)
+            self.model.set_watch_input_file(self.check_box_watch.isChecked())
         self.input_file_button.clicked.connect(select_file)
 
+        def watch_input_file():
+            self.model.set_watch_input_file(self.check_box_watch.isChecked())
+        self.check_box_watch.stateChanged.connect(watch_input_file)
+
+        def switch_project():
+            key = self.combo_box_projects.currentData()
+            if key is not None:
+                self.model.switch_project(key)
+        self.combo_box_projects.activated.connect(switch_project)
+
+        def overlay_project():
+            key = self.combo_box_projects.currentData()
+            if key is not None and isinstance(self.model.display_load_type, ResultData):
+                self.model.add_overlay(key)
+        self.overlay_button.clicked.connect(overlay_project)
+
+        def clear_overlays():
+            self.model.clear_overlays()
+        self.clear_overlays_button.clicked.connect(clear_overlays)
+
+        self.model.projects_changed.connect(self.update_projects)
+
         def update_project_name():
 
             self.filename = self.input_project_name.text()
@@ -377,6 +457,14 @@ class InputGroup(QGroupBox):
             self.delete_text()
         self.input_project_name.returnPressed.connect(update_project_name)
 
+    def update_projects(self):
+        """Lists the loaded projects in the project combo box, most recently used first"""
+
+        self.combo_box_projects.clear()
+        self.combo_box_projects.addItem("Select Loaded Project")
+        for label, key in self.model.project_list():
+            self.combo_box_projects.addItem(label, key)
+
     def update_placeholder_text(self, new_text):
         """Updates the text displayed in the project name line edit
 
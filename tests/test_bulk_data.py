@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from composite.bulk_data import BulkDataIndex, line_fields, nastran_float
+
+
+def fixed_field(*lines, width=8):
+    """Writes lines of fields in small field format, or large field format if width is 16"""
+
+    return ''.join(line[0].ljust(8) + ''.join(field.rjust(width) for field in line[1:]) + '\n' for line in lines)
+
+
+# MAT8 7 and PCOMP 3 with two plies, written in each field format
+SMALL_FIELD = '$ Small field\n' + fixed_field(
+    ('MAT8', '7', '1.5+11', '9.+9', '.3', '5.+9', '', '', '1600.', '+MT1'),
+    ('+MT1', '-1.-7', '2.5-5'),
+    ('PCOMP', '3'),
+    ('', '7', '.125', '0.', 'YES', '7', '.125', '90.', 'YES'))
+
+LARGE_FIELD = '$ Large field\n' + fixed_field(
+    ('MAT8*', '7', '1.5+11', '9.+9', '.3', '*MT1'),
+    ('*MT1', '5.+9', '', '', '1600.', '*MT2'),
+    ('*MT2', '-1.-7', '2.5-5'),
+    ('PCOMP*', '3', '', '', '', '*P1'),
+    ('*P1', '', '', '', ''),
+    ('*', '7', '.125', '0.', 'YES'),
+    ('*', '7', '.125', '90.', 'YES'), width=16)
+
+FREE_FIELD = '''\
+$ Free field
+MAT8,7,1.5+11,9.+9,.3,5.+9,,,1600.,+MT1
++MT1,-1.-7,2.5-5
+PCOMP,3
+,7,.125,0.,YES,7,.125,90.,YES
+'''
+
+
+@pytest.fixture(params=[SMALL_FIELD, LARGE_FIELD, FREE_FIELD], ids=['small', 'large', 'free'])
+def index(request, tmp_path):
+    filepath = tmp_path / 'model.bdf'
+    filepath.write_text(request.param)
+    return BulkDataIndex(filepath)
+
+
+def test_nastran_float():
+    assert nastran_float('1.5+11') == 1.5e11
+    assert nastran_float('-1.-7') == -1e-7
+    assert nastran_float('3.D0') == 3.0
+    assert nastran_float('.25') == 0.25
+    assert nastran_float('  ') is None
+
+
+def test_free_field_lines_are_padded_to_the_data_fields():
+    assert line_fields('PCOMP,3') == ['3', '', '', '', '', '', '', '']
+    assert line_fields(',1,2,3,4,5,6,7,8,+C1') == ['1', '2', '3', '4', '5', '6', '7', '8']
+    assert line_fields('PCOMP*,3,,,,+C1') == ['3', '', '', '']
+
+
+def test_index(index):
+    assert list(index) == [3]
+    assert 7 in index.materials
+
+
+def test_material(index):
+    with open(index.filepath, 'rb') as file:
+        E_L, E_T, v_LT, G_LT, alpha_L, alpha_T, density = index.material(file, 7)
+
+    assert (E_L, E_T, v_LT, G_LT) == (1.5e11, 9e9, 0.3, 5e9)
+    assert (alpha_L, alpha_T) == (-1e-7, 2.5e-5)
+    assert density == 1600.0
+
+
+def test_laminate(index):
+    laminate = index.laminate(3)
+
+    assert [lamina.angle for lamina in laminate.laminae] == [0.0, 90.0]
+    assert [lamina.thickness for lamina in laminate.laminae] == [0.125, 0.125]
+    assert np.allclose(laminate.laminae[0].coordinates, [-0.125, 0.0])
+    assert laminate.laminae[1].alpha_T == 2.5e-5